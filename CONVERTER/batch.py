@@ -0,0 +1,159 @@
+"""
+Batch conversion - Steps 1-6 of orchestrator.py (Step 7 too with solve=True)
+on every knowledge base of a directory, in one invocation.
+
+The files are distributed over a pool of worker processes started once for
+the whole batch. PySwip is not thread-safe and the SWI-Prolog engine is
+global to a process, so every worker owns its engine: the workers are
+spawned (not forked) and import the converter themselves, and each
+conversion goes through conversion_server.convert, which unloads the
+knowledge base from the engine once extracted. With in_process=True the
+worker also keeps one OneshotPlanner engine (planning.default_pool) for
+all the problems it solves; without it, or when no UP engine can solve a
+problem, each file is planned by PDDL/run_plan.py with the "basic" searches.
+
+Every file gets one JSON line in summary.jsonl, written as soon as it is
+converted:
+
+    {"file": "PROLOG/cucinare.pl", "ok": true, "output_dir": "...",
+     "domain": "...", "problem": "...", "pddl_writer": "native",
+     "timings": {"step1": 0.004, ..., "step6": 0.001, "total": 0.01},
+     "wall": 0.012, "worker": 4242}
+    {"file": "PROLOG/broken.pl", "ok": false, "error": "...", "wall": 0.002, "worker": 4243}
+
+With solve=True the timings include step7 and the record a "planning" entry:
+
+    "planning": {"mode": "in-process", "searches": [{"planner": "fast-downward",
+                 "search": "oneshot", "success": true, "plan_length": 3, ...}]}
+"""
+
+import os
+import glob
+import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from planner_config import ALGORITHM_SETS, available_cores
+
+
+def find_knowledge_bases(directory):
+    """.pl files of directory (not recursive), largest first so long conversions start early"""
+    files = glob.glob(os.path.join(directory, "*.pl"))
+    return sorted(files, key=lambda path: (-os.path.getsize(path), path))
+
+
+def _init_worker():
+    """Import the converter (and start SWI-Prolog) once per worker"""
+    import conversion_server  # noqa: F401
+
+
+def _solve_one(response, in_process=False, up_engine=None):
+    """Step 7 for a converted file: in process with the worker's engine, else run_plan.py"""
+    from planning import default_pool, write_planning_results, run_plan_subprocess, run_plan_command
+    start = time.time()
+    planning = {}
+    searches = None
+    if in_process:
+        try:
+            from prolog2up_V2 import build_up_problem
+            from compact_ir import load_knowledge
+            problem = build_up_problem(load_knowledge(response.get("compact_ir", response["json"])))
+            searches = [default_pool(up_engine).solve(problem, timeout=60)]
+            write_planning_results(response["output_dir"], searches)
+            planning["mode"] = "in-process"
+        except Exception as e:
+            planning["fallback"] = str(e)
+    if searches is None:
+        command = run_plan_command(response["domain"], response["problem"], response["output_dir"],
+                                   ALGORITHM_SETS["basic"])
+        _, searches = run_plan_subprocess(command)
+        planning["mode"] = "subprocess"
+    response["timings"]["step7"] = time.time() - start
+    planning["searches"] = [{key: value for key, value in search.items() if key != "plan"}
+                            for search in searches]
+    response["planning"] = planning
+
+
+def _convert_one(request, solve=False, in_process=False, up_engine=None):
+    """One conversion in a worker; converter output is captured, not printed"""
+    from conversion_server import handle_request
+    start = time.time()
+    response = handle_request(request)
+    response.pop("id", None)
+    if solve and response["ok"]:
+        _solve_one(response, in_process, up_engine)
+    response["wall"] = time.time() - start
+    response["worker"] = os.getpid()
+    return response
+
+
+def _planning_summary(planning):
+    """' - plan found (3 steps, in-process)' for the progress line"""
+    plans = [search for search in planning["searches"] if search["success"]]
+    if not plans:
+        return f" - no plan ({planning['mode']})"
+    shortest = min(search["plan_length"] for search in plans)
+    return f" - plan found ({shortest} steps, {planning['mode']})"
+
+
+def run_batch(directory, output_dir, workers=None, type_discovery="findall",
+              pddl_writer="native", emit_up_code=False, compact_ir=False, solve=False, in_process=False, up_engine=None):
+    """
+    Convert (and with solve=True plan) every .pl file of directory into
+    output_dir/<name>/ and write output_dir/summary.jsonl.
+    Returns (converted, failed, summary path).
+    """
+    prolog_files = find_knowledge_bases(directory)
+    if not prolog_files:
+        raise FileNotFoundError(f"No .pl files found in '{directory}'")
+    workers = max(1, min(workers or available_cores(), len(prolog_files)))
+
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, "summary.jsonl")
+    print(f"Converting {len(prolog_files)} knowledge bases with {workers} worker(s)")
+
+    converted = failed = 0
+    batch_start = time.time()
+    context = multiprocessing.get_context("spawn")
+    with open(summary_path, "w") as summary, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        futures = {}
+        for prolog_file in prolog_files:
+            name = os.path.splitext(os.path.basename(prolog_file))[0]
+            request = {
+                "prolog_file": prolog_file,
+                "output_dir": os.path.join(output_dir, name),
+                "type_discovery": type_discovery,
+                "pddl_writer": pddl_writer,
+                "emit_up_code": emit_up_code,
+                "compact_ir": compact_ir
+            }
+            futures[pool.submit(_convert_one, request, solve, in_process, up_engine)] = prolog_file
+
+        for future in as_completed(futures):
+            prolog_file = futures[future]
+            try:
+                record = {"file": prolog_file}
+                record.update(future.result())
+            except BrokenProcessPool as e:
+                # A worker died (e.g. SWI-Prolog crashed): the remaining files fail too
+                record = {"file": prolog_file, "ok": False, "error": f"Worker process failed: {e}"}
+            except Exception as e:
+                # The conversion (or Step 7) raised in the worker: only this file fails
+                record = {"file": prolog_file, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+            summary.write(json.dumps(record) + "\n")
+            summary.flush()
+            if record["ok"]:
+                converted += 1
+                planning = _planning_summary(record["planning"]) if "planning" in record else ""
+                print(f"  ✓ {prolog_file}: {record['timings']['total']:.3f}s ({record['pddl_writer']} writer){planning}")
+            else:
+                failed += 1
+                print(f"  ✗ {prolog_file}: {record['error']}")
+
+    print(f"Batch completed in {time.time() - batch_start:.3f}s: {converted} converted, {failed} failed")
+    print(f"Summary: {summary_path}")
+    return converted, failed, summary_path
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Conversion server - one long-lived process that keeps the SWI-Prolog engine
+and the converter imports warm across conversions (Steps 1-6 of
+orchestrator.py, no planning).
+
+Requests are JSON objects, one per line, read from stdin (default) or from
+the clients of a Unix socket (--socket PATH). Every request gets exactly one
+JSON response line:
+
+    {"id": 1, "prolog_file": "PROLOG/cucinare.pl"}
+    {"id": 1, "ok": true, "json": "...", "domain": "...", "problem": "...",
+     "pddl_writer": "native", "timings": {"step1": 0.004, ..., "total": 0.01}}
+    {"id": 1, "ok": false, "error": "..."}
+
+Optional request fields: output_dir (default RESULTS/CONVERTER/<name>_<timestamp>),
+type_discovery ("findall"/"scan"), pddl_writer ("native"/"up"),
+emit_up_code (bool), compact_ir (bool, also write extracted_knowledge.kbir,
+returned as "compact_ir"), log (bool, return the converter output as "log").
+{"command": "shutdown"} stops the server.
+
+Each knowledge base is unloaded from the engine once extracted, so the next
+one is consulted into a clean user module.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import contextlib
+import socketserver
+from io import StringIO
+from datetime import datetime
+
+from prolog_extractor import extract_prolog_knowledge, analyze_fluent_signatures, unload_prolog_file
+from kb_to_json import knwoledge_to_json
+from compact_ir import write_compact_ir, compact_ir_path
+from prolog2up_V2 import generate_up_code, build_up_problem, write_pddl
+from pddl_writer import write_pddl_files
+
+
+def default_output_dir(prolog_file):
+    """Same layout as orchestrator.py: RESULTS/CONVERTER/<name>_<timestamp>"""
+    timestamp = datetime.now().strftime("%m%d_%H%M")
+    filename = os.path.splitext(os.path.basename(prolog_file))[0]
+    return f"RESULTS/CONVERTER/{filename}_{timestamp}"
+
+
+def convert(prolog_file, output_dir=None, type_discovery="findall", pddl_writer="native", emit_up_code=False,
+            compact_ir=False):
+    """
+    Run Steps 1-6 on one knowledge base in this process.
+    Returns the output paths, the writer actually used and per-step timings
+    (seconds, keyed step1..step6 and total).
+    """
+    if not os.path.exists(prolog_file):
+        raise FileNotFoundError(f"Prolog file '{prolog_file}' not found")
+    if output_dir is None:
+        output_dir = default_output_dir(prolog_file)
+    os.makedirs(output_dir, exist_ok=True)
+
+    timings = {}
+    total_start = time.time()
+
+    # Step 1: extraction, always followed by unloading the KB from the engine
+    step_start = time.time()
+    try:
+        knowledge = extract_prolog_knowledge(prolog_file, discovery=type_discovery)
+    finally:
+        unload_prolog_file(prolog_file)
+    timings["step1"] = time.time() - step_start
+
+    # Step 2: fluent signatures
+    step_start = time.time()
+    knowledge['fluent_signatures'] = analyze_fluent_signatures(knowledge)
+    timings["step2"] = time.time() - step_start
+
+    # Step 3: JSON intermediate representation
+    step_start = time.time()
+    structured_knowledge = knwoledge_to_json(knowledge)
+    timings["step3"] = time.time() - step_start
+
+    # Step 4: save JSON
+    step_start = time.time()
+    json_output_path = os.path.join(output_dir, "extracted_knowledge.json")
+    with open(json_output_path, 'w') as f:
+        json.dump(structured_knowledge, f, indent=2)
+    result = {"json": json_output_path}
+    if compact_ir:
+        result["compact_ir"] = write_compact_ir(structured_knowledge, compact_ir_path(json_output_path))
+    timings["step4"] = time.time() - step_start
+
+    # Step 5: UP source (debug artifact) and UP problem (UP writer only)
+    step_start = time.time()
+    if emit_up_code:
+        up_output_path = os.path.join(output_dir, "generated_up.py")
+        with open(up_output_path, 'w') as f:
+            f.write(generate_up_code(structured_knowledge, output_dir))
+        result["up_code"] = up_output_path
+    problem = build_up_problem(structured_knowledge) if pddl_writer == "up" else None
+    timings["step5"] = time.time() - step_start
+
+    # Step 6: PDDL files
+    step_start = time.time()
+    if problem is not None:
+        domain_file, problem_file = write_pddl(problem, output_dir)
+        used_writer = "up"
+    else:
+        domain_file, problem_file, used_writer = write_pddl_files(structured_knowledge, output_dir)
+    timings["step6"] = time.time() - step_start
+
+    timings["total"] = time.time() - total_start
+    result.update({
+        "output_dir": output_dir,
+        "domain": domain_file,
+        "problem": problem_file,
+        "pddl_writer": used_writer,
+        "timings": timings
+    })
+    return result
+
+
+def handle_request(request):
+    """Response dict for one decoded request; converter output is captured, not printed"""
+    response = {"id": request.get("id")}
+    captured_output = StringIO()
+    # Converter log messages (INFO and above) are only collected when asked for
+    log_handler = None
+    if request.get("log"):
+        log_handler = logging.StreamHandler(captured_output)
+        logging.getLogger().addHandler(log_handler)
+    try:
+        with contextlib.redirect_stdout(captured_output):
+            result = convert(
+                request["prolog_file"],
+                output_dir=request.get("output_dir"),
+                type_discovery=request.get("type_discovery", "findall"),
+                pddl_writer=request.get("pddl_writer", "native"),
+                emit_up_code=request.get("emit_up_code", False),
+                compact_ir=request.get("compact_ir", False)
+            )
+        response["ok"] = True
+        response.update(result)
+    except Exception as e:
+        response["ok"] = False
+        response["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if log_handler is not None:
+            logging.getLogger().removeHandler(log_handler)
+    if request.get("log"):
+        response["log"] = captured_output.getvalue()
+    return response
+
+
+def process_line(line):
+    """(response line, shutdown requested) for one request line"""
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+    except ValueError as e:
+        return json.dumps({"id": None, "ok": False, "error": f"Invalid request: {e}"}), False
+
+    if request.get("command") == "shutdown":
+        return json.dumps({"id": request.get("id"), "ok": True, "shutdown": True}), True
+    return json.dumps(handle_request(request)), False
+
+
+def serve_stdin():
+    """JSON-lines over stdin/stdout, until EOF or a shutdown command"""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        response, shutdown = process_line(line)
+        sys.stdout.write(response + "\n")
+        sys.stdout.flush()
+        if shutdown:
+            break
+
+
+class _ConversionHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw_line in self.rfile:
+            line = raw_line.decode("utf-8")
+            if not line.strip():
+                continue
+            response, shutdown = process_line(line)
+            self.wfile.write((response + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if shutdown:
+                self.server.stop_requested = True
+                break
+
+
+def serve_socket(socket_path):
+    """
+    JSON-lines over a Unix socket. Connections are served one at a time:
+    the Prolog engine is shared, so conversions are never concurrent.
+    """
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socketserver.UnixStreamServer(socket_path, _ConversionHandler)
+    server.stop_requested = False
+    print(f"Conversion server listening on {socket_path}", file=sys.stderr)
+    try:
+        while not server.stop_requested:
+            server.handle_request()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-lived Prolog to PDDL conversion server (JSON lines)")
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of reading requests from stdin")
+    parser.add_argument("--preload-up", action="store_true",
+                        help="Import unified_planning at startup, for requests using pddl_writer 'up'")
+    args = parser.parse_args()
+
+    # stdout carries the responses: warnings go to stderr, other messages only into "log"
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s", stream=sys.stderr)
+    logging.getLogger().handlers[0].setLevel(logging.WARNING)
+
+    if args.preload_up:
+        import unified_planning.shortcuts  # noqa: F401
+
+    try:
+        if args.socket:
+            serve_socket(args.socket)
+        else:
+            serve_stdin()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
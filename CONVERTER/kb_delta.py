@@ -0,0 +1,179 @@
+"""
+Problem-only re-conversion for knowledge bases whose actions and types did
+not change.
+
+The source is split into clauses at the text level (no SWI-Prolog needed):
+init_state/1 and goal_state/1 are the problem side, every other clause
+(action/6, type facts, helper rules) is the domain side. The two sides are
+hashed separately, so an edit that only touches the initial state or the
+goal keeps the domain hash.
+
+For such an edit the cached JSON representation is reused with the new
+init/goal facts, and only generated_problem.pddl is written. The delta is
+applied only when it is safe:
+
+- every fact is a plain atom or a compound over atoms and integers (what
+  the extractor would return for it unchanged);
+- the native writer accepts the facts against the cached fluent
+  signatures and object types (unknown fluents or ill-typed arguments
+  raise);
+- the domain rendered from the updated representation is identical to the
+  cached generated_domain.pddl.
+
+Otherwise DeltaNotApplicable is raised and the caller runs the full
+pipeline. Fluent signatures inferred from the previous facts are kept
+as they were, as long as the new facts still fit them.
+"""
+
+import os
+import re
+import json
+import hashlib
+
+from patterns import TERM_STRING_RE, split_top_level
+
+PROBLEM_PREDICATES = ("init_state", "goal_state")
+
+CLAUSE_NAME_RE = re.compile(r'([a-z][a-zA-Z0-9_]*)')
+ATOM_RE = re.compile(r'[a-z][a-zA-Z0-9_]*$')
+INTEGER_RE = re.compile(r'-?\d+$')
+
+
+class DeltaNotApplicable(Exception):
+    """The change cannot be handled as a problem-only delta"""
+
+
+def split_clauses(text):
+    """
+    Top-level clauses of a Prolog source, without comments and with the
+    whitespace outside quoted atoms removed (so reformatting does not change
+    the hashes). The terminating '.' is dropped.
+    """
+    clauses = []
+    current = []
+    i = 0
+    n = len(text)
+    while i < n:
+        char = text[i]
+        if char in "'\"`":
+            end = i + 1
+            while end < n and text[end] != char:
+                end += 2 if text[end] == "\\" else 1
+            current.append(text[i:end + 1])
+            i = end + 1
+        elif char == "%":
+            newline = text.find("\n", i)
+            i = n if newline == -1 else newline
+        elif text.startswith("/*", i):
+            close = text.find("*/", i + 2)
+            i = n if close == -1 else close + 2
+        elif char == "." and (i + 1 == n or text[i + 1].isspace() or text[i + 1] == "%"):
+            clause = "".join(current)
+            if clause:
+                clauses.append(clause)
+            current = []
+            i += 1
+        else:
+            if not char.isspace():
+                current.append(char)
+            i += 1
+    return clauses
+
+
+def clause_name(clause):
+    match = CLAUSE_NAME_RE.match(clause)
+    return match.group(1) if match else None
+
+
+def split_source(prolog_file):
+    """(domain clauses, {problem predicate: [clauses]}) in source order"""
+    with open(prolog_file, "r") as f:
+        clauses = split_clauses(f.read())
+    domain_clauses = []
+    problem_clauses = {name: [] for name in PROBLEM_PREDICATES}
+    for clause in clauses:
+        name = clause_name(clause)
+        if name in problem_clauses and clause[len(name):].startswith("("):
+            problem_clauses[name].append(clause)
+        else:
+            domain_clauses.append(clause)
+    return domain_clauses, problem_clauses
+
+
+def _digest(clauses):
+    digest = hashlib.sha256()
+    for clause in clauses:
+        digest.update(clause.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def source_hashes(prolog_file):
+    """(domain hash, problem hash) of a knowledge base"""
+    domain_clauses, problem_clauses = split_source(prolog_file)
+    problem_side = [clause for name in PROBLEM_PREDICATES for clause in problem_clauses[name]]
+    return _digest(domain_clauses), _digest(problem_side)
+
+
+def parse_state_facts(clauses, name):
+    """
+    init_state/goal_state facts as JSON predicates ({"name", "args"}), like
+    prolog_extractor + kb_to_json would produce them
+    """
+    if not clauses:
+        return []
+    if len(clauses) > 1:
+        raise DeltaNotApplicable(f"{name} is defined more than once")
+
+    clause = clauses[0]
+    prefix = f"{name}(["
+    if not clause.startswith(prefix) or not clause.endswith("])"):
+        raise DeltaNotApplicable(f"{name} is not a plain list of facts")
+
+    facts = []
+    for item in split_top_level(clause[len(prefix):-2]):
+        if ATOM_RE.match(item):
+            facts.append({"name": item, "args": []})
+            continue
+        match = TERM_STRING_RE.match(item)
+        if not match or not ATOM_RE.match(match.group(1)):
+            raise DeltaNotApplicable(f"unsupported fact '{item}' in {name}")
+        args = split_top_level(match.group(2))
+        for arg in args:
+            if not (ATOM_RE.match(arg) or INTEGER_RE.match(arg)):
+                raise DeltaNotApplicable(f"unsupported argument '{arg}' in {name}")
+        facts.append({"name": match.group(1), "args": args})
+    return facts
+
+
+def convert_problem_delta(prolog_file, output_dir):
+    """
+    Re-convert only the problem side of prolog_file. output_dir must hold
+    the cached extracted_knowledge.json and generated_domain.pddl of the same
+    domain; the JSON is rewritten with the new facts and
+    generated_problem.pddl is written next to them.
+    Returns (knowledge, domain_file, problem_file).
+    """
+    from pddl_writer import write_problem_pddl, UnsupportedFeature
+
+    _, problem_clauses = split_source(prolog_file)
+    init_state = parse_state_facts(problem_clauses["init_state"], "init_state")
+    goal_state = parse_state_facts(problem_clauses["goal_state"], "goal_state")
+
+    json_path = os.path.join(output_dir, "extracted_knowledge.json")
+    domain_file = os.path.join(output_dir, "generated_domain.pddl")
+    with open(json_path) as f:
+        knowledge = json.load(f)
+    with open(domain_file) as f:
+        domain_text = f.read()
+
+    knowledge["init_state"] = init_state
+    knowledge["goal_state"] = goal_state
+    try:
+        problem_file = write_problem_pddl(knowledge, output_dir, domain_text)
+    except UnsupportedFeature as e:
+        raise DeltaNotApplicable(str(e))
+
+    with open(json_path, "w") as f:
+        json.dump(knowledge, f, indent=2)
+    return knowledge, domain_file, problem_file
@@ -0,0 +1,134 @@
+"""
+Machine-readable run metrics for orchestrator.py (metrics.json in the output
+directory), so benchmarks don't have to parse the human-readable summary.
+
+    {
+      "prolog_file": "PROLOG/cucinare.pl",
+      "steps": {"step1": {"wall": 0.004, "cpu": 0.004, "status": "run"}, ...,
+                "step7": {...}},
+      "total": {"wall": 0.52, "cpu": 0.49},
+      "peak_rss_bytes": {"self": 61931520, "children": 20054016},
+      "counts": {"types": 5, "objects": 5, "fluents": 8, "actions": 1,
+                 "literals": {"init": 4, "goal": 3, "actions": 7}},
+      "pddl_writer": "native",
+      "cache": {"steps 1-4": "hit", ...},
+      "planning": {"return_code": 0, "searches": [{"search": "lazy_greedy",
+                   "success": true, "plan_length": 3, "error": null,
+                   "stats": {"search_time": 0.001, "expanded_states": 4, ...}}]}
+    }
+
+Step status is "run", "cached" (restored from the pipeline cache), "delta"
+(problem-only re-conversion), "in-process" (Step 7 with a UP OneshotPlanner),
+"skipped" or "failed". CPU times include the child
+processes (the planner), peak RSS is reported separately for this process
+and for its largest child.
+"""
+
+import os
+import sys
+import json
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STEPS = ("step1", "step2", "step3", "step4", "step5", "step6", "step7")
+
+
+def cpu_time():
+    """User + system CPU seconds of this process and of its waited-for children"""
+    children = os.times()
+    return time.process_time() + children.children_user + children.children_system
+
+
+def peak_rss():
+    """Peak resident set size in bytes, {"self": ..., "children": ...} (None where unavailable)"""
+    if resource is None:
+        return {"self": None, "children": None}
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    }
+
+
+def knowledge_counts(knowledge):
+    """Sizes of the JSON intermediate representation"""
+    actions = knowledge.get("actions", [])
+    action_literals = sum(len(action.get(part, []))
+                          for action in actions
+                          for part in ("preconditions", "neg_preconditions", "add_effects", "del_effects"))
+    return {
+        "types": len(knowledge.get("types", {})),
+        "objects": len(knowledge.get("object_types", {})),
+        "fluents": len(knowledge.get("fluents", [])),
+        "actions": len(actions),
+        "literals": {
+            "init": len(knowledge.get("init_state", [])),
+            "goal": len(knowledge.get("goal_state", [])),
+            "actions": action_literals
+        }
+    }
+
+
+def read_planning_searches(output_dir):
+    """Per-search results written by run_plan.py (planning_results.json), [] if missing"""
+    results_file = os.path.join(output_dir, "planning_results.json")
+    if not os.path.exists(results_file):
+        return []
+    with open(results_file) as f:
+        return json.load(f).get("searches", [])
+
+
+class PipelineMetrics:
+    """Wall and CPU time per step, collected while the pipeline runs"""
+
+    def __init__(self, prolog_file):
+        self.prolog_file = prolog_file
+        self.steps = {}
+        self.extra = {}
+        self._started = {}
+        self._wall_start = time.perf_counter()
+        self._cpu_start = cpu_time()
+
+    def start(self, step):
+        self._started[step] = (time.perf_counter(), cpu_time())
+
+    def stop(self, step, status="run"):
+        """Close a step opened with start(); returns its wall time"""
+        if step not in self._started:
+            # Already closed (e.g. an error after the step's own work): only update the status
+            self.steps[step]["status"] = status
+            return self.steps[step]["wall"]
+        wall_start, cpu_start = self._started.pop(step)
+        wall = time.perf_counter() - wall_start
+        self.steps[step] = {"wall": wall, "cpu": cpu_time() - cpu_start, "status": status}
+        return wall
+
+    def fail_open_steps(self):
+        """Record the steps still running when the pipeline failed"""
+        for step in list(self._started):
+            self.stop(step, "failed")
+
+    def skip(self, step, status="skipped"):
+        self.steps[step] = {"wall": 0.0, "cpu": 0.0, "status": status}
+        return 0.0
+
+    def to_dict(self):
+        metrics = {
+            "prolog_file": self.prolog_file,
+            "steps": {step: self.steps[step] for step in STEPS if step in self.steps},
+            "total": {"wall": time.perf_counter() - self._wall_start, "cpu": cpu_time() - self._cpu_start},
+            "peak_rss_bytes": peak_rss()
+        }
+        metrics.update(self.extra)
+        return metrics
+
+    def write(self, output_dir):
+        metrics_path = os.path.join(output_dir, "metrics.json")
+        with open(metrics_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return metrics_path
@@ -9,295 +9,167 @@ import time
 import threading
 import time as time_module
 from datetime import datetime
-import contextlib
-from io import StringIO
+import logging
 
-from prolog_extractor import extract_prolog_knowledge, analyze_fluent_signatures, print_knowledge_summary
-from kb_to_json import knwoledge_to_json
+from planner_config import ALGORITHM_SETS
+from metrics import PipelineMetrics, knowledge_counts, read_planning_searches
+from planning import default_pool, write_planning_results, run_plan_subprocess
 
-try:
-    from prolog2up_V2 import generate_up_code
-except ImportError as e:
-    print(f"Error importing prolog2up_V2: {e}")
-    sys.exit(1)
 
-
-class OutputFilter:
-    """Utility class to filter debug output based on detailed flag"""
-    
-    def __init__(self, detailed=False):
-        self.detailed = detailed
-        self.buffer = StringIO()
+class ConsoleFormatter(logging.Formatter):
+    """Plain messages, warnings and errors prefixed with their level"""
     
-    def filter_output(self, output_text):
-        """Filter output text based on detailed flag"""
-        if self.detailed:
-            return output_text
-        
-        lines = output_text.split('\n')
-        filtered_lines = []
-        
-        skip_section = False
-        
-        for line in lines:
-            # Skip debug lines
-            if line.strip().startswith("DEBUG:"):
-                continue
-            
-            # Skip sections marked with === ... ===
-            if "===" in line and any(keyword in line.upper() for keyword in [
-                "DETECTING", "SYNCHRONIZING", "POLYMORPHIC", "DEBUG", "ANALYSIS"
-            ]):
-                skip_section = True
-                continue
-            
-            if skip_section and "=== END" in line:
-                skip_section = False
-                continue
-            
-            if skip_section:
-                continue
-            
-            # Skip detailed fluent analysis
-            if line.strip().startswith("Analyzing fluent:") or \
-               line.strip().startswith("Position ") or \
-               line.strip().startswith("Updated signature:") or \
-               line.strip().startswith("Created new supertype:"):
-                continue
-            
-            filtered_lines.append(line)
-        
-        return '\n'.join(filtered_lines)
+    def format(self, record):
+        message = super().format(record)
+        if record.levelno >= logging.WARNING:
+            return f"{record.levelname.capitalize()}: {message}"
+        return message
 
 
-def capture_function_output(func, *args, detailed=False, **kwargs):
-    """Capture function output and filter based on detailed flag"""
-    filter_obj = OutputFilter(detailed)
-    
-    # Capture stdout
-    old_stdout = sys.stdout
-    captured_output = StringIO()
-    sys.stdout = captured_output
-    
-    try:
-        result = func(*args, **kwargs)
-        output = captured_output.getvalue()
-        
-        # Filter output if not detailed
-        if not detailed:
-            filtered_output = filter_obj.filter_output(output)
-            if filtered_output.strip():
-                print(filtered_output, file=old_stdout)
-        else:
-            print(output, file=old_stdout, end='')
-        
-        return result
-    finally:
-        sys.stdout = old_stdout
+# Loggers of the converter modules (logging.getLogger(__name__))
+CONVERTER_LOGGERS = ("prolog_extractor", "type_inference", "prolog2up_V2", "pddl_writer")
 
 
-def read_and_display_detailed_planning_results(output_dir, show_full_plans=False, hide_plans=False):
+def configure_logging(detailed=False):
     """
-    Read and display detailed planning results with individual planner timings
+    Converter messages go to stdout, interleaved with the step output.
+    Debug messages only with --detailed: otherwise the converter modules
+    skip them at the level check, before formatting any argument.
     """
-    results_file = os.path.join(output_dir, "planning_results.txt")
-    
-    if not os.path.exists(results_file):
-        print("  - No planning results file found")
-        return False, {}, {}
-    
-    try:
-        with open(results_file, 'r') as f:
-            content = f.read()
-        
-        # Parse the results file to extract individual planner results
-        individual_times = {}
-        plans_found = []
-        
-        # Extract comparison table data
-        if "===== COMPARISON RESULTS =====" in content:
-            lines = content.split("\n")
-            in_table = False
-            
-            for line in lines:
-                if "===== COMPARISON RESULTS =====" in line:
-                    in_table = True
-                    continue
-                elif "===== PLANS =====" in line:
-                    in_table = False
-                    break
-                elif in_table and "|" in line and "Planner" not in line and "----" not in line:
-                    # Parse table row
-                    parts = [p.strip() for p in line.split("|") if p.strip()]
-                    if len(parts) >= 6:
-                        planner = parts[0]
-                        search = parts[1]
-                        success = parts[2] == "Yes"
-                        plan_length = parts[3] if parts[3] != "N/A" else None
-                        search_time = parts[4] if parts[4] != "N/A" else None
-                        total_time = parts[5] if parts[5] != "N/A" else None
-                        
-                        key = f"{planner}_{search}"
-                        individual_times[key] = {
-                            'success': success,
-                            'search_time': search_time,
-                            'total_time': total_time,
-                            'plan_length': plan_length
-                        }
-                        
-                        if success:
-                            plans_found.append(key)
-        
-        # Extract and display plans
-        if "===== PLANS =====" in content:
-            plans_section = content.split("===== PLANS =====")[1]
-            
-            for plan_key in plans_found:
-                if f"{plan_key} plan:" in plans_section:
-                    plan_start = plans_section.find(f"{plan_key} plan:")
-                    plan_end = plans_section.find("\n\n", plan_start)
-                    if plan_end == -1:
-                        plan_content = plans_section[plan_start:]
-                    else:
-                        plan_content = plans_section[plan_start:plan_end]
-                    
-                    lines = plan_content.split('\n')[1:]  # Skip the header line
-                    plan_steps = [line.strip() for line in lines if line.strip()]
-                    
-                    if plan_steps:
-                        timing = individual_times.get(plan_key, {})
-                        total_time = timing.get('total_time', 'N/A')
-                        print(f"    * {plan_key}:")
-                        print(f"      STATUS: Plan found ({len(plan_steps)} steps)")
-                        if total_time != 'N/A':
-                            print(f"      TIMING: {total_time}s total")
-                        
-                        # Check flags for plan display mode
-                        if hide_plans:
-                            # Hide plans mode: show ONLY status and timing
-                            pass  # Don't show any plan steps
-                        elif show_full_plans:
-                            # Show complete plan
-                            for i, step in enumerate(plan_steps):
-                                print(f"      Step {i+1:2d}: {step}")
-                        else:
-                            # Default mode: show only first 2 steps
-                            for i, step in enumerate(plan_steps[:2]):
-                                print(f"      Step {i+1:2d}: {step}")
-                            if len(plan_steps) > 2:
-                                print(f"      ... and {len(plan_steps)-2} more steps")
-                        print()
-        
-        # Check for failed planners
-        failed_planners = [key for key, data in individual_times.items() if not data['success']]
-        if failed_planners:
-            print("    * Failed planners:")
-            for planner in failed_planners:
-                print(f"      - {planner}: No solution found")
-            print()
-        
-        # Calculate detailed statistics
-        successful_times = []
-        for key, data in individual_times.items():
-            if data['success'] and data.get('total_time') and data['total_time'] != 'N/A':
-                try:
-                    time_val = float(data['total_time'])
-                    successful_times.append(time_val)
-                except (ValueError, TypeError):
-                    pass
-        
-        timing_stats = {}
-        if successful_times:
-            timing_stats = {
-                'avg_time': sum(successful_times) / len(successful_times),
-                'best_time': min(successful_times),
-                'worst_time': max(successful_times),
-                'total_time': sum(successful_times)
-            }
-        
-        return len(plans_found) > 0, individual_times, timing_stats
-        
-    except Exception as e:
-        print(f"  - Error reading planning results: {e}")
-        return False, {}, {}
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(ConsoleFormatter("%(message)s"))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    for name in CONVERTER_LOGGERS:
+        logging.getLogger(name).setLevel(logging.DEBUG if detailed else logging.INFO)
+
 
+def read_race_summary(output_dir):
+    """Notes written by run_plan.py --race ("Race winner: ...", ...) as a dict"""
+    results_file = os.path.join(output_dir, "planning_results.json")
+    summary = {}
+    if not os.path.exists(results_file):
+        return summary
+    with open(results_file, 'r') as f:
+        notes = json.load(f).get("notes", [])
+    for note in notes:
+        key, sep, value = note.partition(": ")
+        if sep and key in ("Race winner", "Time to first plan", "Cancelled"):
+            summary[key] = value.strip()
+    return summary
 
 
-def read_and_display_planning_results(output_dir):
+def display_planning_results(searches, show_full_plans=False, hide_plans=False):
     """
-    Read and display planning results from planning_results.txt (legacy function)
+    Display the plans and individual planner timings of the search records
+    (streamed by run_plan.py, or read back from planning_results.json)
     """
-    results_file = os.path.join(output_dir, "planning_results.txt")
+    if not searches:
+        print("  - No planning results received")
+        return False, {}, {}
     
-    if not os.path.exists(results_file):
-        print("  - No planning results file found")
-        return False
+    individual_times = {}
+    for search in searches:
+        key = f"{search['planner']}_{search['search']}"
+        individual_times[key] = {
+            'success': search['success'],
+            'search_time': search['stats'].get('search_time'),
+            'total_time': search['stats'].get('total_time'),
+            'plan_length': search['plan_length']
+        }
     
-    try:
-        with open(results_file, 'r') as f:
-            content = f.read()
-        
-        # Extract plans section
-        if "===== PLANS =====" in content:
-            plans_section = content.split("===== PLANS =====")[1]
-            
-            # Parse plans
-            plans_found = []
-            current_plan = None
-            plan_actions = []
-            
-            for line in plans_section.split('\n'):
-                line = line.strip()
-                if not line:
-                    if current_plan and plan_actions:
-                        plans_found.append((current_plan, plan_actions))
-                        plan_actions = []
-                    current_plan = None
-                elif line.endswith("plan:"):
-                    if current_plan and plan_actions:
-                        plans_found.append((current_plan, plan_actions))
-                    current_plan = line.replace(" plan:", "")
-                    plan_actions = []
-                elif line and current_plan:
-                    plan_actions.append(line)
-            
-            # Add last plan if exists
-            if current_plan and plan_actions:
-                plans_found.append((current_plan, plan_actions))
-            
-            if plans_found:
-                print("  - Planning results:")
-                for plan_name, plan_actions in plans_found:
-                    print(f"    * {plan_name}:")
-                    if any("FAILED" in action for action in plan_actions):
-                        for action in plan_actions:
-                            if "FAILED" in action:
-                                print(f"      ERROR: {action}")
-                    else:
-                        print(f"      STATUS: Plan found ({len(plan_actions)} steps)")
-                        for i, action in enumerate(plan_actions, 1):
-                            print(f"      Step {i:2d}: {action}")
-                    print()
-                return True
-            else:
-                print("  - No valid plans found in results file")
-                return False
+    for search in searches:
+        plan_steps = search.get('plan') or []
+        if not search['success'] or not plan_steps:
+            continue
+        total_time = search['stats'].get('total_time')
+        print(f"    * {search['planner']}_{search['search']}:")
+        print(f"      STATUS: Plan found ({len(plan_steps)} steps)")
+        if total_time is not None:
+            print(f"      TIMING: {total_time:.4f}s total")
+        
+        # Check flags for plan display mode
+        if hide_plans:
+            # Hide plans mode: show ONLY status and timing
+            pass  # Don't show any plan steps
+        elif show_full_plans:
+            # Show complete plan
+            for i, step in enumerate(plan_steps):
+                print(f"      Step {i+1:2d}: {step}")
         else:
-            print("  - Planning results file exists but no plans section found")
-            return False
-            
-    except Exception as e:
-        print(f"  - Error reading planning results: {e}")
-        return False
+            # Default mode: show only first 2 steps
+            for i, step in enumerate(plan_steps[:2]):
+                print(f"      Step {i+1:2d}: {step}")
+            if len(plan_steps) > 2:
+                print(f"      ... and {len(plan_steps)-2} more steps")
+        print()
+    
+    # Check for failed planners
+    failed_planners = [key for key, data in individual_times.items() if not data['success']]
+    if failed_planners:
+        print("    * Failed planners:")
+        for planner in failed_planners:
+            print(f"      - {planner}: No solution found")
+        print()
+    
+    # Calculate detailed statistics
+    successful_times = [data['total_time'] for data in individual_times.values()
+                        if data['success'] and data['total_time'] is not None]
+    
+    timing_stats = {}
+    if successful_times:
+        timing_stats = {
+            'avg_time': sum(successful_times) / len(successful_times),
+            'best_time': min(successful_times),
+            'worst_time': max(successful_times),
+            'total_time': sum(successful_times)
+        }
+    
+    return any(data['success'] for data in individual_times.values()), individual_times, timing_stats
 
 
 def main():
     """Main orchestrator function"""
     parser = argparse.ArgumentParser(description="Convert Prolog knowledge base to Unified Planning code")
-    parser.add_argument("prolog_file", help="Path to the Prolog file to convert")
+    parser.add_argument("prolog_file", nargs="?", help="Path to the Prolog file to convert")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="Convert every .pl file in DIR (Steps 1-6, plus Step 7 with --solve) with a pool of worker processes")
+    parser.add_argument("--output-dir",
+                        help="Write the outputs to this directory (default: RESULTS/CONVERTER/<name>_<timestamp>)")
+    parser.add_argument("--workers", type=int,
+                        help="With --batch, number of worker processes, each with its own SWI-Prolog engine "
+                             "(default: one per available core)")
     parser.add_argument("--solve", action="store_true", help="Run PDDL solver after generating files")
     parser.add_argument("--detailed", action="store_true", help="Show detailed debug information during processing")
     parser.add_argument("--verbose", "-v", action="store_true", help="Print detailed progress information (deprecated, use --detailed)")
+    parser.add_argument("--type-discovery", choices=["findall", "scan"], default="findall",
+                        help="How Step 1 discovers type facts: one findall query (default) or one query per name found in the file")
+    parser.add_argument("--pddl-writer", choices=["native", "up"], default="native",
+                        help="Write PDDL directly from the JSON (default, falls back to UP when needed) or through the UP PDDLWriter")
+    parser.add_argument("--emit-up-code", action="store_true",
+                        help="Also write the equivalent UP Python source (generated_up.py) for debugging")
+    parser.add_argument("--compact-ir", action="store_true",
+                        help="Also write the knowledge in the compact binary form (extracted_knowledge.kbir) "
+                             "and reload it from there")
+    parser.add_argument("--parallel", action="store_true",
+                        help="With --solve, run the search algorithms concurrently (one per available core)")
+    parser.add_argument("--race", action="store_true",
+                        help="With --solve, start all search algorithms at once and keep only the first plan found")
+    parser.add_argument("--in-process", action="store_true",
+                        help="With --solve, plan in this process with a Unified Planning OneshotPlanner on the in-memory "
+                             "problem (falls back to PDDL/run_plan.py when no UP engine can solve it)")
+    parser.add_argument("--up-engine", metavar="NAME",
+                        help="OneshotPlanner engine for --in-process (default: the first installed of "
+                             "fast-downward, pyperplan, enhsp, tamer)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reuse the outputs of earlier runs on the same knowledge base (RESULTS/CACHE/pipeline)")
+    parser.add_argument("--cache-dir", help="Pipeline cache directory (default: RESULTS/CACHE/pipeline)")
+    parser.add_argument("--cache-max-mb", type=float, default=500,
+                        help="Size limit of the pipeline cache, least recently used entries are evicted (default: 500)")
+    parser.add_argument("--algorithm-set", choices=sorted(ALGORITHM_SETS),
+                        help="Search algorithms for --solve from planner_config.ALGORITHM_SETS "
+                             "(default: the standard 8 algorithms, 'fast' with --race)")
     
     # Plan display options (mutually exclusive)
     plan_group = parser.add_mutually_exclusive_group()
@@ -311,22 +183,74 @@ def main():
     # Handle legacy --verbose flag
     if args.verbose:
         args.detailed = True
+    configure_logging(args.detailed)
+    
+    # The in-process planner runs one OneshotPlanner search: the run_plan.py
+    # search options would be silently ignored
+    if args.in_process:
+        ignored = [option for option, given in (("--race", args.race), ("--parallel", args.parallel),
+                                                ("--algorithm-set", args.algorithm_set)) if given]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} select the PDDL/run_plan.py searches and can't be used with --in-process")
+    
+    if args.batch:
+        if args.prolog_file:
+            parser.error("give either a Prolog file or --batch DIR, not both")
+        if args.cache:
+            parser.error("--cache is not supported with --batch")
+        if not os.path.isdir(args.batch):
+            print(f"Error: batch directory '{args.batch}' not found!")
+            return 1
+        # The workers import the converter themselves, this process never starts SWI-Prolog
+        from batch import run_batch
+        timestamp = datetime.now().strftime("%m%d_%H%M")
+        output_dir = args.output_dir or f"RESULTS/CONVERTER/batch_{timestamp}"
+        print(f"=== Prolog to PDDL Batch Conversion ===")
+        print(f"Input directory: {args.batch}")
+        print(f"Output directory: {output_dir}")
+        try:
+            _, failed, _ = run_batch(args.batch, output_dir, workers=args.workers,
+                                     type_discovery=args.type_discovery, pddl_writer=args.pddl_writer,
+                                     emit_up_code=args.emit_up_code, compact_ir=args.compact_ir, solve=args.solve,
+                                     in_process=args.in_process, up_engine=args.up_engine)
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            return 1
+        return 1 if failed else 0
+    if not args.prolog_file:
+        parser.error("the Prolog file is required (or use --batch DIR)")
     
     # Verify Prolog file exists
     if not os.path.exists(args.prolog_file):
         print(f"Error: Prolog file '{args.prolog_file}' not found!")
         return 1
     
+    # Converter modules are imported only once the arguments are valid, so
+    # --help and usage errors don't start SWI-Prolog. unified_planning itself
+    # is imported by prolog2up_V2 only when a UP object is built (--pddl-writer up,
+    # or the native writer's fallback)
+    from prolog_extractor import extract_prolog_knowledge, analyze_fluent_signatures
+    from kb_to_json import knwoledge_to_json
+    from compact_ir import write_compact_ir, load_knowledge, compact_ir_path
+    try:
+        from prolog2up_V2 import generate_up_code, build_up_problem, write_pddl
+        from pddl_writer import write_pddl_files
+    except ImportError as e:
+        print(f"Error importing prolog2up_V2: {e}")
+        return 1
+    
     # Create output directory with timestamp
     timestamp = datetime.now().strftime("%m%d_%H%M")
     filename = os.path.splitext(os.path.basename(args.prolog_file))[0]
-    output_dir = f"RESULTS/CONVERTER/{filename}_{timestamp}"
+    output_dir = args.output_dir or f"RESULTS/CONVERTER/{filename}_{timestamp}"
     
     print(f"=== Prolog to Unified Planning Conversion Pipeline ===")
     print(f"Input file: {args.prolog_file}")
     print(f"Output directory: {output_dir}")
     print(f"SOLVER: {'enabled' if args.solve else 'disabled, use --solve to enable'}")
     print(f"DETAILS: {'enabled' if args.detailed else 'disabled, use --detailed to enable'}")
+    if args.cache:
+        print(f"CACHE: enabled")
     
     # Show plan display mode
     if args.solve:
@@ -341,138 +265,194 @@ def main():
     
     # Global timer
     total_start_time = time.time()
+    metrics = PipelineMetrics(args.prolog_file)
     
     try:
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
-        # Step 1: Extract knowledge from Prolog
-        print("Step 1: Extracting knowledge from Prolog file...")
-        step1_start = time.time()
-        knowledge = capture_function_output(extract_prolog_knowledge, args.prolog_file, detailed=args.detailed)
-        step1_time = time.time() - step1_start
-        
-        if args.detailed:
-            print(f"  - Found {len(knowledge['types'])} types")
-            print(f"  - Found {len(knowledge['fluent_names'])} fluents") 
-            print(f"  - Found {len(knowledge['actions'])} actions")
-        print(f"  Completed in {step1_time:.3f} seconds")
-        
-        # Step 2: Analyze fluent signatures
-        print("\nStep 2: Analyzing fluent signatures...")
-        step2_start = time.time()
-        fluent_signatures = capture_function_output(analyze_fluent_signatures, knowledge, detailed=args.detailed)
-        knowledge['fluent_signatures'] = fluent_signatures
-        step2_time = time.time() - step2_start
-        
-        if args.detailed:
-            print(f"  - Analyzed signatures for {len(fluent_signatures)} fluents")
-        print(f"  Completed in {step2_time:.3f} seconds")
-        
-        # Step 3: Convert to structured JSON
-        print("\nStep 3: Converting knowledge to structured JSON...")
-        step3_start = time.time()
-        structured_knowledge = capture_function_output(knwoledge_to_json, knowledge, detailed=args.detailed)
-        step3_time = time.time() - step3_start
-        print(f"  Completed in {step3_time:.3f} seconds")
-        
-        # Step 4: Save JSON
-        print("\nStep 4: Saving structured knowledge to JSON file...")
-        step4_start = time.time()
+        # Pipeline cache (--cache): a hit restores the step outputs into output_dir
+        cache = None
+        if args.cache:
+            from pipeline_cache import (PipelineCache, CACHE_DIR, CONVERSION_FILES, PDDL_FILES, UP_CODE_FILE,
+                                        PLANNING_FILES, DOMAIN_FILES, conversion_key, pddl_key, planning_key,
+                                        domain_key)
+            from kb_delta import source_hashes, convert_problem_delta, DeltaNotApplicable
+            cache = PipelineCache(args.cache_dir or CACHE_DIR, int(args.cache_max_mb * 1024 * 1024))
+            knowledge_key = conversion_key(args.prolog_file, args.type_discovery)
+            files_key = pddl_key(knowledge_key, args.pddl_writer, args.emit_up_code)
+            # Problem-only re-conversion reuses a domain written by the native writer
+            delta_key = None
+            if args.pddl_writer == "native" and not args.emit_up_code:
+                delta_key = domain_key(source_hashes(args.prolog_file)[0], args.type_discovery)
+        
+        structured_knowledge = None
         json_output_path = os.path.join(output_dir, "extracted_knowledge.json")
-        with open(json_output_path, 'w') as f:
-            json.dump(structured_knowledge, f, indent=2)
-        step4_time = time.time() - step4_start
-        
-        print(f"  - Saved structured knowledge: {json_output_path}")
-        print(f"  Completed in {step4_time:.3f} seconds")
-        
-        # Step 5: Generate UP code
-        print("\nStep 5: Generating Unified Planning code...")
-        step5_start = time.time()
-        
-        # Capture output from UP code generation
-        old_stdout = sys.stdout
-        captured_output = StringIO()
-        sys.stdout = captured_output
-        
-        try:
-            up_code = generate_up_code(structured_knowledge, output_dir)
-            output = captured_output.getvalue()
+        # With --compact-ir the knowledge is reloaded from the .kbir, always written (or restored) with the JSON
+        knowledge_path = compact_ir_path(json_output_path) if args.compact_ir else json_output_path
+        if cache:
+            conversion_files = CONVERSION_FILES + ((os.path.basename(knowledge_path),) if args.compact_ir else ())
+        metrics.start("step1")
+        knowledge_hit = cache is not None and cache.restore("steps 1-4", knowledge_key, conversion_files, output_dir) is not None
+        
+        # Same actions and types as a cached run: only init_state/goal_state need converting
+        problem_delta = None
+        if cache and not knowledge_hit and delta_key and cache.restore("domain", delta_key, DOMAIN_FILES, output_dir) is not None:
+            try:
+                problem_delta = convert_problem_delta(args.prolog_file, output_dir)
+            except DeltaNotApplicable as e:
+                print(f"Problem-only re-conversion not applicable ({e}), running the full conversion\n")
+        
+        if knowledge_hit:
+            step1_time = metrics.stop("step1", "cached")
+            step2_time = step3_time = step4_time = 0.0
+            for step in ("step2", "step3", "step4"):
+                metrics.skip(step, "cached")
+            print("Steps 1-4: cache hit, reusing extracted knowledge")
+            print(f"  - Restored structured knowledge: {json_output_path}")
+            print(f"  Completed in {step1_time:.3f} seconds")
+        elif problem_delta is not None:
+            structured_knowledge, domain_file, problem_file = problem_delta
+            step1_time = metrics.stop("step1", "delta")
+            step2_time = step3_time = step4_time = 0.0
+            for step in ("step2", "step3", "step4"):
+                metrics.skip(step, "delta")
+            print("Steps 1-4: only init_state/goal_state changed, reusing the cached domain knowledge")
+            if args.compact_ir:
+                write_compact_ir(structured_knowledge, knowledge_path)
+            print(f"  - Updated structured knowledge: {json_output_path}")
+            print(f"  Completed in {step1_time:.3f} seconds")
+            cache.store(knowledge_key, conversion_files, output_dir)
+        else:
+            # Step 1: Extract knowledge from Prolog
+            print("Step 1: Extracting knowledge from Prolog file...")
+            metrics.start("step1")
+            knowledge = extract_prolog_knowledge(args.prolog_file, discovery=args.type_discovery)
+            step1_time = metrics.stop("step1")
+        
+            if args.detailed:
+                print(f"  - Found {len(knowledge['types'])} types")
+                print(f"  - Found {len(knowledge['fluent_names'])} fluents") 
+                print(f"  - Found {len(knowledge['actions'])} actions")
+            print(f"  Completed in {step1_time:.3f} seconds")
+        
+            # Step 2: Analyze fluent signatures
+            print("\nStep 2: Analyzing fluent signatures...")
+            metrics.start("step2")
+            fluent_signatures = analyze_fluent_signatures(knowledge)
+            knowledge['fluent_signatures'] = fluent_signatures
+            step2_time = metrics.stop("step2")
+        
+            if args.detailed:
+                print(f"  - Analyzed signatures for {len(fluent_signatures)} fluents")
+            print(f"  Completed in {step2_time:.3f} seconds")
+        
+            # Step 3: Convert to structured JSON
+            print("\nStep 3: Converting knowledge to structured JSON...")
+            metrics.start("step3")
+            structured_knowledge = knwoledge_to_json(knowledge)
+            step3_time = metrics.stop("step3")
+            print(f"  Completed in {step3_time:.3f} seconds")
+        
+            # Step 4: Save JSON
+            print("\nStep 4: Saving structured knowledge to JSON file...")
+            metrics.start("step4")
+            json_output_path = os.path.join(output_dir, "extracted_knowledge.json")
+            with open(json_output_path, 'w') as f:
+                json.dump(structured_knowledge, f, indent=2)
+            if args.compact_ir:
+                write_compact_ir(structured_knowledge, knowledge_path)
+            step4_time = metrics.stop("step4")
+        
+            print(f"  - Saved structured knowledge: {json_output_path}")
+            if args.compact_ir:
+                print(f"  - Saved compact knowledge: {knowledge_path}")
+            print(f"  Completed in {step4_time:.3f} seconds")
             
-            # Filter output if not detailed
-            if not args.detailed:
-                filter_obj = OutputFilter(args.detailed)
-                filtered_output = filter_obj.filter_output(output)
-                if filtered_output.strip():
-                    print(filtered_output, file=old_stdout)
+            if cache:
+                cache.store(knowledge_key, conversion_files, output_dir)
+        
+        metrics.start("step6")
+        cached_pddl = None
+        problem = None
+        if cache:
+            pddl_files = PDDL_FILES + ((UP_CODE_FILE,) if args.emit_up_code else ())
+        if problem_delta is not None:
+            # Written by convert_problem_delta together with the JSON
+            cached_pddl = {"pddl_writer": "native"}
+            cache.report["steps 5-6"] = "problem only"
+            print("\nSteps 5-6: cached PDDL domain reused, problem file regenerated")
+            cache.store(files_key, pddl_files, output_dir, cached_pddl)
+        elif cache:
+            cached_pddl = cache.restore("steps 5-6", files_key, pddl_files, output_dir)
+            if cached_pddl is not None:
+                print("\nSteps 5-6: cache hit, reusing PDDL files")
+        if cached_pddl is not None:
+            pddl_status = "delta" if problem_delta is not None else "cached"
+            step5_time = metrics.skip("step5", pddl_status)
+            step6_time = metrics.stop("step6", pddl_status)
+            domain_file = os.path.join(output_dir, "generated_domain.pddl")
+            problem_file = os.path.join(output_dir, "generated_problem.pddl")
+            pddl_writer = cached_pddl["pddl_writer"]
+            print(f"  - Writer: {'native' if pddl_writer == 'native' else 'Unified Planning PDDLWriter'}")
+            print(f"  - PDDL domain: {domain_file}")
+            print(f"  - PDDL problem: {problem_file}")
+            print(f"  Completed in {step6_time:.3f} seconds")
+        else:
+            if structured_knowledge is None:
+                structured_knowledge = load_knowledge(knowledge_path)
+            
+            # Step 5: Build the UP problem in memory (only needed by the UP writer)
+            if args.pddl_writer == "up":
+                print("\nStep 5: Building Unified Planning problem...")
             else:
-                print(output, file=old_stdout, end='')
-        finally:
-            sys.stdout = old_stdout
-        
-        # Save UP code
-        up_output_path = os.path.join(output_dir, "generated_up.py")
-        with open(up_output_path, 'w') as f:
-            f.write(up_code)
-        step5_time = time.time() - step5_start
-        
-        print(f"  - Generated UP code: {up_output_path}")
-        print(f"  Completed in {step5_time:.3f} seconds")
-        
-        # Step 6: Execute generated UP code to create PDDL files
-        print("\nStep 6: Executing generated UP code to create PDDL files...")
-        
-        # step6_start = time.time()
+                print("\nStep 5: Native PDDL writer, no Unified Planning problem needed")
+            metrics.start("step5")
+        
+            # The UP source is only a debug artifact
+            if args.emit_up_code:
+                up_code = generate_up_code(structured_knowledge, output_dir)
+                up_output_path = os.path.join(output_dir, "generated_up.py")
+                with open(up_output_path, 'w') as f:
+                    f.write(up_code)
+                print(f"  - Generated UP code: {up_output_path}")
+        
+            if args.pddl_writer == "up":
+                problem = build_up_problem(structured_knowledge)
+                if args.detailed:
+                    print(f"  - Problem with {len(problem.fluents)} fluents, {len(problem.all_objects)} objects, {len(problem.actions)} actions")
+            step5_time = metrics.stop("step5")
+            print(f"  Completed in {step5_time:.3f} seconds")
+        
+            # Step 6: Write PDDL files
+            print("\nStep 6: Writing PDDL files...")
+            metrics.start("step6")
+            if problem is not None:
+                domain_file, problem_file = write_pddl(problem, output_dir)
+                pddl_writer = "up"
+            else:
+                domain_file, problem_file, pddl_writer = write_pddl_files(structured_knowledge, output_dir)
+            step6_time = metrics.stop("step6")
         
-        # # Try normal execution
-        # try:
-        #     # Execute generated file
-        #     result = subprocess.run([
-        #         sys.executable, "generated_up.py"
-        #     ], capture_output=True, text=True, cwd=output_dir)
-            
-        #     if result.returncode == 0:
-        #         print("  - Successfully executed generated UP code")
-        #         if args.detailed and result.stdout:
-        #             print(f"  - Output: {result.stdout.strip()}")
-        #     else:
-        #         print(f"  - Error executing generated UP code:")
-        #         if result.stderr:
-        #             print(f"    {result.stderr.strip()}")
-        #         if result.stdout:
-        #             print(f"    {result.stdout.strip()}")
-        #         raise Exception("UP code execution failed")
-        # except Exception as e:
-        #     print(f"  - Exception while executing generated UP code: {e}")
+            print(f"  - Writer: {'native' if pddl_writer == 'native' else 'Unified Planning PDDLWriter'}")
+            print(f"  - PDDL domain: {domain_file}")
+            print(f"  - PDDL problem: {problem_file}")
+            print(f"  Completed in {step6_time:.3f} seconds")
             
-        #     print("  - Trying fallback execution method...")
-        #     try:
-        #         original_cwd = os.getcwd()
-        #         os.chdir(output_dir)
-                
-        #         # Dynamic import and execution
-        #         import importlib.util
-        #         spec = importlib.util.spec_from_file_location("generated_up", "generated_up.py")
-        #         generated_module = importlib.util.module_from_spec(spec)
-        #         spec.loader.exec_module(generated_module)
-                
-        #         print("  - Fallback execution successful")
-        #     except Exception as fallback_e:
-        #         print(f"  - Fallback execution also failed: {fallback_e}")
-        #         raise fallback_e
-        #     finally:
-        #         os.chdir(original_cwd)
+            if cache:
+                cache.store(files_key, pddl_files, output_dir, {"pddl_writer": pddl_writer})
+                if delta_key and pddl_writer == "native":
+                    cache.store(delta_key, DOMAIN_FILES, output_dir)
         
-        # step6_time = time.time() - step6_start
-        # print(f"  Completed in {step6_time:.3f} seconds")
-        print("\nStep 6: Skipping PDDL generation (commented for benchmarks)")
-        step6_time = 0.0
+        if structured_knowledge is None:
+            structured_knowledge = load_knowledge(knowledge_path)
+        metrics.extra["counts"] = knowledge_counts(structured_knowledge)
+        metrics.extra["pddl_writer"] = pddl_writer
         
         # Step 7: Planning (if requested)
         if args.solve:
             print("\nStep 7: Running PDDL solver...")
-            step7_start = time.time()
+            metrics.start("step7")
             
             # Verify PDDL files exist
             domain_file = os.path.join(output_dir, "generated_domain.pddl")
@@ -483,76 +463,113 @@ def main():
                 return 1
             
             # Run planner with extended configuration
+            results_name = "planning_results.txt"
             try:
-                run_plan_script = "PDDL/run_plan.py"
-                if not os.path.exists(run_plan_script):
-                    print(f"  - Error: Solver script '{run_plan_script}' not found!")
-                    return 1
+                # In process: the UP problem goes straight to a OneshotPlanner,
+                # run_plan.py is the fallback
+                searches = None
+                if args.in_process:
+                    print("  - In-process planning with a Unified Planning OneshotPlanner")
+                    try:
+                        if problem is None:
+                            # Native writer or cached PDDL: no problem built yet
+                            problem = build_up_problem(structured_knowledge)
+                        searches = [default_pool(args.up_engine).solve(problem, timeout=60)]
+                    except Exception as e:
+                        # No suitable engine installed, or a problem UP can't build or solve
+                        print(f"  - In-process planning not available ({e}), falling back to run_plan.py")
                 
-                # Extended list of search algorithms with smart timeouts
-                search_algorithms = [
-                    "lazy_greedy", "astar_ff", "astar_blind", "eager_greedy", 
-                    "astar_lmcut", "wastar", "lazy_wastar", "astar_lmcount"
-                ]
+                if searches is not None:
+                    print(f"  - Engine: {searches[0]['planner']}")
+                    write_planning_results(output_dir, searches)
+                    return_code = 0 if searches[0]['success'] else 1
+                    planning_status = "in-process"
+                    results_name = "planning_results.json"
+                else:
+                    run_plan_script = "PDDL/run_plan.py"
+                    if not os.path.exists(run_plan_script):
+                        print(f"  - Error: Solver script '{run_plan_script}' not found!")
+                        return 1
                 
-                print(f"  - Testing {len(search_algorithms)} algorithms: {', '.join(search_algorithms)}")
-                print("  - Algorithms will have smart timeouts (30-90s each based on complexity)")
-                print()
+                    # Extended list of search algorithms with smart timeouts
+                    if args.algorithm_set:
+                        search_algorithms = ALGORITHM_SETS[args.algorithm_set]
+                    elif args.race:
+                        search_algorithms = ALGORITHM_SETS["fast"]
+                    else:
+                        search_algorithms = [
+                            "lazy_greedy", "astar_ff", "astar_blind", "eager_greedy", 
+                            "astar_lmcut", "wastar", "lazy_wastar", "astar_lmcount"
+                        ]
                 
-                # Planner command with smart timeout (reduced from 120 to 60 default)
-                planner_cmd = [
-                    sys.executable, run_plan_script,
-                    domain_file, problem_file,
-                    "--output-dir", output_dir,
-                    "--planners", "fd",
-                    "--searches"] + search_algorithms + [
-                    "--timeout", "60",  # Default timeout, but algorithms use smart timeouts
-                    "--verbose"  # Enable verbose output for real-time feedback
-                ]
+                    if args.race:
+                        print(f"  - Racing {len(search_algorithms)} algorithms, first plan wins: {', '.join(search_algorithms)}")
+                    else:
+                        print(f"  - Testing {len(search_algorithms)} algorithms: {', '.join(search_algorithms)}")
+                    print("  - Algorithms will have smart timeouts (30-90s each based on complexity)")
+                    print()
                 
-                # Execute command with REAL-TIME output streaming
-                print(f"  - Starting planning process with real-time feedback...")
-                print()
+                    # Planner command with smart timeout (reduced from 120 to 60 default)
+                    planner_cmd = [
+                        sys.executable, run_plan_script,
+                        domain_file, problem_file,
+                        "--output-dir", output_dir,
+                        "--planners", "fd",
+                        "--searches"] + search_algorithms + [
+                        "--timeout", "60",  # Default timeout, but algorithms use smart timeouts
+                        "--verbose",  # Enable verbose output for real-time feedback
+                        "--stream-results"  # One JSON record per finished search
+                    ]
+                    if args.race:
+                        planner_cmd.append("--race")
+                    elif args.parallel:
+                        planner_cmd.append("--parallel")
+                    if args.cache:
+                        # SAS+ translations are kept across runs too
+                        planner_cmd.append("--sas-cache")
                 
-                # Use Popen for real-time output
-                process = subprocess.Popen(
-                    planner_cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,  # Line buffered
-                    universal_newlines=True
-                )
+                    # Same PDDL and planner configuration: reuse the stored results
+                    if cache:
+                        results_key = planning_key(files_key, {"searches": search_algorithms, "race": args.race, "timeout": 60})
+                    if cache and cache.restore("step 7", results_key, PLANNING_FILES, output_dir) is not None:
+                        print(f"  - Cache hit: reusing planning_results.txt")
+                        return_code = 0
+                        planning_status = "cached"
+                        searches = read_planning_searches(output_dir)
+                    else:
+                        # Execute command with REAL-TIME output streaming
+                        print(f"  - Starting planning process with real-time feedback...")
+                        print()
                 
-                # Read output in real-time and display with prefix
-                output_lines = []
-                while True:
-                    line = process.stdout.readline()
-                    if not line:
-                        break
+                        # Planner output is shown with a prefix, the search records are collected
+                        def show_planner_line(line):
+                            print(f"    {line}")
+                            sys.stdout.flush()  # Force immediate output
+                        return_code, searches = run_plan_subprocess(planner_cmd, show_planner_line)
+                        planning_status = "run"
                     
-                    # Remove trailing newline and add prefix for clarity
-                    clean_line = line.rstrip()
-                    if clean_line:
-                        # Add prefix to distinguish planner output from orchestrator output
-                        prefixed_line = f"    {clean_line}"
-                        print(prefixed_line)
-                        output_lines.append(clean_line)
-                        sys.stdout.flush()  # Force immediate output
-                
-                # Wait for process to complete
-                return_code = process.wait()
+                        # Only complete runs are worth replaying
+                        if cache and return_code == 0:
+                            cache.store(results_key, PLANNING_FILES, output_dir)
                 
-                step7_time = time.time() - step7_start
+                step7_time = metrics.stop("step7", planning_status)
+                metrics.extra["planning"] = {"return_code": return_code,
+                                             "searches": [{key: value for key, value in search.items() if key != "plan"}
+                                                          for search in searches]}
                 
                 print()  # Add spacing after real-time output
                 
                 if return_code == 0:
-                    print("  - Planning successful! Results saved to planning_results.txt")
+                    print(f"  - Planning successful! Results saved to {results_name}")
                     print("  - Planning results:")
-                    # Read and display detailed results with individual timings
-                    plan_found, individual_times, timing_stats = read_and_display_detailed_planning_results(output_dir, args.show_full_plans, args.hide_plans)
+                    # Display detailed results with individual timings
+                    plan_found, individual_times, timing_stats = display_planning_results(searches, args.show_full_plans, args.hide_plans)
 
+                    if args.race:
+                        race_summary = read_race_summary(output_dir)
+                        if race_summary:
+                            print(f"  - Race winner: {race_summary.get('Race winner', 'none')}")
+                            print(f"  - Time to first plan: {race_summary.get('Time to first plan', 'N/A')}")
                     
                     # Show IMPROVED summary with timing statistics  
                     if individual_times:
@@ -574,9 +591,9 @@ def main():
                 else:
                     print(f"  - Planning failed with return code {return_code}")
                     
-                    # Try to read partial results anyway
+                    # The searches that finished before the failure were streamed anyway
                     print("  - Checking for partial results...")
-                    plan_found, individual_times, timing_stats = read_and_display_detailed_planning_results(output_dir, args.show_full_plans, args.hide_plans)
+                    plan_found, individual_times, timing_stats = display_planning_results(searches, args.show_full_plans, args.hide_plans)
 
                     
                     if individual_times:
@@ -591,12 +608,12 @@ def main():
                 print(f"  Completed in {step7_time:.3f} seconds")
                 
             except subprocess.TimeoutExpired:
-                step7_time = time.time() - step7_start
+                step7_time = metrics.stop("step7", "timeout")
                 print(f"  - Planning process timed out after {step7_time:.1f} seconds")
                 print(f"  - This usually means the problem is very complex")
                 print(f"  - Try reducing the number of algorithms or increasing timeout")
             except Exception as e:
-                step7_time = time.time() - step7_start
+                step7_time = metrics.stop("step7", "error")
                 print(f"  - Error running planner: {e}")
                 print(f"  - Planning attempt took {step7_time:.3f} seconds")
                 if args.detailed:
@@ -611,11 +628,14 @@ def main():
         print("=== Conversion Pipeline Completed Successfully ===")
         print(f"Generated files in: {output_dir}")
         print(f"  - JSON knowledge: extracted_knowledge.json")
-        print(f"  - UP Python code: generated_up.py")
+        if args.compact_ir:
+            print(f"  - Compact knowledge: extracted_knowledge.kbir")
+        if args.emit_up_code:
+            print(f"  - UP Python code: generated_up.py")
         print(f"  - PDDL domain: generated_domain.pddl")
         print(f"  - PDDL problem: generated_problem.pddl")
         if args.solve:
-            print(f"  - Planning results: planning_results.txt")
+            print(f"  - Planning results: {results_name}")
         
         print(f"\nTotal execution time: {total_time:.5f} seconds")
         print(f"  Step 1 (Extraction): {step1_time:.5f}s")
@@ -626,13 +646,21 @@ def main():
         if args.solve:
             print(f"  Step 7 (Planning): {step7_time:.5f}s ← Total planning overhead")
             print(f"    └─ Actual solver time: varies by algorithm (see timing analysis above)")
+        if cache:
+            print(f"  Cache: {cache.summary()}")
+            metrics.extra["cache"] = cache.report
         
+        print(f"  Metrics: {metrics.write(output_dir)}")
         return 0
         
     except Exception as e:
         total_time = time.time() - total_start_time
         print(f"\nError during conversion pipeline: {e}")
         print(f"Pipeline failed after {total_time:.5f} seconds")
+        if os.path.isdir(output_dir):
+            metrics.fail_open_steps()
+            metrics.extra["error"] = str(e)
+            metrics.write(output_dir)
         if args.detailed:
             import traceback
             traceback.print_exc()
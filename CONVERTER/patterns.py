@@ -0,0 +1,122 @@
+"""
+Precompiled regular expressions shared by the converter modules, plus
+memoized parsers for the predicate strings they are applied to.
+
+The same fluent strings are matched many times per run (once per fluent,
+per action, per section), so the parsers cache their result keyed by the
+input string. Set PROLOG2UP_PARSE_CACHE=0 to disable the caches, e.g. to
+measure their effect with benchmark_parse_cache.py.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+PARSE_CACHE_SIZE = int(os.environ.get("PROLOG2UP_PARSE_CACHE", "8192"))
+
+# Prolog identifiers and flattened PySwip terms
+IDENTIFIER_RE = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*$')
+TERM_STRING_RE = re.compile(r'([^\s(\[]+)\((.*)\)$', re.DOTALL)
+
+# Source scan (--type-discovery scan)
+TYPE_FACT_RE = re.compile(r'^([a-zA-Z_][a-zA-Z0-9_]*)\([^)]+\)\s*\.', re.MULTILINE)
+CALL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\([^)]+\)')
+
+# Fluent, constraint and effect strings
+FLUENT_RE = re.compile(r'([a-zA-Z_]+)\((.*?)\)')
+FLUENT_NAME_RE = re.compile(r'[a-zA-Z_]+')
+TYPED_FLUENT_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\((.*?)\)')
+TYPE_CONSTRAINT_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\(([^)]+)\)')
+ADD_EFFECT_RE = re.compile(r'add\((.*?)\)')
+DEL_EFFECT_RE = re.compile(r'del\((.*?)\)')
+
+# JSON intermediate representation
+PREDICATE_RE = re.compile(r'\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\(\s*(.*?)\s*\)\s*$')
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def match_fluent(text):
+    """(name, args) of a FLUENT_RE match at the start of text, or None"""
+    match = FLUENT_RE.match(text)
+    if not match:
+        return None
+    return match.group(1), tuple(p.strip() for p in match.group(2).split(','))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def match_typed_fluent(text):
+    """(name, args) of a TYPED_FLUENT_RE match at the start of text, or None"""
+    match = TYPED_FLUENT_RE.match(text)
+    if not match:
+        return None
+    return match.group(1), tuple(arg.strip() for arg in match.group(2).split(','))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def match_type_constraint(constraint):
+    """(type_name, params) of a 'type(P1, P2)' constraint string, or None"""
+    match = FLUENT_RE.match(constraint)
+    if not match:
+        return None
+    type_name = match.group(1)
+    param_names = match.group(2)
+    if ',' in param_names:
+        params = tuple(p.strip() for p in param_names.split(',') if p.strip())
+    else:
+        params = (param_names.strip(),)
+    return type_name, params
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def effect_inner(effect):
+    """Fluent string inside an add(...) or del(...) effect, or None"""
+    match = ADD_EFFECT_RE.search(effect) or DEL_EFFECT_RE.search(effect)
+    return match.group(1) if match else None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_predicate_parts(pred_str):
+    """(name, args) of a predicate string as used in the JSON representation"""
+    match = PREDICATE_RE.match(pred_str)
+    if not match:
+        return pred_str.strip(), ()
+    name, args_str = match.group(1), match.group(2).strip()
+    args = tuple(a.strip() for a in args_str.split(',')) if args_str else ()
+    return name, args
+
+
+def split_top_level(args_str):
+    """Split on the commas outside any (...) or [...] nesting"""
+    parts = []
+    current = ""
+    depth = 0
+    
+    for char in args_str:
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            if char in '([':
+                depth += 1
+            elif char in ')]':
+                depth -= 1
+            current += char
+    
+    if current.strip():
+        parts.append(current.strip())
+    
+    return parts
+
+
+_CACHED_PARSERS = (match_fluent, match_typed_fluent, match_type_constraint,
+                   effect_inner, parse_predicate_parts)
+
+
+def clear_parse_caches():
+    for parser in _CACHED_PARSERS:
+        parser.cache_clear()
+
+
+def parse_cache_info():
+    """Hit/miss counters of every memoized parser, keyed by function name"""
+    return {parser.__name__: parser.cache_info()._asdict() for parser in _CACHED_PARSERS}
@@ -0,0 +1,331 @@
+"""
+Native PDDL writer for the JSON intermediate representation.
+
+Writes generated_domain.pddl and generated_problem.pddl without importing
+unified_planning, for the classical subset the converter produces: Boolean
+fluents, typed parameters, preconditions, negative preconditions (with
+Exists over wildcard arguments), inequalities between same-type parameters
+and add/del effects. Types, signatures and object types are resolved with
+the same helpers, in the same order, as prolog2up_V2.build_up_problem, so
+the output matches what PDDLWriter writes for that problem.
+
+Whatever needs more than that (names PDDLWriter would have to mangle,
+ill-typed or unknown arguments, name clashes UP rejects, ...) raises
+UnsupportedFeature; write_pddl_files then falls back to build_up_problem
+and the UP PDDLWriter.
+"""
+
+import os
+import re
+import logging
+
+from prolog2up_V2 import (
+    convert_numbers_to_strings,
+    generate_supertype_definitions,
+    additional_type_declarations,
+    collect_all_fluents_from_knowledge,
+    resolve_fluent_signature,
+    extract_string_objects_from_knowledge,
+    resolve_object_type,
+    resolve_action_types,
+    action_parameter_type,
+    plan_negative_preconditions,
+    same_type_parameter_pairs,
+)
+
+logger = logging.getLogger(__name__)
+
+DOMAIN_NAME = "from_prolog-domain"
+PROBLEM_NAME = "from_prolog-problem"
+
+PDDL_NAME_RE = re.compile(r'[a-z][a-z0-9_-]*$')
+
+# Names PDDLWriter renames (GENERAL_PDDL_KEYWORDS, plus the implicit root type)
+PDDL_KEYWORDS = frozenset({
+    "define", "domain", "requirements", "types", "constants", "predicates",
+    "problem", "either", "number", "action", "parameters", "precondition",
+    "effect", "and", "forall", "or", "not", "imply", "exists", "scale-up",
+    "scale-down", "increase", "decrease", "derived", "objects", "init", "goal",
+    "when", "metric", "minimize", "maximize", "total-time", "strips",
+    "negative-preconditions", "typing", "disjunctive-preconditions", "equality",
+    "existential-preconditions", "universal-preconditions",
+    "quantified-preconditions", "conditional-effects", "fluents", "adl",
+    "durative-actions", "derived-predicates", "timed-initial-literals",
+    "timed-initial-effects", "contingent", "time", "continuous-effects",
+    "object",
+})
+
+
+class UnsupportedFeature(Exception):
+    """The knowledge needs something only the UP PDDLWriter handles"""
+
+
+def _pddl_name(name):
+    lowered = name.lower()
+    if not PDDL_NAME_RE.match(lowered) or lowered in PDDL_KEYWORDS:
+        raise UnsupportedFeature(f"name '{name}' would be renamed by PDDLWriter")
+    return lowered
+
+
+def _lookup(namespace, name, *kinds):
+    entry = namespace.get(name)
+    if entry is None or entry[0] not in kinds:
+        raise UnsupportedFeature(f"'{name}' is not a {' or '.join(kinds)}")
+    return entry
+
+
+class _Model:
+    """Plain-data counterpart of the Problem built by build_up_problem"""
+
+    def __init__(self):
+        self.types = []            # PDDL type names, in order of first use
+        self.predicates = []       # (name, [type, ...])
+        self.objects = []          # (name, type)
+        self.constants = set()     # objects referenced by actions
+        self.init = {}             # facts, as an ordered set
+        self.goals = []
+        self.actions = []          # (name, [(param, type)], [precondition], [effect])
+        self.requirements = set()
+        self.global_names = {}     # lowered name -> original name
+
+    def use_type(self, type_name):
+        if type_name not in self.types:
+            self.claim_name(type_name)
+            self.types.append(type_name)
+
+    def claim_name(self, name):
+        """UP rejects duplicate names, PDDLWriter renames case-insensitive clashes"""
+        pddl_name = _pddl_name(name)
+        if pddl_name in self.global_names:
+            raise UnsupportedFeature(f"name '{name}' clashes with '{self.global_names[pddl_name]}'")
+        self.global_names[pddl_name] = name
+        return pddl_name
+
+
+def build_pddl_model(knowledge):
+    """Resolve knowledge into a _Model, mirroring build_up_problem step by step"""
+    knowledge = convert_numbers_to_strings(knowledge)
+    model = _Model()
+    namespace = {}
+
+    def declare_type(var, up_name):
+        namespace[var] = ("type", up_name)
+
+    def type_of(var):
+        type_name = _pddl_name(_lookup(namespace, var, "type")[1])
+        model.use_type(type_name)
+        return type_name
+
+    def expression(fluent_name, args, in_action=False):
+        _, pred_name, param_types = _lookup(namespace, fluent_name, "fluent")
+        if len(args) != len(param_types):
+            raise UnsupportedFeature(f"{fluent_name} takes {len(param_types)} arguments, got {len(args)}")
+        terms = []
+        for arg, param_type in zip(args, param_types):
+            kind, arg_name, arg_type = _lookup(namespace, arg, "object", "parameter", "variable")
+            if arg_type != param_type:
+                raise UnsupportedFeature(f"{arg} of type {arg_type} used as {param_type} in {fluent_name}")
+            if kind == "object":
+                if in_action:
+                    model.constants.add(arg_name)
+                terms.append(arg_name)
+            else:
+                terms.append(f"?{arg_name}")
+        return f"({' '.join([pred_name] + terms)})"
+
+    # Types
+    for t in knowledge.types:
+        declare_type(t.capitalize(), t)
+    supertype_lines, supertype_objects = generate_supertype_definitions(knowledge)
+    for supertype_name in supertype_objects:
+        declare_type(supertype_name, supertype_name.lower())
+    for var, up_name in additional_type_declarations(knowledge):
+        declare_type(var, up_name)
+
+    all_fluents = collect_all_fluents_from_knowledge(knowledge)
+
+    # Predicates
+    created_additional_types = set()
+    for f in all_fluents:
+        params = resolve_fluent_signature(knowledge, f, created_additional_types, declare_type)
+        param_types = [type_of(resolved_type) for _, resolved_type in params]
+        namespace[f] = ("fluent", model.claim_name(f), param_types)
+        model.predicates.append((namespace[f][1], param_types))
+
+    # Objects
+    for obj in extract_string_objects_from_knowledge(knowledge):
+        effective_type = resolve_object_type(obj, knowledge, supertype_objects, created_additional_types, declare_type)
+        namespace[obj] = ("object", model.claim_name(obj), type_of(effective_type))
+        model.objects.append(namespace[obj][1:])
+
+    # Initial state (set_initial_value keeps one entry per fluent) and goals
+    for pred in knowledge.init_state:
+        model.init.setdefault(expression(pred.name, pred.args), None)
+    for pred in knowledge.goal_state:
+        model.goals.append(expression(pred.name, pred.args))
+
+    # Actions
+    for act in knowledge.actions:
+        name = act.name
+        params = act.parameters
+        types = resolve_action_types(knowledge, act)
+
+        action_name = model.claim_name(name)
+        namespace[name] = ("action", action_name)
+        parameters = []
+        for p in params:
+            param_type = type_of(action_parameter_type(types.get(p, 'object'), knowledge))
+            parameters.append((_pddl_name(p), param_type))
+            namespace[p] = ("parameter", parameters[-1][0], param_type)
+        if len({param for param, _ in parameters}) != len(parameters):
+            raise UnsupportedFeature(f"parameters of {name} clash once lowercased")
+
+        preconditions = []
+
+        def add_precondition(condition):
+            # add_precondition skips conditions already present
+            if condition not in preconditions:
+                preconditions.append(condition)
+
+        for pre in act.preconditions:
+            add_precondition(expression(pre.name, pre.args, in_action=True))
+
+        for pname, expr, vars_for_exists in plan_negative_preconditions(knowledge, name, act):
+            variables = []
+            for var, type_name in vars_for_exists:
+                namespace[var] = ("variable", _pddl_name(var), type_of(type_name))
+                variables.append(f"?{namespace[var][1]} - {namespace[var][2]}")
+            condition = expression(pname, expr, in_action=True)
+            if variables:
+                condition = f"(exists ({' '.join(variables)}) {condition})"
+                model.requirements.add(":existential-preconditions")
+            add_precondition(f"(not {condition})")
+            model.requirements.add(":negative-preconditions")
+
+        for first, second in same_type_parameter_pairs(params, types):
+            first_term = _lookup(namespace, first, "parameter")[1]
+            second_term = _lookup(namespace, second, "parameter")[1]
+            add_precondition(f"(not (= ?{first_term} ?{second_term}))")
+            model.requirements.update((":negative-preconditions", ":equality"))
+
+        effects = []
+        for eff in act.del_effects:
+            effects.append(f"(not {expression(eff.name, eff.args, in_action=True)})")
+        for eff in act.add_effects:
+            effects.append(expression(eff.name, eff.args, in_action=True))
+
+        model.actions.append((action_name, parameters, preconditions, effects))
+
+    return model
+
+
+def _requirements(model):
+    requirements = [":strips"]
+    if model.types:
+        requirements.append(":typing")
+    for requirement in (":negative-preconditions", ":equality", ":existential-preconditions"):
+        if requirement in model.requirements:
+            requirements.append(requirement)
+    return requirements
+
+
+def _objects_by_type(objects):
+    grouped = {}
+    for name, type_name in objects:
+        grouped.setdefault(type_name, []).append(name)
+    return [f"   {' '.join(names)} - {type_name}" for type_name, names in grouped.items()]
+
+
+def render_domain(model):
+    lines = [f"(define (domain {DOMAIN_NAME})",
+             f" (:requirements {' '.join(_requirements(model))})"]
+    if model.types:
+        lines.append(f" (:types {' '.join(model.types)})")
+
+    constants = [(name, type_name) for name, type_name in model.objects if name in model.constants]
+    if constants:
+        lines.append(" (:constants")
+        lines.extend(_objects_by_type(constants))
+        lines.append(" )")
+
+    lines.append(" (:predicates ")
+    for pred_name, param_types in model.predicates:
+        params = "".join(f" ?p{i} - {type_name}" for i, type_name in enumerate(param_types))
+        lines.append(f"             ({pred_name}{params})")
+    lines.append(" )")
+
+    for action_name, parameters, preconditions, effects in model.actions:
+        lines.append(f" (:action {action_name}")
+        lines.append(f"  :parameters ({''.join(f' ?{p} - {t}' for p, t in parameters)})")
+        if preconditions:
+            lines.append(f"  :precondition (and {' '.join(preconditions)})")
+        lines.append(f"  :effect (and {' '.join(effects)}))")
+
+    lines.append(")")
+    return "\n".join(lines) + "\n"
+
+
+def render_problem(model):
+    lines = [f"(define (problem {PROBLEM_NAME})",
+             f" (:domain {DOMAIN_NAME})"]
+
+    objects = [(name, type_name) for name, type_name in model.objects if name not in model.constants]
+    if objects:
+        lines.append(" (:objects")
+        lines.extend(_objects_by_type(objects))
+        lines.append(" )")
+
+    lines.append(" (:init")
+    lines.extend(f"              {fact}" for fact in model.init)
+    lines.append(" )")
+    lines.append(" (:goal (and ")
+    lines.extend(f"           {goal}" for goal in model.goals)
+    lines.append("        )")
+    lines.append(" )")
+    lines.append(")")
+    return "\n".join(lines) + "\n"
+
+
+def write_pddl_native(knowledge, out_dir):
+    """Write the PDDL files straight from the JSON knowledge (dict or records.Knowledge); raises UnsupportedFeature"""
+    model = build_pddl_model(knowledge)
+    domain_file = os.path.join(out_dir, "generated_domain.pddl")
+    problem_file = os.path.join(out_dir, "generated_problem.pddl")
+    with open(domain_file, 'w') as f:
+        f.write(render_domain(model))
+    with open(problem_file, 'w') as f:
+        f.write(render_problem(model))
+    return domain_file, problem_file
+
+
+def write_problem_pddl(knowledge, out_dir, domain_text):
+    """
+    Write only generated_problem.pddl, for knowledge whose domain must render
+    exactly as domain_text (the generated_domain.pddl being reused).
+    Raises UnsupportedFeature if it does not.
+    """
+    model = build_pddl_model(knowledge)
+    if render_domain(model) != domain_text:
+        raise UnsupportedFeature("the domain would change")
+    problem_file = os.path.join(out_dir, "generated_problem.pddl")
+    with open(problem_file, 'w') as f:
+        f.write(render_problem(model))
+    return problem_file
+
+
+def write_pddl_files(knowledge, out_dir):
+    """
+    Native writer first, build_up_problem + PDDLWriter for whatever it does
+    not support. Returns (domain_file, problem_file, writer) with writer
+    "native" or "up". The knowledge is converted to records once, for both.
+    """
+    knowledge = convert_numbers_to_strings(knowledge)
+    try:
+        domain_file, problem_file = write_pddl_native(knowledge, out_dir)
+        return domain_file, problem_file, "native"
+    except UnsupportedFeature as e:
+        logger.info("  - Native PDDL writer not applicable (%s), falling back to Unified Planning", e)
+
+    from prolog2up_V2 import build_up_problem, write_pddl
+    domain_file, problem_file = write_pddl(build_up_problem(knowledge), out_dir)
+    return domain_file, problem_file, "up"
@@ -0,0 +1,178 @@
+"""
+Content-addressed on-disk cache for the orchestrator pipeline.
+
+Every entry is a directory named after a SHA-256 key and holds the files
+one group of steps produces:
+
+    conversion  (Steps 1-4)  extracted_knowledge.json
+    pddl        (Steps 5-6)  generated_domain.pddl, generated_problem.pddl
+                             [generated_up.py]
+    planning    (Step 7)     planning_results.txt, planning_results.json
+    domain                   extracted_knowledge.json, generated_domain.pddl
+                             (native writer only, see kb_delta.py)
+
+plus a meta.json with whatever the step reports besides its files (e.g. the
+PDDL writer actually used).
+
+Keys chain: the conversion key hashes the .pl contents, the converter
+version (a hash of the converter sources) and the type discovery mode; the
+pddl key adds the writer options; the planning key adds the planner
+configuration. Editing the knowledge base or the converter therefore
+misses every step, while changing only the planner settings reuses the
+PDDL. The domain key hashes only the domain side of the source
+(everything but init_state/goal_state), so an edit to the facts alone
+can reuse the domain and regenerate just the problem file.
+
+Entries are written to a temporary directory and renamed into place, so a
+reader never sees a partial entry. The total size is bounded: after each
+store the least recently used entries (by directory mtime, refreshed on
+every hit) are removed.
+"""
+
+import os
+import glob
+import json
+import shutil
+import hashlib
+import tempfile
+
+CONVERTER_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CONVERTER_DIR)
+CACHE_DIR = os.path.join(ROOT_DIR, "RESULTS", "CACHE", "pipeline")
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+CONVERSION_FILES = ("extracted_knowledge.json",)
+PDDL_FILES = ("generated_domain.pddl", "generated_problem.pddl")
+UP_CODE_FILE = "generated_up.py"
+PLANNING_FILES = ("planning_results.txt", "planning_results.json")
+DOMAIN_FILES = ("extracted_knowledge.json", "generated_domain.pddl")
+
+_converter_version = None
+
+
+def source_version(directory):
+    """Hash of the names and contents of every .py module in directory"""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+        digest.update(os.path.basename(path).encode())
+        digest.update(b"\0")
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def converter_version():
+    """
+    Hash of the converter sources, computed once per process. Every module
+    of CONVERTER/ is hashed, not only the ones known to shape the output,
+    so a module added to the pipeline can't be left out.
+    """
+    global _converter_version
+    if _converter_version is None:
+        _converter_version = source_version(CONVERTER_DIR)
+    return _converter_version
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def make_key(*parts):
+    """Stable key for a JSON-serializable description of a step's inputs"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def conversion_key(prolog_file, type_discovery):
+    return make_key("conversion", file_hash(prolog_file), converter_version(), type_discovery)
+
+
+def pddl_key(conversion, pddl_writer, emit_up_code):
+    return make_key("pddl", conversion, pddl_writer, bool(emit_up_code))
+
+
+def planning_key(pddl, planner_config):
+    return make_key("planning", pddl, planner_config)
+
+
+def domain_key(domain_hash, type_discovery):
+    return make_key("domain", domain_hash, converter_version(), type_discovery)
+
+
+class PipelineCache:
+    """Directory of cache entries with size-bounded LRU eviction"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.report = {}  # step label -> "hit" / "miss"
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def restore(self, label, key, files, output_dir):
+        """
+        Copy the entry's files into output_dir and return its meta dict, or
+        None on a miss (an entry lacking any of the files is a miss).
+        """
+        entry_dir = self._entry_dir(key)
+        present = all(os.path.exists(os.path.join(entry_dir, name)) for name in files + ("meta.json",))
+        self.report[label] = "hit" if present else "miss"
+        if not present:
+            return None
+        for name in files:
+            shutil.copy2(os.path.join(entry_dir, name), os.path.join(output_dir, name))
+        with open(os.path.join(entry_dir, "meta.json")) as f:
+            meta = json.load(f)
+        # Mark as recently used
+        os.utime(entry_dir)
+        return meta
+
+    def store(self, key, files, output_dir, meta=None):
+        """Copy files (names relative to output_dir) into a new entry, then evict"""
+        entry_dir = self._entry_dir(key)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp_", dir=self.cache_dir)
+        try:
+            for name in files:
+                shutil.copy2(os.path.join(output_dir, name), os.path.join(tmp_dir, name))
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump(meta or {}, f)
+            if os.path.isdir(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # Another process stored the same key first, or the disk is full:
+            # the cache is only an optimization
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            if name.startswith(".") or not os.path.isdir(entry_dir):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry_dir, f)) for f in os.listdir(entry_dir))
+            entries.append((os.path.getmtime(entry_dir), name, size))
+            total += size
+
+        removed = 0
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def summary(self):
+        """'steps 1-4 hit, steps 5-6 miss, ...' in pipeline order"""
+        return ", ".join(f"{label} {status}" for label, status in self.report.items())
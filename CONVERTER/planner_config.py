@@ -5,6 +5,8 @@ Configurazione per i planner e algoritmi di ricerca
 Questo file permette di gestire facilmente quali algoritmi usare
 """
 
+import os
+
 # Configurazioni predefinite di algoritmi
 ALGORITHM_SETS = {
     "basic": [
@@ -179,6 +181,17 @@ def get_orchestrator_config():
     """Ritorna la configurazione per l'orchestrator"""
     return DEFAULT_CONFIG
 
+# Prefisso delle righe JSON che run_plan.py --stream-results scrive su stdout,
+# una per ricerca terminata, mescolate all'output testuale
+RESULT_RECORD_PREFIX = "@planner-result "
+
+def available_cores():
+    """CPU su cui questo processo può girare (tiene conto dell'affinity dove supportata):
+    quante ricerche parallele in run_plan.py e quanti worker in batch.py"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
 # Esempio di utilizzo nel codice:
 if __name__ == "__main__":
     print("=== Configurazione Planner ===")
@@ -0,0 +1,163 @@
+"""
+Step 7 (planning) helpers shared by orchestrator.py and batch.py.
+
+Two ways to solve a converted problem:
+
+- in process: the Unified Planning Problem built by
+  prolog2up_V2.build_up_problem is handed to a OneshotPlanner, with no PDDL
+  parsing and no process started per problem. Engines are pooled by name
+  and reused for every problem this process solves (a batch worker keeps
+  its engine for the whole batch). The planner engines are separate
+  packages (up-fast-downward, up-pyperplan, ...): when none is installed,
+  or the engine can't solve the problem, solve() raises
+  InProcessPlanningUnavailable and the caller falls back to
+- PDDL/run_plan.py in a subprocess, one Fast Downward run per search,
+  whose results are read from the records it streams on stdout
+  (--stream-results).
+
+Both return search records shaped like run_plan.py's: planner, search,
+success, plan, plan_length, error, stats.
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+
+from planner_config import RESULT_RECORD_PREFIX
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_PLAN_SCRIPT = os.path.join(ROOT_DIR, "PDDL", "run_plan.py")
+
+# OneshotPlanner engines tried in order when no engine name is given
+PREFERRED_ENGINES = ("fast-downward", "pyperplan", "enhsp", "tamer")
+
+_pools = {}
+
+
+class InProcessPlanningUnavailable(Exception):
+    """No installed UP engine can solve the problem in process"""
+
+
+def plan_actions(plan):
+    """UP SequentialPlan as the "(action arg ...)" lines Fast Downward writes"""
+    return [f"({' '.join([instance.action.name] + [str(arg) for arg in instance.actual_parameters])})"
+            for instance in plan.actions]
+
+
+class PlannerPool:
+    """OneshotPlanner engines created on first use and kept until close()"""
+
+    def __init__(self, engine_names=None):
+        self.engine_names = tuple(engine_names) if engine_names else PREFERRED_ENGINES
+        self._engines = {}
+
+    def engine_for(self, problem):
+        """(name, engine) of the first installed engine supporting the problem kind"""
+        from unified_planning.shortcuts import OneshotPlanner, get_environment
+        environment = get_environment()
+        # Engines print their credits on creation, on stdout
+        environment.credits_stream = None
+        installed = environment.factory.engines
+        for name in self.engine_names:
+            if name not in installed or not environment.factory.engine(name).supports(problem.kind):
+                continue
+            if name not in self._engines:
+                self._engines[name] = OneshotPlanner(name=name)
+            return name, self._engines[name]
+        raise InProcessPlanningUnavailable(
+            f"no installed engine among {', '.join(self.engine_names)} supports this problem")
+
+    def solve(self, problem, timeout=None):
+        """Search record for one OneshotPlanner run on problem"""
+        from unified_planning.engines import PlanGenerationResultStatus
+        name, engine = self.engine_for(problem)
+        start_time = time.time()
+        try:
+            result = engine.solve(problem, timeout=timeout)
+        except Exception as e:
+            raise InProcessPlanningUnavailable(f"{name} failed: {e}") from e
+        wall_time = time.time() - start_time
+        if result.status in (PlanGenerationResultStatus.INTERNAL_ERROR,
+                             PlanGenerationResultStatus.UNSUPPORTED_PROBLEM):
+            raise InProcessPlanningUnavailable(f"{name}: {result.status.name.lower()}")
+
+        plan = plan_actions(result.plan) if result.plan is not None else []
+        success = result.plan is not None
+        stats = {key: value for key, value in (result.metrics or {}).items()
+                 if isinstance(value, (int, float))}
+        stats["total_time"] = wall_time
+        return {
+            "planner": name,
+            "search": "oneshot",
+            "success": success,
+            "plan": plan,
+            "plan_length": len(plan) if success else None,
+            "error": None if success else result.status.name.lower(),
+            "stats": stats
+        }
+
+    def close(self):
+        for engine in self._engines.values():
+            engine.destroy()
+        self._engines.clear()
+
+
+def default_pool(engine_name=None):
+    """Pool shared by every in-process solve of this process (one per engine choice)"""
+    if engine_name not in _pools:
+        _pools[engine_name] = PlannerPool((engine_name,) if engine_name else None)
+    return _pools[engine_name]
+
+
+def write_planning_results(output_dir, searches, notes=None):
+    """planning_results.json in the same format as run_plan.py"""
+    results_path = os.path.join(output_dir, "planning_results.json")
+    with open(results_path, "w") as f:
+        json.dump({"notes": notes or [], "searches": searches}, f, indent=2)
+    return results_path
+
+
+def read_planner_record(line):
+    """Search record streamed by run_plan.py --stream-results, or None for an ordinary output line"""
+    if not line.startswith(RESULT_RECORD_PREFIX):
+        return None
+    try:
+        return json.loads(line[len(RESULT_RECORD_PREFIX):])
+    except ValueError:
+        return None
+
+
+def run_plan_subprocess(planner_cmd, on_output=None):
+    """
+    Run run_plan.py (planner_cmd must include --stream-results) and collect
+    the search records as they arrive; every other output line goes to
+    on_output. Returns (return code, records).
+    """
+    process = subprocess.Popen(
+        planner_cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1  # Line buffered
+    )
+    searches = []
+    for line in process.stdout:
+        clean_line = line.rstrip()
+        record = read_planner_record(clean_line)
+        if record is not None:
+            searches.append(record)
+        elif clean_line and on_output:
+            on_output(clean_line)
+    return process.wait(), searches
+
+
+def run_plan_command(domain_file, problem_file, output_dir, searches, timeout=60):
+    """run_plan.py command line streaming its records on stdout"""
+    return [sys.executable, RUN_PLAN_SCRIPT, domain_file, problem_file,
+            "--output-dir", output_dir,
+            "--planners", "fd",
+            "--searches"] + list(searches) + [
+            "--timeout", str(timeout),
+            "--stream-results"]
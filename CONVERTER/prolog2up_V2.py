@@ -1,16 +1,20 @@
 #!/usr/bin/env python3
 """
 Prolog to Unified Planning Converter V2 - FIXED VERSION
-Converts extracted Prolog knowledge (from JSON) into Unified Planning Python code
+Converts extracted Prolog knowledge (from JSON) into a Unified Planning Problem,
+either built directly in memory (build_up_problem) or as Python source
+(generate_up_code, kept as a debug artifact)
 WITH BUG FIXES for type inference
 """
 
 import os
 import json
 import sys
-from unified_planning.shortcuts import *
-from unified_planning.model import Problem, Object, Fluent, InstantaneousAction, Variable
-from unified_planning.io import PDDLWriter
+import logging
+
+from records import Knowledge
+
+logger = logging.getLogger(__name__)
 
 
 def infer_fluent_signature_from_usage(knowledge, fluent_name):
@@ -20,25 +24,25 @@ def infer_fluent_signature_from_usage(knowledge, fluent_name):
     """
     candidates_with_scores = []
     
-    for action in knowledge["actions"]:
-        action_score = len(action["type_constraints"])
+    for action in knowledge.actions:
+        action_score = len(action.type_constraints)
         
         sections = [
-            ("preconditions", action.get("preconditions", [])),
-            ("neg_preconditions", action.get("neg_preconditions", [])),
-            ("add_effects", action.get("add_effects", [])),
-            ("del_effects", action.get("del_effects", []))
+            ("preconditions", action.preconditions),
+            ("neg_preconditions", action.neg_preconditions),
+            ("add_effects", action.add_effects),
+            ("del_effects", action.del_effects)
         ]
         
         for section_name, items in sections:
             for item in items:
-                if item["name"] == fluent_name:
+                if item.name == fluent_name:
                     types = []
                     quality_score = 0
                     
-                    for arg in item["args"]:
-                        if arg in action["type_constraints"]:
-                            arg_type = action["type_constraints"][arg]
+                    for arg in item.args:
+                        if arg in action.type_constraints:
+                            arg_type = action.type_constraints[arg]
                             types.append(arg_type)
                             if arg_type != "Unknown":
                                 quality_score += 1
@@ -53,14 +57,14 @@ def infer_fluent_signature_from_usage(knowledge, fluent_name):
                     
                     if types:
                         combined_score = (quality_score / len(types)) * action_score
-                        candidates_with_scores.append((types, combined_score, action["name"]))
+                        candidates_with_scores.append((types, combined_score, action.name))
 
     # Check state sections with high priority
-    for state_section, section_name in [(knowledge["init_state"], "init"), (knowledge["goal_state"], "goal")]:
+    for state_section, section_name in [(knowledge.init_state, "init"), (knowledge.goal_state, "goal")]:
         for state_item in state_section:
-            if state_item["name"] == fluent_name:
+            if state_item.name == fluent_name:
                 types = []
-                for arg in state_item["args"]:
+                for arg in state_item.args:
                     inferred_type = _infer_type_from_structure(arg, knowledge)
                     types.append(inferred_type)
                 
@@ -104,9 +108,9 @@ def infer_fluent_signature_from_usage(knowledge, fluent_name):
 def _infer_type_from_structure(arg, knowledge):
     """Inferisce il tipo di un argomento dalla sua struttura"""
     # Check if it's in known types
-    for type_name, instances in knowledge["types"].items():
-        if arg in instances:
-            return type_name
+    type_name = knowledge.object_types.get(arg)
+    if type_name is not None:
+        return type_name
     
     # Check if it's a number (coordinate)
     if arg.isdigit() or (arg.replace('-', '').replace('.', '').isdigit()):
@@ -121,15 +125,15 @@ def _infer_wildcard_type_from_context(fluent_name, position, action, knowledge):
     """
     # First check direct usage in this action
     for section in ("preconditions", "add_effects", "del_effects"):
-        for item in action.get(section, []):
-            if item["name"] == fluent_name and len(item["args"]) > position:
-                arg_at_position = item["args"][position]
-                if arg_at_position in action["type_constraints"]:
-                    return action["type_constraints"][arg_at_position]
+        for item in getattr(action, section):
+            if item.name == fluent_name and len(item.args) > position:
+                arg_at_position = item.args[position]
+                if arg_at_position in action.type_constraints:
+                    return action.type_constraints[arg_at_position]
     
     # Check fluent signatures
-    if fluent_name in knowledge.get("fluent_signatures", {}):
-        sig = knowledge["fluent_signatures"][fluent_name]
+    if fluent_name in knowledge.fluent_signatures:
+        sig = knowledge.fluent_signatures[fluent_name]
         if position < len(sig) and sig[position] != "Unknown":
             return sig[position]
     
@@ -137,19 +141,19 @@ def _infer_wildcard_type_from_context(fluent_name, position, action, knowledge):
 
 
 def resolve_parameter_types_for_supertypes(knowledge, action):
-    print(f"  Resolving supertypes for action {action['name']}")
+    logger.debug("  Resolving supertypes for action %s", action.name)
     
     # Get relevant data
-    fluent_signatures = knowledge.get("fluent_signatures", {})
-    supertypes = knowledge.get("supertypes", {})
+    fluent_signatures = knowledge.fluent_signatures
+    supertypes = knowledge.supertypes
     
     # Track parameter usage across different fluents
     parameter_usage = {}  # param_name -> set of required types
     
     # Helper function to analyze predicate usage
     def analyze_predicate_usage(pred):
-        fluent_name = pred["name"]
-        args = pred["args"]
+        fluent_name = pred.name
+        args = pred.args
         
         if fluent_name in fluent_signatures:
             sig = fluent_signatures[fluent_name]
@@ -164,50 +168,45 @@ def resolve_parameter_types_for_supertypes(knowledge, action):
     
     # Analyze usage in all sections
     for section_name in ["preconditions", "neg_preconditions", "add_effects", "del_effects"]:
-        for pred in action.get(section_name, []):
+        for pred in getattr(action, section_name):
             analyze_predicate_usage(pred)
     
     # Resolve types using supertypes
-    resolved_types = action["type_constraints"].copy()
+    resolved_types = action.type_constraints.copy()
     
     for param_name, required_types in parameter_usage.items():
         if len(required_types) > 1:
-            # Look for a supertype that encompasses all required types
-            for supertype_name, constituent_types in supertypes.items():
-                # Check if this supertype covers all required types
-                if required_types.issubset(set(constituent_types)):
-                    print(f"    Parameter {param_name}: {required_types} -> {supertype_name}")
-                    resolved_types[param_name] = supertype_name
-                    break
+            # First supertype that encompasses all required types
+            supertype_name = knowledge.supertype_index.covering(required_types)
+            if supertype_name is not None:
+                logger.debug("    Parameter %s: %s -> %s", param_name, required_types, supertype_name)
+                resolved_types[param_name] = supertype_name
         elif len(required_types) == 1:
-            required_type = list(required_types)[0]
-            current_type = resolved_types.get(param_name, "Unknown")
+            required_type = next(iter(required_types))
             
             # If the required type is already a supertype, use it
             if required_type in supertypes:
-                print(f"    Parameter {param_name}: {current_type} -> {required_type} (supertype)")
+                logger.debug("    Parameter %s: %s -> %s (supertype)", param_name,
+                             resolved_types.get(param_name, "Unknown"), required_type)
                 resolved_types[param_name] = required_type
-            # If current type should be promoted to supertype
-            elif current_type != required_type:
-                for supertype_name, constituent_types in supertypes.items():
-                    if current_type in constituent_types and required_type == supertype_name:
-                        print(f"    Parameter {param_name}: {current_type} -> {supertype_name} (promoted to supertype)")
-                        resolved_types[param_name] = supertype_name
-                        break
     
     return resolved_types
 
 
-def generate_up_code_negative_preconditions_section(knowledge, name, act):
-    lines = []
+def plan_negative_preconditions(knowledge, name, act):
+    """
+    Risolve le precondizioni negative di un'azione in
+    (fluent, argomenti, [(variabile wildcard, nome del tipo)])
+    """
+    planned = []
     
-    for neg in act.get("neg_preconditions", []):
-        pname = neg["name"]
-        pargs = neg["args"]
-        wilds = set(neg.get("wildcard_positions", []))
+    for neg in act.neg_preconditions:
+        pname = neg.name
+        pargs = neg.args
+        wilds = set(neg.wildcard_positions or ())
         
         # Get fluent signature for this predicate
-        fluent_sig = knowledge["fluent_signatures"].get(pname)
+        fluent_sig = knowledge.fluent_signatures.get(pname)
         if not fluent_sig:
             fluent_sig = infer_fluent_signature_from_usage(knowledge, pname)
         
@@ -235,69 +234,58 @@ def generate_up_code_negative_preconditions_section(knowledge, name, act):
                     vtype = "object"
                 
                 # Use appropriate type name
-                if vtype in knowledge.get("supertypes", {}):
+                if vtype in knowledge.supertypes:
                     # It's a supertype
                     type_name = vtype
                 else:
                     # It's a regular type - capitalize
                     type_name = vtype.capitalize()
                 
-                lines.append(f"{var} = Variable('{var}', {type_name})")
                 expr.append(var)
-                vars_for_exists.append(var)
+                vars_for_exists.append((var, type_name))
             else:
                 expr.append(a)
         
+        planned.append((pname, expr, vars_for_exists))
+    
+    return planned
+
+
+def generate_up_code_negative_preconditions_section(knowledge, name, act):
+    lines = []
+    
+    for pname, expr, vars_for_exists in plan_negative_preconditions(knowledge, name, act):
+        for var, type_name in vars_for_exists:
+            lines.append(f"{var} = Variable('{var}', {type_name})")
+        
         if vars_for_exists:
-            lines.append(f"{name}.add_precondition(Not(Exists({pname}({', '.join(expr)}), {', '.join(vars_for_exists)})))")
+            var_names = ", ".join(var for var, _ in vars_for_exists)
+            lines.append(f"{name}.add_precondition(Not(Exists({pname}({', '.join(expr)}), {var_names})))")
         else:
             lines.append(f"{name}.add_precondition(Not({pname}({', '.join(expr)})))")
     
     return lines
 
 
+def up_object_name(value):
+    """Digit strings and numbers as x-prefixed names, valid for UP: 1 -> x1, 10 -> x10"""
+    if isinstance(value, str) and value.isdigit():
+        return f"x{value}"
+    elif isinstance(value, (int, float)):
+        return f"x{int(value)}"
+    return value
+
+
 def convert_numbers_to_strings(knowledge):
     """
     Converte tutti i numeri in stringhe valide per UP.
     Es: 1 -> x1, 2 -> x2, 10 -> x10, etc.
+    Il dict JSON diventa un records.Knowledge con gli argomenti già convertiti
+    (il dict del chiamante non viene modificato); un Knowledge è restituito così com'è.
     """
-    
-    def convert_number_if_needed(value):
-        # Convert digit strings and numbers to x-prefixed format
-        if isinstance(value, str) and value.isdigit():
-            return f"x{value}"
-        elif isinstance(value, (int, float)):
-            return f"x{int(value)}"
-        return value
-    
-    def convert_predicate_args(pred):
-        # Convert args in predicates
-        converted_pred = pred.copy()
-        converted_pred["args"] = [convert_number_if_needed(arg) for arg in pred["args"]]
-        return converted_pred
-    
-    def convert_action_args(action):
-        # Convert args in action sections
-        converted_action = action.copy()
-        
-        for section in ["preconditions", "neg_preconditions", "add_effects", "del_effects"]:
-            if section in converted_action:
-                converted_action[section] = [
-                    convert_predicate_args(pred) for pred in converted_action[section]
-                ]
-        
-        return converted_action
-    
-    # Convert init_state
-    knowledge["init_state"] = [convert_predicate_args(pred) for pred in knowledge["init_state"]]
-    
-    # Convert goal_state  
-    knowledge["goal_state"] = [convert_predicate_args(pred) for pred in knowledge["goal_state"]]
-    
-    # Convert actions
-    knowledge["actions"] = [convert_action_args(action) for action in knowledge["actions"]]
-    
-    return knowledge
+    if isinstance(knowledge, Knowledge):
+        return knowledge
+    return Knowledge.from_json(knowledge, rename=up_object_name)
 
 
 def extract_string_objects_from_knowledge(knowledge):
@@ -308,19 +296,19 @@ def extract_string_objects_from_knowledge(knowledge):
     string_objects = set()
     
     # Extract from state sections
-    for state_section in [knowledge["init_state"], knowledge["goal_state"]]:
+    for state_section in [knowledge.init_state, knowledge.goal_state]:
         for pred in state_section:
-            for arg in pred["args"]:
+            for arg in pred.args:
                 if (isinstance(arg, str) and 
                     not arg.startswith("Param") and
                     not arg.startswith("_")):
                     string_objects.add(arg)
     
     # Extract from actions
-    for action in knowledge["actions"]:
+    for action in knowledge.actions:
         for section in ["preconditions", "neg_preconditions", "add_effects", "del_effects"]:
-            for pred in action.get(section, []):
-                for arg in pred["args"]:
+            for pred in getattr(action, section):
+                for arg in pred.args:
                     if (isinstance(arg, str) and 
                         not arg.startswith("Param") and 
                         not arg.startswith("_")):
@@ -336,30 +324,30 @@ def generate_supertype_definitions(knowledge):
     supertype_lines = []
     supertype_objects = {}  # supertype_name -> list of object instances
     
-    if "supertypes" not in knowledge:
+    if not knowledge.supertypes:
         return supertype_lines, supertype_objects
     
-    print("\n=== GENERATING SUPERTYPE DEFINITIONS ===")
+    logger.debug("=== GENERATING SUPERTYPE DEFINITIONS ===")
     
-    for supertype_name, constituent_types in knowledge["supertypes"].items():
+    for supertype_name, constituent_types in knowledge.supertypes.items():
         # Generate UserType definition
         supertype_lines.append(f"{supertype_name} = UserType('{supertype_name.lower()}')")
-        print(f"Created supertype: {supertype_name} = {constituent_types}")
+        logger.debug("Created supertype: %s = %s", supertype_name, constituent_types)
         
         # Raccogli tutti gli oggetti che appartengono a questo supertipo
         supertype_instances = []
         
         # Collect all instances from constituent types
         for constituent_type in constituent_types:
-            if constituent_type in knowledge["types"]:
-                for instance in knowledge["types"][constituent_type]:
+            if constituent_type in knowledge.types:
+                for instance in knowledge.types[constituent_type]:
                     if isinstance(instance, str):
                         supertype_instances.append(instance)
         
         supertype_objects[supertype_name] = supertype_instances
-        print(f"  Instances: {supertype_instances}")
+        logger.debug("  Instances: %s", supertype_instances)
     
-    print("=== END SUPERTYPE GENERATION ===\n")
+    logger.debug("=== END SUPERTYPE GENERATION ===")
     
     return supertype_lines, supertype_objects
 
@@ -370,21 +358,21 @@ def get_effective_type_for_object(obj_name, knowledge, supertype_objects):
     FIXED: Returns proper type strings instead of Python Object class
     """
     # First check if object belongs to a supertype
-    for supertype_name, instances in supertype_objects.items():
-        if obj_name in instances:
-            return supertype_name
+    supertype_name = knowledge.object_supertypes.get(obj_name)
+    if supertype_name is not None and supertype_name in supertype_objects:
+        return supertype_name
     
     # Then check standard types
-    for type_name, instances in knowledge["types"].items():
-        if obj_name in instances:
-            return type_name.capitalize()
+    type_name = knowledge.object_types.get(obj_name)
+    if type_name is not None:
+        return type_name.capitalize()
     
     # Check if it's a numeric coordinate (x1, x2, etc.)
     if obj_name.startswith("x") and obj_name[1:].isdigit():
         return "Pos"
     
     # FIXED: Better fallback logic
-    available_types = list(knowledge["types"].keys())
+    available_types = list(knowledge.types.keys())
     if available_types:
         return available_types[0].capitalize()
     
@@ -395,50 +383,51 @@ def get_effective_type_for_object(obj_name, knowledge, supertype_objects):
 def collect_all_fluents_from_knowledge(knowledge):
     all_fluents = set()
     
-    print("🔍 Collecting fluents from all knowledge sections...")
+    logger.debug("🔍 Collecting fluents from all knowledge sections...")
     
     # 1. Fluents from init_state
-    for pred in knowledge.get("init_state", []):
-        fluent_name = pred["name"]
+    for pred in knowledge.init_state:
+        fluent_name = pred.name
         all_fluents.add(fluent_name)
-        print(f"  Found fluent in init_state: {fluent_name}")
+        logger.debug("  Found fluent in init_state: %s", fluent_name)
     
     # 2. Fluents from goal_state  
-    for pred in knowledge.get("goal_state", []):
-        fluent_name = pred["name"]
+    for pred in knowledge.goal_state:
+        fluent_name = pred.name
         all_fluents.add(fluent_name)
-        print(f"  Found fluent in goal_state: {fluent_name}")
+        logger.debug("  Found fluent in goal_state: %s", fluent_name)
     
     # 3. Fluents from actions
-    for action in knowledge.get("actions", []):
-        action_name = action["name"]
+    for action in knowledge.actions:
+        action_name = action.name
         
         # Positive preconditions
-        for pred in action.get("preconditions", []):
-            fluent_name = pred["name"]
+        for pred in action.preconditions:
+            fluent_name = pred.name
             all_fluents.add(fluent_name)
-            print(f"  Found fluent in {action_name}.preconditions: {fluent_name}")
+            logger.debug("  Found fluent in %s.preconditions: %s", action_name, fluent_name)
         
         # NEGATIVE PRECONDITIONS 
-        for pred in action.get("neg_preconditions", []):
-            fluent_name = pred["name"]
+        for pred in action.neg_preconditions:
+            fluent_name = pred.name
             all_fluents.add(fluent_name)
-            print(f"  Found fluent in {action_name}.neg_preconditions: {fluent_name}")
+            logger.debug("  Found fluent in %s.neg_preconditions: %s", action_name, fluent_name)
         
         # Add effects
-        for pred in action.get("add_effects", []):
-            fluent_name = pred["name"]
+        for pred in action.add_effects:
+            fluent_name = pred.name
             all_fluents.add(fluent_name)
-            print(f"  Found fluent in {action_name}.add_effects: {fluent_name}")
+            logger.debug("  Found fluent in %s.add_effects: %s", action_name, fluent_name)
         
         # Delete effects
-        for pred in action.get("del_effects", []):
-            fluent_name = pred["name"]
+        for pred in action.del_effects:
+            fluent_name = pred.name
             all_fluents.add(fluent_name)
-            print(f"  Found fluent in {action_name}.del_effects: {fluent_name}")
+            logger.debug("  Found fluent in %s.del_effects: %s", action_name, fluent_name)
     
-    print(f" Total unique fluents found: {len(all_fluents)}")
-    print(f"   Fluents: {sorted(all_fluents)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(" Total unique fluents found: %s", len(all_fluents))
+        logger.debug("   Fluents: %s", sorted(all_fluents))
     
     return sorted(all_fluents)
 
@@ -449,7 +438,7 @@ def generate_wildcard_variable(fluent_name, arg_position, knowledge, action_name
     """
     
     # Get fluent signature
-    fluent_sig = knowledge["fluent_signatures"].get(fluent_name, [])
+    fluent_sig = knowledge.fluent_signatures.get(fluent_name, [])
     
     if arg_position < len(fluent_sig):
         arg_type = fluent_sig[arg_position]
@@ -463,41 +452,194 @@ def generate_wildcard_variable(fluent_name, arg_position, knowledge, action_name
     return var_name, "object"  # FIXED: "object" string instead of Object class
 
 
-def resolve_fluent_parameter_type(arg_type, knowledge, created_additional_types, wp):
+def resolve_fluent_parameter_type(arg_type, knowledge, created_additional_types, declare_type):
     """Risolve il tipo di un parametro fluent gestendo supertypes correttamente
     FIXED: Added to handle mixed types properly
+    declare_type(var_name, up_type_name) is called for every UserType that
+    still has to be created
     """
     
     if arg_type == "Unknown" or arg_type is None:
         arg_type = "object"
     
     # Se è un supertipo esistente
-    if arg_type in knowledge.get("supertypes", {}):
+    if arg_type in knowledge.supertypes:
         return arg_type
     
     # Se è un tipo standard esistente  
-    standard_types = [t.lower() for t in knowledge["types"].keys()]
+    standard_types = [t.lower() for t in knowledge.types.keys()]
     if arg_type.lower() in standard_types:
         return arg_type.capitalize()
     
     # Se è "object", crea un UserType generico se necessario
     if arg_type.lower() == "object":
         if "object" not in created_additional_types:
-            wp("ObjectType = UserType('object')")
+            declare_type("ObjectType", "object")
             created_additional_types.add("object")
         return "ObjectType"
     
     # Altrimenti crea un nuovo UserType
     if arg_type not in created_additional_types:
-        wp(f"{arg_type.capitalize()} = UserType('{arg_type.lower()}')")
+        declare_type(arg_type.capitalize(), arg_type.lower())
         created_additional_types.add(arg_type)
     
     return arg_type.capitalize()
 
 
+def additional_type_declarations(knowledge):
+    """(variable, UserType name) for the signature types that are neither types nor supertypes"""
+    unique_types = set()
+    for fluent_name, type_list in knowledge.fluent_signatures.items():
+        unique_types.update(type_list)
+
+    # Remove "Unknown" from types and add common missing types
+    unique_types.discard("Unknown")
+    unique_types.add("pos") 
+    unique_types_list = list(unique_types)
+
+    logger.debug("Tipi unici trovati: %s", unique_types_list)
+
+    existing_types = set([t.lower() for t in knowledge.types.keys()])
+    supertype_names = set(knowledge.supertypes.keys())
+    
+    declarations = []
+    for UT in unique_types_list:
+        ut_lower = UT.lower()
+        
+        # Don't create if it already exists as a type or supertype
+        if ut_lower not in existing_types and UT not in supertype_names:
+            declarations.append((UT.capitalize(), ut_lower))
+    
+    return declarations
+
+
+def resolve_fluent_signature(knowledge, f, created_additional_types, declare_type):
+    """[(parameter name, type variable)] of fluent f"""
+    sig = knowledge.fluent_signatures.get(f, [])
+    
+    # If signature not found, try to infer it
+    if not sig:
+        sig = infer_fluent_signature_from_usage(knowledge, f)
+        logger.warning("Inferred signature for fluent '%s': %s", f, sig)
+    
+    # Clean signature - replace Unknown with object
+    cleaned_sig = []
+    for typ in sig:
+        if typ == "Unknown":
+            cleaned_sig.append("object")  # Fallback to object for Unknown
+        else:
+            cleaned_sig.append(typ)
+    
+    # FIXED: Use the new resolve function
+    params = []
+    for i, typ in enumerate(cleaned_sig):
+        resolved_type = resolve_fluent_parameter_type(typ, knowledge, created_additional_types, declare_type)
+        params.append((f"p{i}", resolved_type))
+    
+    return params
+
+
+def resolve_object_type(obj, knowledge, supertype_objects, created_additional_types, declare_type):
+    """Type variable of object obj, declaring ObjectType on first use"""
+    # FIXED: Get effective type with better fallback
+    effective_type = get_effective_type_for_object(obj, knowledge, supertype_objects)
+    
+    # FIXED: Handle the case where effective_type is "object"
+    if effective_type == "object":
+        if "object" not in created_additional_types:
+            declare_type("ObjectType", "object")
+            created_additional_types.add("object")
+        effective_type = "ObjectType"
+    
+    return effective_type
+
+
+def resolve_action_types(knowledge, act):
+    """Completa i type constraints dei parametri di un'azione e applica i supertipi"""
+    name = act.name
+    params = act.parameters
+    types = act.type_constraints
+    
+    # Debug information
+    logger.debug("Processing action %s", name)
+    logger.debug("  Parameters: %s", params)
+    logger.debug("  Type constraints: %s", types)
+    
+    # Check for missing types and try to infer them
+    missing_types = []
+    for p in params:
+        if p not in types or types[p] == "Unknown":
+            missing_types.append(p)
+            logger.warning("Parameter %s has no type constraint or Unknown type!", p)
+    
+    # Try to infer missing types
+    if missing_types:
+        logger.debug("  Attempting to infer types for: %s", missing_types)
+        for missing_param in missing_types:
+            # Try to infer from preconditions, then add and delete effects
+            inferred_type = None
+            
+            for section in ("preconditions", "add_effects", "del_effects"):
+                for pred in getattr(act, section):
+                    if missing_param in pred.args:
+                        idx = pred.args.index(missing_param)
+                        fluent_name = pred.name
+                        if fluent_name in knowledge.fluent_signatures:
+                            sig = knowledge.fluent_signatures[fluent_name]
+                            if idx < len(sig) and sig[idx] != "Unknown":
+                                inferred_type = sig[idx]
+                                break
+                if inferred_type:
+                    break
+            
+            if inferred_type:
+                logger.debug("    Inferred type for %s: %s", missing_param, inferred_type)
+                types[missing_param] = inferred_type
+            else:
+                logger.warning("Could not infer type for %s, using 'object'", missing_param)
+                types[missing_param] = "object"
+    
+    # Resolve types using supertypes
+    return resolve_parameter_types_for_supertypes(knowledge, act)
+
+
+def action_parameter_type(param_type, knowledge):
+    """Type variable of an action parameter whose resolved type is param_type"""
+    if param_type == "Unknown":
+        param_type = "object"
+    
+    # FIXED: Handle supertypes correctly
+    if param_type in knowledge.supertypes:
+        return param_type  # Supertype name as-is
+    return param_type.capitalize()  # Capitalize regular types
+
+
+def same_type_parameter_pairs(params, types):
+    """Pairs of parameters of the same type, which must be bound to different objects"""
+    type_to_params = {}
+    for p in params:
+        param_type = types.get(p, 'object')
+        if param_type == "Unknown":
+            param_type = "object"
+        
+        if param_type not in type_to_params:
+            type_to_params[param_type] = []
+        type_to_params[param_type].append(p)
+    
+    pairs = []
+    for param_type, param_list in type_to_params.items():
+        if len(param_list) > 1:
+            for i in range(len(param_list)):
+                for j in range(i + 1, len(param_list)):
+                    pairs.append((param_list[i], param_list[j]))
+    return pairs
+
+
 def generate_up_code(knowledge, out_dir):
     """Generate UP code with polymorphic fluent support
     FIXED: Better type handling throughout
+    The source mirrors build_up_problem step by step and is only needed as a
+    debug artifact (generated_up.py)
     """
     
     # Convert numeric values to valid UP strings
@@ -506,6 +648,9 @@ def generate_up_code(knowledge, out_dir):
     lines = []
     wp = lines.append
 
+    def declare_type(var, up_name):
+        wp(f"{var} = UserType('{up_name}')")
+
     # 1) Header
     wp("# Generated UP code from Prolog knowledge")
     wp("# This code is automatically generated.")
@@ -524,8 +669,8 @@ def generate_up_code(knowledge, out_dir):
     wp("")
 
     # 2) Original types (UserType)
-    for t, instances in knowledge["types"].items():
-        wp(f"{t.capitalize()} = UserType('{t}')")
+    for t, instances in knowledge.types.items():
+        declare_type(t.capitalize(), t)
     wp("")
     
     # 3) Generate supertypes if present
@@ -536,29 +681,8 @@ def generate_up_code(knowledge, out_dir):
         wp("")
     
     # 4) Additional types from fluent signatures
-    unique_types = set()
-    for fluent_name, type_list in knowledge['fluent_signatures'].items():
-        unique_types.update(type_list)
-
-    # Remove "Unknown" from types and add common missing types
-    unique_types.discard("Unknown")
-    unique_types.add("pos") 
-    unique_types_list = list(unique_types)
-
-    print(f"Tipi unici trovati: {unique_types_list}")
-
-    existing_types = set([t.lower() for t in knowledge["types"].keys()])
-    existing_supertypes = set()
-    if "supertypes" in knowledge:
-        existing_supertypes = set([st.lower() for st in knowledge["supertypes"].keys()])
-    
-    for UT in unique_types_list:
-        ut_lower = UT.lower()
-        
-        # Don't create if it already exists as a type or supertype
-        supertype_names = set(knowledge.get("supertypes", {}).keys())
-        if ut_lower not in existing_types and UT not in supertype_names:
-            wp(f"{UT.capitalize()} = UserType('{ut_lower}')")
+    for var, up_name in additional_type_declarations(knowledge):
+        declare_type(var, up_name)
     wp("")
 
     all_fluents = collect_all_fluents_from_knowledge(knowledge)
@@ -568,29 +692,8 @@ def generate_up_code(knowledge, out_dir):
     created_additional_types = set()
     
     for f in all_fluents:
-        sig = knowledge["fluent_signatures"].get(f, [])
-        
-        # If signature not found, try to infer it
-        if not sig:
-            sig = infer_fluent_signature_from_usage(knowledge, f)
-            print(f"  Warning: Inferred signature for fluent '{f}': {sig}")
-        
-        # Clean signature - replace Unknown with object
-        cleaned_sig = []
-        for typ in sig:
-            if typ == "Unknown":
-                cleaned_sig.append("object")  # Fallback to object for Unknown
-            else:
-                cleaned_sig.append(typ)
-        
-        # FIXED: Use the new resolve function
-        params = []
-        for i, typ in enumerate(cleaned_sig):
-            var = f"p{i}"
-            resolved_type = resolve_fluent_parameter_type(typ, knowledge, created_additional_types, wp)
-            params.append(f"{var}={resolved_type}")
-        
-        params_str = ", ".join(params)
+        params = resolve_fluent_signature(knowledge, f, created_additional_types, declare_type)
+        params_str = ", ".join(f"{var}={resolved_type}" for var, resolved_type in params)
         wp(f"{f} = Fluent('{f}', BoolType(){', ' + params_str if params_str else ''})")
     wp("")
 
@@ -601,25 +704,9 @@ def generate_up_code(knowledge, out_dir):
     wp("")
 
     # 7) Objects
-    all_objects_to_create = set()
-    
-    # Get string objects from knowledge
-    string_objects = extract_string_objects_from_knowledge(knowledge)
-    all_objects_to_create.update(string_objects)
-    
-    # Create objects
     objects_created = []
-    for obj in sorted(all_objects_to_create):
-        # FIXED: Get effective type with better fallback
-        effective_type = get_effective_type_for_object(obj, knowledge, supertype_objects)
-        
-        # FIXED: Handle the case where effective_type is "object"
-        if effective_type == "object":
-            if "object" not in created_additional_types:
-                wp("ObjectType = UserType('object')")
-                created_additional_types.add("object")
-            effective_type = "ObjectType"
-        
+    for obj in extract_string_objects_from_knowledge(knowledge):
+        effective_type = resolve_object_type(obj, knowledge, supertype_objects, created_additional_types, declare_type)
         wp(f"{obj} = Object('{obj}', {effective_type})")
         objects_created.append(obj)
     
@@ -631,105 +718,29 @@ def generate_up_code(knowledge, out_dir):
     wp("")
 
     # 8) Initial state (numbers already converted)
-    for pred in knowledge["init_state"]:
-        name = pred["name"]
-        args = ", ".join(pred["args"])
+    for pred in knowledge.init_state:
+        name = pred.name
+        args = ", ".join(pred.args)
         wp(f"problem.set_initial_value({name}({args}), True)")
     wp("")
 
     # 9) Goal state (numbers already converted)
-    for pred in knowledge["goal_state"]:
-        name = pred["name"]
-        args = ", ".join(pred["args"])
+    for pred in knowledge.goal_state:
+        name = pred.name
+        args = ", ".join(pred.args)
         wp(f"problem.add_goal({name}({args}))")
     wp("")
 
     # 10) Actions (numbers already converted)
-    for act in knowledge["actions"]:
-        name = act["name"]
-        params = act["parameters"]
-        types = act["type_constraints"]
-        
-        # Debug information
-        print(f"\nDEBUG: Processing action {name}")
-        print(f"  Parameters: {params}")
-        print(f"  Type constraints: {types}")
-        
-        # Check for missing types and try to infer them
-        missing_types = []
-        for p in params:
-            if p not in types or types[p] == "Unknown":
-                missing_types.append(p)
-                print(f"  WARNING: Parameter {p} has no type constraint or Unknown type!")
-        
-        # Try to infer missing types
-        if missing_types:
-            print(f"  Attempting to infer types for: {missing_types}")
-            for missing_param in missing_types:
-                # Try to infer from preconditions
-                inferred_type = None
-                
-                # Check preconditions
-                for pre in act.get("preconditions", []):
-                    if missing_param in pre["args"]:
-                        idx = pre["args"].index(missing_param)
-                        fluent_name = pre["name"]
-                        if fluent_name in knowledge["fluent_signatures"]:
-                            sig = knowledge["fluent_signatures"][fluent_name]
-                            if idx < len(sig) and sig[idx] != "Unknown":
-                                inferred_type = sig[idx]
-                                break
-                
-                # Check add effects
-                if not inferred_type:
-                    for eff in act.get("add_effects", []):
-                        if missing_param in eff["args"]:
-                            idx = eff["args"].index(missing_param)
-                            fluent_name = eff["name"]
-                            if fluent_name in knowledge["fluent_signatures"]:
-                                sig = knowledge["fluent_signatures"][fluent_name]
-                                if idx < len(sig) and sig[idx] != "Unknown":
-                                    inferred_type = sig[idx]
-                                    break
-                
-                # Check delete effects
-                if not inferred_type:
-                    for eff in act.get("del_effects", []):
-                        if missing_param in eff["args"]:
-                            idx = eff["args"].index(missing_param)
-                            fluent_name = eff["name"]
-                            if fluent_name in knowledge["fluent_signatures"]:
-                                sig = knowledge["fluent_signatures"][fluent_name]
-                                if idx < len(sig) and sig[idx] != "Unknown":
-                                    inferred_type = sig[idx]
-                                    break
-                
-                if inferred_type:
-                    print(f"    Inferred type for {missing_param}: {inferred_type}")
-                    types[missing_param] = inferred_type
-                else:
-                    print(f"    Could not infer type for {missing_param}, using 'object'")
-                    types[missing_param] = "object"
-        
-        # Resolve types using supertypes
-        types = resolve_parameter_types_for_supertypes(knowledge, act)
+    for act in knowledge.actions:
+        name = act.name
+        params = act.parameters
+        types = resolve_action_types(knowledge, act)
         
         wp(f"# --- action {name}")
         
         # Generate action signature
-        sig_parts = []
-        for p in params:
-            param_type = types.get(p, 'object')
-            if param_type == "Unknown":
-                param_type = "object"
-            
-            # FIXED: Handle supertypes correctly
-            if param_type in knowledge.get("supertypes", {}):
-                sig_parts.append(f"{p}={param_type}")  # Supertype name as-is
-            else:
-                sig_parts.append(f"{p}={param_type.capitalize()}")  # Capitalize regular types
-        
-        sig = ", ".join(sig_parts)
+        sig = ", ".join(f"{p}={action_parameter_type(types.get(p, 'object'), knowledge)}" for p in params)
         wp(f"{name} = InstantaneousAction('{name}', {sig})")
         
         # Generate parameter references
@@ -737,9 +748,9 @@ def generate_up_code(knowledge, out_dir):
             wp(f"{p} = {name}.parameter('{p}')")
         
         # Positive preconditions
-        for pre in act.get("preconditions", []):
-            pname = pre["name"]
-            pargs = ", ".join(pre["args"])
+        for pre in act.preconditions:
+            pname = pre.name
+            pargs = ", ".join(pre.args)
             wp(f"{name}.add_precondition({pname}({pargs}))")
         
         # Negative preconditions with generalized handling
@@ -747,35 +758,20 @@ def generate_up_code(knowledge, out_dir):
         for line in neg_precond_lines:
             wp(line)
         
-        # Add constraint for parameters of same type
-        type_to_params = {}
-        for p in params:
-            param_type = types.get(p, 'object')
-            if param_type == "Unknown":
-                param_type = "object"
-            
-            if param_type not in type_to_params:
-                type_to_params[param_type] = []
-            type_to_params[param_type].append(p)
-        
         # Add inequality constraints for same-type parameters
-        for param_type, param_list in type_to_params.items():
-            if len(param_list) > 1:
-                # Add inequality constraints
-                for i in range(len(param_list)):
-                    for j in range(i + 1, len(param_list)):
-                        wp(f"{name}.add_precondition(Not(Equals({param_list[i]}, {param_list[j]})))")
+        for first, second in same_type_parameter_pairs(params, types):
+            wp(f"{name}.add_precondition(Not(Equals({first}, {second})))")
         
         # Delete effects
-        for eff in act.get("del_effects", []):
-            ename = eff["name"]
-            eargs = ", ".join(eff["args"])
+        for eff in act.del_effects:
+            ename = eff.name
+            eargs = ", ".join(eff.args)
             wp(f"{name}.add_effect({ename}({eargs}), False)")
         
         # Add effects
-        for eff in act.get("add_effects", []):
-            ename = eff["name"]
-            eargs = ", ".join(eff["args"])
+        for eff in act.add_effects:
+            ename = eff.name
+            eargs = ", ".join(eff.args)
             wp(f"{name}.add_effect({ename}({eargs}), True)")
         
         # Add action to problem
@@ -791,6 +787,119 @@ def generate_up_code(knowledge, out_dir):
     return "\n".join(lines)
 
 
+def build_up_problem(knowledge):
+    """
+    Build the Unified Planning Problem directly in memory.
+    Same steps and names as generate_up_code: every name the generated source
+    would bind (types, fluents, objects, actions, parameters, wildcard
+    variables) is kept in a namespace dict, so references resolve exactly as
+    they would when executing generated_up.py.
+    """
+    
+    from unified_planning.shortcuts import (
+        UserType, BoolType, Fluent, Object, Problem, InstantaneousAction, Variable, Not, Exists, Equals
+    )
+    
+    # Convert numeric values to valid UP strings
+    knowledge = convert_numbers_to_strings(knowledge)
+    
+    namespace = {}
+
+    def declare_type(var, up_name):
+        namespace[var] = UserType(up_name)
+
+    def expression(fluent_name, args):
+        return namespace[fluent_name](*[namespace[arg] for arg in args])
+
+    # Original types
+    for t in knowledge.types:
+        declare_type(t.capitalize(), t)
+    
+    # Supertypes
+    supertype_lines, supertype_objects = generate_supertype_definitions(knowledge)
+    for supertype_name in supertype_objects:
+        declare_type(supertype_name, supertype_name.lower())
+    
+    # Additional types from fluent signatures
+    for var, up_name in additional_type_declarations(knowledge):
+        declare_type(var, up_name)
+
+    all_fluents = collect_all_fluents_from_knowledge(knowledge)
+    
+    # Fluents
+    created_additional_types = set()
+    for f in all_fluents:
+        params = resolve_fluent_signature(knowledge, f, created_additional_types, declare_type)
+        namespace[f] = Fluent(f, BoolType(), **{var: namespace[resolved_type] for var, resolved_type in params})
+
+    problem = Problem('from_prolog')
+    for f in all_fluents:
+        problem.add_fluent(namespace[f], default_initial_value=False)
+
+    # Objects
+    objects_created = []
+    for obj in extract_string_objects_from_knowledge(knowledge):
+        effective_type = resolve_object_type(obj, knowledge, supertype_objects, created_additional_types, declare_type)
+        namespace[obj] = Object(obj, namespace[effective_type])
+        objects_created.append(namespace[obj])
+    problem.add_objects(objects_created)
+
+    # Initial state and goals
+    for pred in knowledge.init_state:
+        problem.set_initial_value(expression(pred.name, pred.args), True)
+    for pred in knowledge.goal_state:
+        problem.add_goal(expression(pred.name, pred.args))
+
+    # Actions
+    for act in knowledge.actions:
+        name = act.name
+        params = act.parameters
+        types = resolve_action_types(knowledge, act)
+        
+        action = InstantaneousAction(name, **{
+            p: namespace[action_parameter_type(types.get(p, 'object'), knowledge)] for p in params
+        })
+        namespace[name] = action
+        for p in params:
+            namespace[p] = action.parameter(p)
+        
+        for pre in act.preconditions:
+            action.add_precondition(expression(pre.name, pre.args))
+        
+        for pname, expr, vars_for_exists in plan_negative_preconditions(knowledge, name, act):
+            for var, type_name in vars_for_exists:
+                namespace[var] = Variable(var, namespace[type_name])
+            if vars_for_exists:
+                variables = [namespace[var] for var, _ in vars_for_exists]
+                action.add_precondition(Not(Exists(expression(pname, expr), *variables)))
+            else:
+                action.add_precondition(Not(expression(pname, expr)))
+        
+        for first, second in same_type_parameter_pairs(params, types):
+            action.add_precondition(Not(Equals(namespace[first], namespace[second])))
+        
+        for eff in act.del_effects:
+            action.add_effect(expression(eff.name, eff.args), False)
+        for eff in act.add_effects:
+            action.add_effect(expression(eff.name, eff.args), True)
+        
+        problem.add_action(action)
+
+    return problem
+
+
+def write_pddl(problem, out_dir):
+    """Write generated_domain.pddl and generated_problem.pddl for problem into out_dir"""
+    from unified_planning.io import PDDLWriter
+    
+    domain_file = os.path.join(out_dir, "generated_domain.pddl")
+    problem_file = os.path.join(out_dir, "generated_problem.pddl")
+    writer = PDDLWriter(problem)
+    writer.write_domain(domain_file)
+    writer.write_problem(problem_file)
+    return domain_file, problem_file
+
+
 if __name__ == "__main__":
     # Handle standalone execution
     json_file = "extracted_knowledge.json"
@@ -1,9 +1,18 @@
+import os
 import time
-import re
-from pyswip import Prolog
+import logging
+from collections import namedtuple
+from pyswip import Prolog, Functor, Atom, Variable
+
+from patterns import (IDENTIFIER_RE, TERM_STRING_RE, TYPE_FACT_RE, CALL_RE,
+                      match_fluent, match_typed_fluent, match_type_constraint, effect_inner,
+                      split_top_level)
+from symbols import SymbolTable, symbol_table, WILDCARD, DIGITS, NUMERIC, FLUENT_NAME, SIMPLE
+
+logger = logging.getLogger(__name__)
 
 def improve_type_constraints_inference(knowledge):
-    print("\nImproving type constraints inference...")
+    logger.debug("Improving type constraints inference...")
     
     for action in knowledge['actions']:
         action_name = action['name']
@@ -22,10 +31,9 @@ def improve_type_constraints_inference(knowledge):
                     for item_str in action.get(section, []):
                         if param_name in item_str:
                             
-                            fluent_match = re.match(r'([a-zA-Z_][a-zA-Z0-9_]*)\((.*?)\)', item_str)
+                            fluent_match = match_typed_fluent(item_str)
                             if fluent_match:
-                                fluent_name = fluent_match.group(1)
-                                fluent_args = [arg.strip() for arg in fluent_match.group(2).split(',')]
+                                fluent_name, fluent_args = fluent_match
                                 
                                 
                                 if param_name in fluent_args:
@@ -67,7 +75,7 @@ def improve_type_constraints_inference(knowledge):
                         inferred_type = 'pos'
                 
                 if inferred_type:
-                    print(f"  Inferred type for {action_name}.{param_name} ({param_value}): {inferred_type}")
+                    logger.debug("  Inferred type for %s.%s (%s): %s", action_name, param_name, param_value, inferred_type)
                     type_constraints[param_name] = inferred_type
                     
                     
@@ -81,13 +89,61 @@ def improve_type_constraints_inference(knowledge):
     return knowledge
 
 
-def extract_prolog_knowledge(prolog_file):
-    start_time = time.time()
-    print(f"Starting extraction from Prolog file...")
+# Single findall over every user-defined arity-1 predicate: one round-trip
+# returns the whole type -> instances table. Compound arguments contribute
+# their functor name, as in the per-predicate scan; lists (the arguments of
+# init_state/goal_state) are not instances and are skipped.
+TYPE_DISCOVERY_QUERY = (
+    "findall([T, V], "
+    "(current_predicate(user:T/1), "
+    "functor(H, T, 1), "
+    "\\+ predicate_property(user:H, built_in), "
+    "\\+ predicate_property(user:H, imported_from(_)), "
+    "predicate_property(user:H, number_of_clauses(_)), "
+    "arg(1, H, X), "
+    "catch(user:H, _, fail), "
+    "(atomic(X) -> V = X ; compound(X), \\+ is_list(X), functor(X, V, _))), "
+    "Pairs)"
+)
+
+
+def _instance_to_str(instance_value):
+    if hasattr(instance_value, 'name'):
+        return str(instance_value.name)
+    elif hasattr(instance_value, 'value'):
+        return str(instance_value.value)
+    elif isinstance(instance_value, str):
+        return instance_value
+    return str(instance_value)
+
+
+def discover_type_predicates(prolog):
+    type_predicates = {}
+    seen = {}
     
-    prolog = Prolog()
+    solutions = list(prolog.query(TYPE_DISCOVERY_QUERY))
+    if not solutions:
+        return type_predicates
     
-    prolog.consult(prolog_file)
+    for type_value, instance_value in solutions[0]['Pairs']:
+        type_name = _instance_to_str(type_value)
+        processed_value = _instance_to_str(instance_value)
+        
+        if not processed_value or processed_value.startswith('_'):
+            continue
+        
+        if type_name not in type_predicates:
+            type_predicates[type_name] = []
+            seen[type_name] = set()
+        
+        if processed_value not in seen[type_name]:
+            type_predicates[type_name].append(processed_value)
+            seen[type_name].add(processed_value)
+    
+    return type_predicates
+
+
+def _discover_type_predicates_by_scan(prolog, prolog_file):
     type_predicates = {}
 
     try:
@@ -97,52 +153,33 @@ def extract_prolog_knowledge(prolog_file):
             content = f.read()
         
         
-        import re
-        type_patterns = re.findall(r'^([a-zA-Z_][a-zA-Z0-9_]*)\([^)]+\)\s*\.', content, re.MULTILINE)
+        type_patterns = TYPE_FACT_RE.findall(content)
         predicates_found.update(type_patterns)
         
         
-        action_patterns = re.findall(r'([a-zA-Z_][a-zA-Z0-9_]*)\([^)]+\)', content)
+        action_patterns = CALL_RE.findall(content)
         predicates_found.update([p for p in action_patterns if p not in ['action', 'add', 'del']])
         
-        print(f"DEBUG: Found potential type predicates: {predicates_found}")
+        logger.debug("Found potential type predicates: %s", predicates_found)
         
         for predicate in predicates_found:
             try:
                 query_str = f"{predicate}(X)"
-                print(f"DEBUG: Querying {query_str}")
+                logger.debug("Querying %s", query_str)
                 instances = list(prolog.query(query_str))
-                print(f"DEBUG: Query {query_str} returned: {instances}")
+                logger.debug("Query %s returned: %s", query_str, instances)
                 
                 if instances:
                     valid_instances = []
                     for instance in instances:
                         instance_value = instance['X']
-                        print(f"DEBUG: Processing instance {instance_value} of type {type(instance_value)}")
-                        
-                        
-                        processed_value = None
-                        
-                        if hasattr(instance_value, 'name'):
-                            
-                            processed_value = str(instance_value.name)
-                        elif hasattr(instance_value, 'value'):
-                            
-                            processed_value = str(instance_value.value)
-                        elif isinstance(instance_value, str):
-                            
-                            processed_value = instance_value
-                        elif isinstance(instance_value, (int, float)):
-                            
-                            processed_value = str(instance_value)
-                        else:
-                            
-                            processed_value = str(instance_value)
+                        logger.debug("Processing instance %s of type %s", instance_value, type(instance_value))
                         
+                        processed_value = _instance_to_str(instance_value)
                         
                         if processed_value and not processed_value.startswith('_'):
                             valid_instances.append(processed_value)
-                            print(f"DEBUG: Added valid instance: {processed_value}")
+                            logger.debug("Added valid instance: %s", processed_value)
                     
                     if valid_instances:
                         
@@ -154,346 +191,294 @@ def extract_prolog_knowledge(prolog_file):
                                 seen.add(item)
                         
                         type_predicates[predicate] = unique_instances
-                        print(f"DEBUG: Type {predicate} has instances: {unique_instances}")
+                        logger.debug("Type %s has instances: %s", predicate, unique_instances)
                     else:
-                        print(f"DEBUG: No valid instances found for {predicate}")
+                        logger.debug("No valid instances found for %s", predicate)
                 else:
-                    print(f"DEBUG: No instances found for {predicate}")
+                    logger.debug("No instances found for %s", predicate)
             except Exception as e:
-                print(f"DEBUG: Error querying {predicate}: {e}")
+                logger.debug("Error querying %s: %s", predicate, e)
                 continue
-        
-        print(f"DEBUG: Final type_predicates: {type_predicates}")
                 
     except Exception as e:
-        print(f"Warning: General type extraction failed: {e}")
-        print("Falling back to manual type detection...")
+        logger.warning("General type extraction failed: %s, falling back to manual type detection", e)
     
+    return type_predicates
+
+
+ACTION_QUERY = "action(Head, Precond, NegPrecond, ResourcePrecond, TypeConstraints, Effects)"
+
+# Structured view of a PySwip result: compounds become PredicateRecord,
+# unbound variables become VarRef keyed by their Prolog name (_G123 / _123),
+# atoms and numbers become plain strings.
+PredicateRecord = namedtuple("PredicateRecord", ["name", "args"])
+VarRef = namedtuple("VarRef", ["id"])
+
+
+def _parse_term_string(text):
+    # Only used when PySwip has already flattened compounds into strings.
+    text = text.strip()
+    if text.startswith('[') and text.endswith(']'):
+        return tuple(_parse_term_string(item) for item in split_top_level(text[1:-1]))
+    
+    match = TERM_STRING_RE.match(text)
+    if match:
+        return PredicateRecord(match.group(1),
+                               tuple(_parse_term_string(arg) for arg in split_top_level(match.group(2))))
+    return text
+
+
+def walk_term(term):
+    if isinstance(term, Functor):
+        return PredicateRecord(_instance_to_str(term.name), tuple(walk_term(arg) for arg in term.args))
+    elif isinstance(term, Variable):
+        return VarRef(str(term))
+    elif isinstance(term, Atom):
+        return str(term.value)
+    elif isinstance(term, (list, tuple)):
+        return tuple(walk_term(item) for item in term)
+    elif isinstance(term, str):
+        return _parse_term_string(term) if '(' in term or term.startswith('[') else term
+    return str(term)
+
+
+def render_term(term, mapping=None):
+    mapping = mapping or {}
+    if isinstance(term, PredicateRecord):
+        if not term.args:
+            return term.name
+        return f"{term.name}({', '.join(render_term(arg, mapping) for arg in term.args)})"
+    elif isinstance(term, VarRef):
+        return mapping.get(term.id, term.id)
+    elif isinstance(term, tuple):
+        return f"[{', '.join(render_term(item, mapping) for item in term)}]"
+    return mapping.get(term, term)
+
+
+def term_to_record(term, symbols, mapping=None):
+    # (name id, arg id, ...), the arguments rendered as in the string forms
+    if isinstance(term, PredicateRecord):
+        return symbols.record(term.name, [render_term(arg, mapping) for arg in term.args])
+    return (symbols.intern(render_term(term, mapping)),)
+
+
+def _query_terms(prolog, query_str):
+    # normalize=False keeps Functor/Atom/Variable objects instead of the
+    # flattened strings returned by default; older PySwip lacks the keyword.
+    try:
+        solutions = list(prolog.query(query_str, normalize=False))
+    except TypeError:
+        solutions = list(prolog.query(query_str))
+    return [{key: walk_term(value) for key, value in _solution_bindings(solution)} for solution in solutions]
+
+
+def _solution_bindings(solution):
+    # With normalize=False PySwip yields each solution as a list of
+    # =(Name, Value) functors; the fallback query yields a dict.
+    if isinstance(solution, dict):
+        return solution.items()
+    return ((_instance_to_str(binding.args[0]), binding.args[1]) for binding in solution)
+
+
+def query_action_solutions(prolog):
+    action_solutions = []
+    try:
+        for solution in _query_terms(prolog, ACTION_QUERY):
+            action_solutions.append({
+                'head': solution['Head'],
+                'preconditions': list(solution['Precond']),
+                'neg_preconditions': list(solution['NegPrecond']),
+                'resource_preconditions': list(solution['ResourcePrecond']),
+                'type_constraints': list(solution['TypeConstraints']),
+                'effects': list(solution['Effects'])
+            })
+    except Exception as e:
+        logger.warning("Could not query actions: %s", e)
     
-    print("DEBUG: Extracting additional types from action constraints...")
+    return action_solutions
+
+
+def _query_state_terms(prolog, state_predicate):
+    solutions = _query_terms(prolog, f"{state_predicate}(X)")
+    if not solutions:
+        return []
+    return list(solutions[0]['X'])
+
+
+def _add_constraint_types(prolog, action_solutions, type_predicates):
+    queried = set()
     
-    try:
+    for solution in action_solutions:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processing type constraints: %s", [render_term(c) for c in solution['type_constraints']])
         
-        for solution in prolog.query("action(Head, Precond, NegPrecond, ResourcePrecond, TypeConstraints, Effects)"):
-            type_constraints = solution['TypeConstraints']
-            print(f"DEBUG: Processing type constraints: {type_constraints}")
+        for constraint in solution['type_constraints']:
+            if not isinstance(constraint, PredicateRecord) or not constraint.args:
+                continue
             
-            for constraint in type_constraints:
-                constraint_str = str(constraint)
-                print(f"DEBUG: Processing constraint: {constraint_str}")
-                
-                
-                match = re.match(r'([a-zA-Z_][a-zA-Z0-9_]*)\([^)]+\)', constraint_str)
-                if match:
-                    type_name = match.group(1)
-                    print(f"DEBUG: Found type from constraint: {type_name}")
-                    
-                    
-                    if type_name not in type_predicates:
-                        try:
-                            query_str = f"{type_name}(X)"
-                            instances = list(prolog.query(query_str))
-                            if instances:
-                                valid_instances = []
-                                for instance in instances:
-                                    instance_value = instance['X']
-                                    
-                                    
-                                    processed_value = None
-                                    if hasattr(instance_value, 'name'):
-                                        processed_value = str(instance_value.name)
-                                    elif hasattr(instance_value, 'value'):
-                                        processed_value = str(instance_value.value)
-                                    elif isinstance(instance_value, str):
-                                        processed_value = instance_value
-                                    elif isinstance(instance_value, (int, float)):
-                                        processed_value = str(instance_value)
-                                    else:
-                                        processed_value = str(instance_value)
-                                    
-                                    if processed_value and not processed_value.startswith('_'):
-                                        valid_instances.append(processed_value)
-                                
-                                if valid_instances:
-                                    
-                                    unique_instances = []
-                                    seen = set()
-                                    for item in valid_instances:
-                                        if item not in seen:
-                                            unique_instances.append(item)
-                                            seen.add(item)
-                                    
-                                    type_predicates[type_name] = unique_instances
-                                    print(f"DEBUG: Added type {type_name} with instances: {unique_instances}")
-                        except Exception as e:
-                            print(f"DEBUG: Could not query type {type_name}: {e}")
-                            continue
-    except Exception as e:
-        print(f"DEBUG: Error in additional type extraction: {e}")
+            type_name = constraint.name
+            if not IDENTIFIER_RE.match(type_name):
+                continue
+            if type_name in type_predicates or type_name in queried:
+                continue
+            queried.add(type_name)
+            logger.debug("Found type from constraint: %s", type_name)
+            
+            try:
+                instances = list(prolog.query(f"{type_name}(X)"))
+            except Exception as e:
+                logger.debug("Could not query type %s: %s", type_name, e)
+                continue
+            
+            unique_instances = []
+            seen = set()
+            for instance in instances:
+                processed_value = _instance_to_str(instance['X'])
+                if processed_value and not processed_value.startswith('_') and processed_value not in seen:
+                    unique_instances.append(processed_value)
+                    seen.add(processed_value)
+            
+            if unique_instances:
+                type_predicates[type_name] = unique_instances
+                logger.debug("Added type %s with instances: %s", type_name, unique_instances)
+    
+    return type_predicates
+
 
+def _build_action(solution, symbols):
+    head = solution['head']
+    if not isinstance(head, PredicateRecord) or not head.args:
+        return None
+    
+    param_values = [render_term(arg) for arg in head.args]
+    param_names = [f"Param{i+1}" for i in range(len(param_values))]
+    
+    # Variables and constants of the head map to positional parameter names
+    param_mapping = {}
+    for val, param_name in zip(param_values, param_names):
+        param_mapping[val] = param_name
+    
+    predicates = {
+        'preconditions': [term_to_record(t, symbols, param_mapping) for t in solution['preconditions']],
+        'neg_preconditions': [term_to_record(t, symbols, param_mapping) for t in solution['neg_preconditions']],
+        'add_effects': [],
+        'del_effects': []
+    }
     
-    init_state_query = list(prolog.query("init_state(X)"))
-    if init_state_query:
-        init_state_list = init_state_query[0]['X']
-        init_state = []
-        for item in init_state_list:
-            
-            init_state.append(str(item))
-    else:
-        init_state = []
+    processed_effects = []
+    for effect in solution['effects']:
+        processed_effects.append(render_term(effect, param_mapping))
+        if isinstance(effect, PredicateRecord) and effect.name in ('add', 'del') and len(effect.args) == 1:
+            predicates[f"{effect.name}_effects"].append(term_to_record(effect.args[0], symbols, param_mapping))
+        else:
+            predicates['add_effects'].append(term_to_record(effect, symbols, param_mapping))
+    
+    processed_type_constraints = []
+    type_constraint_dict = {}
+    for constraint in solution['type_constraints']:
+        if not isinstance(constraint, PredicateRecord) or not constraint.args:
+            continue
+        if not IDENTIFIER_RE.match(constraint.name):
+            continue
+        
+        processed_params = [render_term(arg, param_mapping) for arg in constraint.args]
+        for raw_arg in constraint.args:
+            raw_value = render_term(raw_arg)
+            if raw_value in param_mapping:
+                type_constraint_dict[param_mapping[raw_value]] = constraint.name
+        
+        processed_type_constraints.append(f"{constraint.name}({', '.join(processed_params)})")
+    
+    return {
+        'name': head.name,
+        'parameters': param_names,
+        'param_values': param_values,
+        'preconditions': [render_term(t, param_mapping) for t in solution['preconditions']],
+        'neg_preconditions': [render_term(t, param_mapping) for t in solution['neg_preconditions']],
+        'resource_preconditions': [render_term(t, param_mapping) for t in solution['resource_preconditions']],
+        'type_constraints': processed_type_constraints,
+        'effects': processed_effects,
+        
+        '_type_constraint_dict': type_constraint_dict,
+        '_predicates': predicates
+    }
+
+
+def _quote_atom(text):
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def unload_prolog_file(prolog_file):
+    """
+    Remove the clauses consulted from prolog_file (unload_file/1).
+    The SWI-Prolog engine is shared by the whole process: a long-running
+    caller has to unload each knowledge base before consulting the next one,
+    or its type facts and actions would leak into the following extraction.
+    """
+    prolog = Prolog()
+    list(prolog.query(f"unload_file({_quote_atom(os.path.abspath(prolog_file))})"))
+
+
+def extract_prolog_knowledge(prolog_file, discovery="findall"):
+    start_time = time.time()
+    logger.info("Starting extraction from Prolog file...")
     
+    prolog = Prolog()
     
-    goal_state_query = list(prolog.query("goal_state(X)"))
-    if goal_state_query:
-        goal_state_list = goal_state_query[0]['X']
-        goal_state = []
-        for item in goal_state_list:
-            
-            goal_state.append(str(item))
+    prolog.consult(prolog_file)
+    type_predicates = {}
+
+    if discovery == "findall":
+        try:
+            type_predicates = discover_type_predicates(prolog)
+        except Exception as e:
+            logger.warning("Single-pass type discovery failed: %s, falling back to per-predicate scan", e)
+            type_predicates = _discover_type_predicates_by_scan(prolog, prolog_file)
     else:
-        goal_state = []
+        type_predicates = _discover_type_predicates_by_scan(prolog, prolog_file)
     
+    logger.debug("Final type_predicates: %s", type_predicates)
     
-    actions = []
-    try:
-        
-        for solution in prolog.query("action(Head, Precond, NegPrecond, ResourcePrecond, TypeConstraints, Effects)"):
-            action_head = str(solution["Head"])
-            
-            
-            if '(' in action_head:
-                action_name = action_head.split('(')[0]
-                
-                
-                params_match = re.match(r'[^(]+\((.*)\)', action_head)
-                param_values = []
-                if params_match:
-                    params_str = params_match.group(1)
-                    
-                    param_values = []
-                    current_param = ""
-                    paren_count = 0
-                    
-                    for char in params_str:
-                        if char == ',' and paren_count == 0:
-                            param_values.append(current_param.strip())
-                            current_param = ""
-                        else:
-                            if char == '(':
-                                paren_count += 1
-                            elif char == ')':
-                                paren_count -= 1
-                            current_param += char
-                    
-                    if current_param:
-                        param_values.append(current_param.strip())
-                
-                
-                param_names = [f"Param{i+1}" for i in range(len(param_values))]
-                
-                
-                
-                param_mapping = {}
-                param_order_map = {}  
-                
-                for idx, val in enumerate(param_values):
-                    param_name = param_names[idx]
-                    param_mapping[str(val)] = param_name
-                    param_order_map[param_name] = idx
-                
-                
-                def replace_params(expr, mapping, param_values_list):
-                    expr_str = str(expr)
-                    
-                    
-                    sorted_params = sorted(mapping.items(), key=lambda x: len(x[0]), reverse=True)
-                    
-                    
-                    temp_expr = expr_str
-                    replacements = []
-                    
-                    
-                    for val, name in sorted_params:
-                        
-                        
-                        pattern = r'\b' + re.escape(val) + r'\b'
-                        matches = list(re.finditer(pattern, temp_expr))
-                        
-                        for match in matches:
-                            replacements.append((match.start(), match.end(), val, name))
-                    
-                    
-                    replacements.sort(key=lambda x: x[0], reverse=True)
-                    
-                    
-                    result = temp_expr
-                    for start, end, val, name in replacements:
-                        result = result[:start] + name + result[end:]
-                    
-                    return result
-                
-                
-                processed_preconditions = []
-                for precond in solution['Precond']:
-                    processed_preconditions.append(replace_params(precond, param_mapping, param_values))
-                
-                
-                processed_neg_preconditions = []
-                for neg_precond in solution['NegPrecond']:
-                    processed_neg_preconditions.append(replace_params(neg_precond, param_mapping, param_values))
-                
-                
-                processed_resource_preconditions = []
-                for res_precond in solution['ResourcePrecond']:
-                    processed_resource_preconditions.append(replace_params(res_precond, param_mapping, param_values))
-                
-                
-                processed_type_constraints = []
-                type_constraint_dict = {}  
-                
-                for constraint in solution['TypeConstraints']:
-                    constraint_str = str(constraint)
-                    
-                    
-                    constraint_match = re.match(r'([a-zA-Z_][a-zA-Z0-9_]*)\((.*?)\)', constraint_str)
-                    if constraint_match:
-                        type_name = constraint_match.group(1)
-                        params_in_constraint = constraint_match.group(2)
-                        
-                        
-                        constraint_params = []
-                        current = ""
-                        paren_count = 0
-                        
-                        for char in params_in_constraint:
-                            if char == ',' and paren_count == 0:
-                                constraint_params.append(current.strip())
-                                current = ""
-                            else:
-                                if char == '(':
-                                    paren_count += 1
-                                elif char == ')':
-                                    paren_count -= 1
-                                current += char
-                        
-                        if current:
-                            constraint_params.append(current.strip())
-                        
-                        
-                        for cp in constraint_params:
-                            cp_str = str(cp).strip()
-                            if cp_str in param_mapping:
-                                param_name = param_mapping[cp_str]
-                                type_constraint_dict[param_name] = type_name
-                        
-                        
-                        processed_params = []
-                        for cp in constraint_params:
-                            cp_str = str(cp).strip()
-                            if cp_str in param_mapping:
-                                processed_params.append(param_mapping[cp_str])
-                            else:
-                                processed_params.append(cp_str)
-                        
-                        if processed_params:
-                            processed_constraint = f"{type_name}({', '.join(processed_params)})"
-                            processed_type_constraints.append(processed_constraint)
-                
-                
-                processed_effects = []
-                for effect in solution['Effects']:
-                    
-                    effect_str = str(effect)
-                    
-                    
-                    if 'add(' in effect_str:
-                        match = re.search(r'add\((.*?)\)', effect_str)
-                        if match:
-                            inner = match.group(1)
-                            replaced_inner = replace_params(inner, param_mapping, param_values)
-                            effect_str = effect_str.replace(match.group(0), f"add({replaced_inner})")
-                    
-                    
-                    if 'del(' in effect_str:
-                        match = re.search(r'del\((.*?)\)', effect_str)
-                        if match:
-                            inner = match.group(1)
-                            replaced_inner = replace_params(inner, param_mapping, param_values)
-                            effect_str = effect_str.replace(match.group(0), f"del({replaced_inner})")
-                    
-                    processed_effects.append(effect_str)
-                
-                
-                action_info = {
-                    'name': action_name,
-                    'parameters': param_names,
-                    'param_values': param_values,
-                    'preconditions': processed_preconditions,
-                    'neg_preconditions': processed_neg_preconditions,
-                    'resource_preconditions': processed_resource_preconditions,
-                    'type_constraints': processed_type_constraints,
-                    'effects': processed_effects,
-                    
-                    '_type_constraint_dict': type_constraint_dict
-                }
-                actions.append(action_info)
-            else:
-                print(f"Warning: Invalid action head format")
-    except Exception as e:
-        print(f"Warning: Could not extract actions directly: {e}")
-        import traceback
-        traceback.print_exc()
+    
+    action_solutions = query_action_solutions(prolog)
+    logger.debug("Materialized %s action solutions", len(action_solutions))
+    
+    logger.debug("Extracting additional types from action constraints...")
+    _add_constraint_types(prolog, action_solutions, type_predicates)
 
     
-    for action in actions:
-        for constraint in action['type_constraints']:
-            match = re.match(r'([a-zA-Z_]+)\((.*?)\)', constraint)
-            if match and match.group(1) not in type_predicates:
-                pred_name = match.group(1)
-                try:
-                    instances = list(prolog.query(f"{pred_name}(X)"))
-                    if instances:
-                        valid_instances = []
-                        for instance in instances:
-                            instance_value = instance['X']
-                            
-                            
-                            processed_value = None
-                            if hasattr(instance_value, 'name'):
-                                processed_value = str(instance_value.name)
-                            elif hasattr(instance_value, 'value'):
-                                processed_value = str(instance_value.value)
-                            elif isinstance(instance_value, str):
-                                processed_value = instance_value
-                            elif isinstance(instance_value, (int, float)):
-                                processed_value = str(instance_value)
-                            else:
-                                processed_value = str(instance_value)
-                            
-                            if processed_value and not processed_value.startswith('_'):
-                                valid_instances.append(processed_value)
-                        
-                        if valid_instances:
-                            
-                            unique_instances = []
-                            seen = set()
-                            for item in valid_instances:
-                                if item not in seen:
-                                    unique_instances.append(item)
-                                    seen.add(item)
-                            
-                            type_predicates[pred_name] = unique_instances
-                            print(f"DEBUG: Added type {pred_name} from action constraints: {unique_instances}")
-                except Exception:
-                    
-                    pass
+    init_state_terms = _query_state_terms(prolog, "init_state")
+    init_state = [render_term(t) for t in init_state_terms]
+    
     
+    goal_state_terms = _query_state_terms(prolog, "goal_state")
+    goal_state = [render_term(t) for t in goal_state_terms]
+    
+    
+    symbols = SymbolTable()
+    actions = []
+    for solution in action_solutions:
+        try:
+            action_info = _build_action(solution, symbols)
+        except Exception as e:
+            logger.warning("Could not extract action %s: %s", render_term(solution['head']), e, exc_info=True)
+            continue
+        
+        if action_info:
+            actions.append(action_info)
+        else:
+            logger.warning("Invalid action head format")
+
     
     knowledge = {
         'types': type_predicates,  
         'init_state': init_state,
         'goal_state': goal_state,
-        'actions': actions
+        'actions': actions,
+        
+        '_init_state_predicates': [term_to_record(t, symbols) for t in init_state_terms],
+        '_goal_state_predicates': [term_to_record(t, symbols) for t in goal_state_terms],
+        '_symbols': symbols
     }
     
     
@@ -518,9 +503,8 @@ def extract_prolog_knowledge(prolog_file):
         
         for effect in action['effects']:
             if 'add(' in effect or 'del(' in effect:
-                match = re.search(r'add\((.*?)\)', effect) or re.search(r'del\((.*?)\)', effect)
-                if match:
-                    inner_fluent = match.group(1)
+                inner_fluent = effect_inner(effect)
+                if inner_fluent is not None:
                     fluent_name = inner_fluent.split('(')[0]
                     fluent_names.add(fluent_name)
     
@@ -528,76 +512,115 @@ def extract_prolog_knowledge(prolog_file):
     
     knowledge = improve_type_constraints_inference(knowledge)
     
+    knowledge['_fluent_usage_index'] = build_fluent_usage_index(knowledge)
+    
     extraction_time = time.time() - start_time
-    print(f"Extraction completed in {extraction_time:.4f} seconds")
+    logger.info("Extraction completed in %.4f seconds", extraction_time)
         
     return knowledge
 
 
+# One entry per literal that uses a fluent: init/goal facts (score 100,
+# action_idx None) and action preconditions (score = number of type
+# constraints of the action), in knowledge order. Keyed by fluent name id,
+# args are symbol ids. Effects are not uses: the (add|del)\((.*?)\) match of
+# their string form stops at the first ')' and never yields a whole fluent.
+FluentUse = namedtuple("FluentUse", ["args", "source", "score", "action_idx"])
+
+
+def _fluent_use(symbols, text, record):
+    """(name id, arg ids) of the fluent in text, None when match_fluent rejects it"""
+    flags = symbols.flags
+    # The record gives the same split as the string when the name and every
+    # argument survive it unchanged; otherwise parse the string
+    if (record is not None and len(record) > 1 and flags[record[0]] & FLUENT_NAME
+            and all(flags[arg] & SIMPLE for arg in record[1:])):
+        return record[0], record[1:]
+    match = match_fluent(text)
+    if not match:
+        return None
+    return symbols.intern(match[0]), symbols.intern_all(match[1])
+
+
+def build_fluent_usage_index(knowledge):
+    symbols = symbol_table(knowledge)
+    index = {}
+    
+    for state_name in ('init', 'goal'):
+        state_list = knowledge[f'{state_name}_state']
+        records = knowledge.get(f'_{state_name}_state_predicates') or [None] * len(state_list)
+        for state, record in zip(state_list, records):
+            use = _fluent_use(symbols, state, record)
+            if use:
+                index.setdefault(use[0], []).append(FluentUse(use[1], state_name, 100, None))
+    
+    for action_idx, action in enumerate(knowledge['actions']):
+        action_score = len(action.get('type_constraints', []))
+        
+        preconditions = action['preconditions']
+        records = action['_predicates']['preconditions'] if '_predicates' in action else [None] * len(preconditions)
+        for precondition, record in zip(preconditions, records):
+            use = _fluent_use(symbols, precondition, record)
+            if use:
+                index.setdefault(use[0], []).append(FluentUse(use[1], action['name'], action_score, action_idx))
+    
+    return index
+
+
+def _action_param_to_type(action):
+    param_to_type = {}
+    for constraint in action.get('type_constraints', []):
+        constraint_match = match_type_constraint(constraint)
+        if constraint_match:
+            type_name, param_names = constraint_match
+            for param in param_names:
+                param_to_type[param] = type_name
+    return param_to_type
+
+
 def analyze_fluent_signatures(knowledge):
     fluent_signatures = {}
     
+    usage_index = knowledge.get('_fluent_usage_index')
+    if usage_index is None:
+        usage_index = build_fluent_usage_index(knowledge)
+    symbols = symbol_table(knowledge)
+    flags = symbols.flags
     
+    # Objects no literal uses have no id and are never looked up
     object_to_type = {}
     for type_name, instances in knowledge['types'].items():
         for instance in instances:
-            object_to_type[str(instance)] = type_name
-    
-    
+            object_id = symbols.ids.get(str(instance))
+            if object_id is not None:
+                object_to_type[object_id] = type_name
     
     fluent_usage = {}  
+    param_types_by_action = {}
     
-    def extract_param_types_from_action(fluent_str, action):
-        match = re.match(r'([a-zA-Z_]+)\((.*?)\)', fluent_str)
-        if not match:
-            return []
+    def extract_param_types_from_action(params, action_idx):
         
-        fluent_name = match.group(1)
-        params_str = match.group(2)
-        params = [p.strip() for p in params_str.split(',')]
+        if action_idx not in param_types_by_action:
+            action = knowledge['actions'][action_idx]
+            # _type_constraint_dict takes precedence over the constraint strings
+            param_to_type = symbols.by_id(_action_param_to_type(action))
+            param_to_type.update(symbols.by_id(action.get('_type_constraint_dict', {})))
+            param_types_by_action[action_idx] = param_to_type
+        param_to_type = param_types_by_action[action_idx]
         
         param_types = []
-        
-        
-        type_constraint_dict = action.get('_type_constraint_dict', {})
-        
-        
-        action_type_constraints = action.get('type_constraints', [])
-        param_to_type = {}
-        
-        for constraint in action_type_constraints:
-            constraint_match = re.match(r'([a-zA-Z_]+)\((.*?)\)', constraint)
-            if constraint_match:
-                type_name = constraint_match.group(1)
-                param_names = constraint_match.group(2)
-                
-                
-                if ',' in param_names:
-                    for param in param_names.split(','):
-                        param = param.strip()
-                        if param:
-                            param_to_type[param] = type_name
-                else:
-                    param_to_type[param_names.strip()] = type_name
-        
         for param in params:
-            
-            if param in type_constraint_dict:
-                param_types.append(type_constraint_dict[param])
-            
-            elif param in param_to_type:
-                param_types.append(param_to_type[param])
-            
-            elif param in object_to_type:
-                param_types.append(object_to_type[param])
-            
-            elif param.isdigit() or (param.replace('-', '').replace('.', '').isdigit()):
-                param_types.append('pos')
-            
-            elif param.startswith('_'):
-                param_types.append('wildcard')
-            else:
-                param_types.append('Unknown')
+            param_type = param_to_type.get(param)
+            if param_type is None:
+                param_type = object_to_type.get(param)
+            if param_type is None:
+                if flags[param] & NUMERIC:
+                    param_type = 'pos'
+                elif flags[param] & WILDCARD:
+                    param_type = 'wildcard'
+                else:
+                    param_type = 'Unknown'
+            param_types.append(param_type)
         
         return param_types
     
@@ -606,45 +629,21 @@ def analyze_fluent_signatures(knowledge):
         if fluent_name not in fluent_usage:
             fluent_usage[fluent_name] = []
         
-        
-        for state_list, state_name in [(knowledge['init_state'], 'init'), (knowledge['goal_state'], 'goal')]:
-            for state in state_list:
-                if state.startswith(fluent_name + '('):
-                    param_types = []
-                    match = re.match(r'([a-zA-Z_]+)\((.*?)\)', state)
-                    if match:
-                        params = [p.strip() for p in match.group(2).split(',')]
-                        for param in params:
-                            if param in object_to_type:
-                                param_types.append(object_to_type[param])
-                            elif param.isdigit():
-                                param_types.append('pos')
-                            else:
-                                param_types.append('Unknown')
-                    
-                    if param_types:
-                        
-                        fluent_usage[fluent_name].append((param_types, 100, state_name))
-        
-        
-        for action in knowledge['actions']:
-            action_score = len(action.get('type_constraints', []))
-            
-            
-            for precond in action['preconditions']:
-                if precond.startswith(fluent_name + '('):
-                    param_types = extract_param_types_from_action(precond, action)
-                    if param_types:
-                        fluent_usage[fluent_name].append((param_types, action_score, action['name']))
-            
+        for use in usage_index.get(symbols.ids.get(fluent_name), []):
+            if use.action_idx is None:
+                param_types = []
+                for param in use.args:
+                    if param in object_to_type:
+                        param_types.append(object_to_type[param])
+                    elif flags[param] & DIGITS:
+                        param_types.append('pos')
+                    else:
+                        param_types.append('Unknown')
+            else:
+                param_types = extract_param_types_from_action(use.args, use.action_idx)
             
-            for effect in action['effects']:
-                if 'add(' in effect or 'del(' in effect:
-                    match = re.search(r'add\((.*?)\)', effect) or re.search(r'del\((.*?)\)', effect)
-                    if match and match.group(1).startswith(fluent_name + '('):
-                        param_types = extract_param_types_from_action(match.group(1), action)
-                        if param_types:
-                            fluent_usage[fluent_name].append((param_types, action_score, action['name']))
+            if param_types:
+                fluent_usage[fluent_name].append((param_types, use.score, use.source))
     
     
     for fluent_name, usage_list in fluent_usage.items():
@@ -695,81 +694,48 @@ def analyze_fluent_signatures(knowledge):
         fluent_signatures[fluent_name] = final_signature
     
     
-    fluent_signatures = _resolve_unknowns_across_actions(fluent_signatures, knowledge)
+    fluent_signatures = _resolve_unknowns_across_actions(fluent_signatures, knowledge, usage_index)
     
     return fluent_signatures
 
-def _resolve_unknowns_across_actions(fluent_signatures, knowledge):
+def _resolve_unknowns_across_actions(fluent_signatures, knowledge, usage_index=None):
     
+    if usage_index is None:
+        usage_index = build_fluent_usage_index(knowledge)
+    symbols = symbol_table(knowledge)
     
-    param_usage_patterns = {}  
-    
+    param_to_type_by_action = []
     for action in knowledge['actions']:
         
         type_constraint_dict = action.get('_type_constraint_dict', {})
         
         
         if not type_constraint_dict:
-            type_constraints = action.get('type_constraints', [])
-            
-            
-            param_to_type = {}
-            for constraint in type_constraints:
-                constraint_match = re.match(r'([a-zA-Z_]+)\((.*?)\)', constraint)
-                if constraint_match:
-                    type_name = constraint_match.group(1)
-                    param_names = constraint_match.group(2)
-                    
-                    if ',' in param_names:
-                        for param in param_names.split(','):
-                            param = param.strip()
-                            if param:
-                                param_to_type[param] = type_name
-                    else:
-                        param_to_type[param_names.strip()] = type_name
+            param_to_type_by_action.append(symbols.by_id(_action_param_to_type(action)))
         else:
-            param_to_type = type_constraint_dict
-        
-        
-        all_fluent_uses = []
-        all_fluent_uses.extend(action['preconditions'])
-        
-        for effect in action['effects']:
-            if 'add(' in effect:
-                match = re.search(r'add\((.*?)\)', effect)
-                if match:
-                    all_fluent_uses.append(match.group(1))
-            elif 'del(' in effect:
-                match = re.search(r'del\((.*?)\)', effect)
-                if match:
-                    all_fluent_uses.append(match.group(1))
-        
-        for fluent_use in all_fluent_uses:
-            match = re.match(r'([a-zA-Z_]+)\((.*?)\)', fluent_use)
-            if not match:
+            param_to_type_by_action.append(symbols.by_id(type_constraint_dict))
+    
+    
+    # (fluent id, position) -> {param id: type}, the last action using a param wins
+    position_param_types = {}  
+    
+    for fluent_id, uses in usage_index.items():
+        for use in uses:
+            if use.action_idx is None:
                 continue
-                
-            fluent_name = match.group(1)
-            params = [p.strip() for p in match.group(2).split(',')]
             
-            for pos, param in enumerate(params):
+            param_to_type = param_to_type_by_action[use.action_idx]
+            for pos, param in enumerate(use.args):
                 if param in param_to_type:
-                    if param not in param_usage_patterns:
-                        param_usage_patterns[param] = {}
-                    if fluent_name not in param_usage_patterns[param]:
-                        param_usage_patterns[param][fluent_name] = {}
-                    param_usage_patterns[param][fluent_name][pos] = param_to_type[param]
+                    position_param_types.setdefault((fluent_id, pos), {})[param] = param_to_type[param]
     
     
     for fluent_name, signature in fluent_signatures.items():
+        fluent_id = symbols.ids.get(fluent_name)
         for pos, param_type in enumerate(signature):
             if param_type == 'Unknown':
                 
-                candidate_types = set()
-                
-                for param_name, usage_pattern in param_usage_patterns.items():
-                    if fluent_name in usage_pattern and pos in usage_pattern[fluent_name]:
-                        candidate_types.add(usage_pattern[fluent_name][pos])
+                candidate_types = set(position_param_types.get((fluent_id, pos), {}).values())
                 
                 if len(candidate_types) == 1:
                     signature[pos] = list(candidate_types)[0]
@@ -0,0 +1,124 @@
+"""
+Slotted record classes for the JSON intermediate representation, used by
+prolog2up_V2 and pddl_writer.
+
+Knowledge.from_json builds them in one pass from the dict json.load (or
+compact_ir.load_knowledge) returns, optionally renaming the literal
+arguments on the way (prolog2up_V2 turns numbers into x-prefixed UP
+names); to_json gives the dict back, same keys in the same order. A literal
+is a frozen Predicate holding a tuple instead of a dict holding a list.
+
+The caller's dict is never modified. The only parts the code generators
+change, action type constraints (completed by resolve_action_types) and
+fluent signatures (extended by plan_negative_preconditions), are copied;
+everything else is shared with the dict.
+"""
+
+from dataclasses import dataclass
+
+from type_index import build_object_type_index, build_object_supertype_index, SupertypeIndex
+
+SECTIONS = ("preconditions", "neg_preconditions", "add_effects", "del_effects")
+
+
+@dataclass(frozen=True)
+class Predicate:
+    __slots__ = ("name", "args", "wildcard_positions")
+    name: str
+    args: tuple
+    wildcard_positions: tuple  # None when the JSON literal has no wildcard_positions
+
+    def __reduce__(self):
+        # copy and pickle would set the slots one by one, which frozen forbids
+        return Predicate, (self.name, self.args, self.wildcard_positions)
+
+    @classmethod
+    def from_json(cls, data, rename=None):
+        args = data["args"]
+        wildcard_positions = data.get("wildcard_positions")
+        return cls(data["name"],
+                   tuple(map(rename, args)) if rename else tuple(args),
+                   None if wildcard_positions is None else tuple(wildcard_positions))
+
+    def to_json(self):
+        result = {"name": self.name, "args": list(self.args)}
+        if self.wildcard_positions is not None:
+            result["wildcard_positions"] = list(self.wildcard_positions)
+        return result
+
+
+@dataclass
+class Action:
+    __slots__ = ("name", "parameters", "type_constraints") + SECTIONS
+    name: str
+    parameters: list
+    type_constraints: dict
+    preconditions: tuple
+    neg_preconditions: tuple
+    add_effects: tuple
+    del_effects: tuple
+
+    @classmethod
+    def from_json(cls, data, rename=None):
+        return cls(data["name"], data["parameters"], dict(data["type_constraints"]),
+                   *(tuple(Predicate.from_json(pred, rename) for pred in data.get(section, ()))
+                     for section in SECTIONS))
+
+    def to_json(self):
+        result = {"name": self.name, "parameters": list(self.parameters),
+                  "type_constraints": dict(self.type_constraints)}
+        for section in SECTIONS:
+            result[section] = [pred.to_json() for pred in getattr(self, section)]
+        return result
+
+
+@dataclass
+class Knowledge:
+    __slots__ = ("types", "fluents", "fluent_signatures", "object_types", "init_state", "goal_state",
+                 "actions", "supertypes", "object_supertypes", "supertype_index")
+    types: dict
+    fluents: list
+    fluent_signatures: dict
+    object_types: dict
+    init_state: tuple
+    goal_state: tuple
+    actions: list
+    supertypes: dict           # {} when the knowledge has no supertypes
+    object_supertypes: dict
+    supertype_index: SupertypeIndex     # built from supertypes, not serialized
+
+    @classmethod
+    def from_json(cls, data, rename=None):
+        """Records of a knowledge dict; rename, if given, is applied to every literal argument"""
+        types = data.get("types", {})
+        supertypes = data.get("supertypes", {})
+        object_types = data.get("object_types")
+        object_supertypes = data.get("object_supertypes")
+        return cls(
+            types,
+            data.get("fluents", []),
+            {name: list(signature) for name, signature in data.get("fluent_signatures", {}).items()},
+            object_types if object_types is not None else build_object_type_index(types),
+            tuple(Predicate.from_json(pred, rename) for pred in data.get("init_state", ())),
+            tuple(Predicate.from_json(pred, rename) for pred in data.get("goal_state", ())),
+            [Action.from_json(action, rename) for action in data.get("actions", ())],
+            supertypes,
+            object_supertypes if object_supertypes is not None else build_object_supertype_index(supertypes, types),
+            SupertypeIndex(supertypes)
+        )
+
+    def to_json(self):
+        """The knowledge dict, laid out as kb_to_json writes it"""
+        result = {
+            "types": self.types,
+            "fluents": self.fluents,
+            "fluent_signatures": self.fluent_signatures,
+            "object_types": self.object_types,
+            "init_state": [pred.to_json() for pred in self.init_state],
+            "goal_state": [pred.to_json() for pred in self.goal_state],
+            "actions": [action.to_json() for action in self.actions]
+        }
+        if self.supertypes:
+            result["supertypes"] = self.supertypes
+            result["object_supertypes"] = self.object_supertypes
+        return result
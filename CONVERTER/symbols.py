@@ -0,0 +1,82 @@
+"""
+Symbol table shared by prolog_extractor and kb_to_json.
+
+The extractor interns every predicate name, object and ParamN placeholder
+of the PySwip terms and keeps each literal as a tuple of ids, (name id,
+arg id, ...), next to its string form. Step 2 indexes and compares those
+ints instead of re-splitting "name(arg, ...)" strings, and the argument
+tests it repeats for every use of a fluent (wildcard, number) are
+computed once per name, when it is interned, as bit flags. kb_to_json
+turns the records back into {"name", "args"} dicts for the JSON
+representation.
+"""
+
+from patterns import FLUENT_NAME_RE
+
+# Per-symbol flags
+WILDCARD = 1      # _, _G123, _1
+DIGITS = 2        # str.isdigit()
+NUMERIC = 4       # digits once '-' and '.' are removed
+FLUENT_NAME = 8   # the whole name matches the name group of patterns.FLUENT_RE
+SIMPLE = 16       # split back unchanged from "name(a, b)": no ( ) , newline or surrounding blanks
+
+
+def _flags(name):
+    flags = 0
+    if name.startswith("_"):
+        flags |= WILDCARD
+    if name.isdigit():
+        flags |= DIGITS
+    if name.replace('-', '').replace('.', '').isdigit():
+        flags |= NUMERIC
+    if FLUENT_NAME_RE.fullmatch(name):
+        flags |= FLUENT_NAME
+    if name == name.strip() and not any(char in name for char in "(),\n"):
+        flags |= SIMPLE
+    return flags
+
+
+class SymbolTable:
+    """name <-> small integer id, ids given in interning order"""
+
+    __slots__ = ("ids", "names", "flags")
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+        self.flags = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        symbol = self.ids.get(name)
+        if symbol is None:
+            symbol = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.flags.append(_flags(name))
+        return symbol
+
+    def intern_all(self, names):
+        return tuple(self.intern(name) for name in names)
+
+    def record(self, name, args):
+        """(name id, arg id, ...) of a literal"""
+        return (self.intern(name),) + self.intern_all(args)
+
+    def predicate(self, record):
+        """{"name", "args"} dict of a record, as in the JSON representation"""
+        names = self.names
+        return {"name": names[record[0]], "args": [names[arg] for arg in record[1:]]}
+
+    def by_id(self, mapping):
+        """mapping re-keyed by symbol id; names never interned can't be looked up and are dropped"""
+        ids = self.ids
+        return {ids[name]: value for name, value in mapping.items() if name in ids}
+
+
+def symbol_table(knowledge):
+    """Return knowledge["_symbols"], creating an empty table on first use"""
+    if "_symbols" not in knowledge:
+        knowledge["_symbols"] = SymbolTable()
+    return knowledge["_symbols"]
@@ -0,0 +1,130 @@
+"""
+Type lookup tables shared by the JSON conversion and prolog2up_V2.
+
+The object -> type tables are built once from knowledge["types"] /
+knowledge["supertypes"] and carried in the knowledge structure as
+"object_types" and "object_supertypes", so every argument lookup is a dict
+access instead of a scan over all type instance lists. When an object
+belongs to several types the first one in knowledge order wins, as with the
+linear scans.
+
+SupertypeIndex answers the type set -> supertype questions: the supertype
+made of exactly a set of types (type_inference, when it creates them) and
+the first one covering a set (prolog2up_V2, for parameters used with
+several types).
+"""
+
+
+def build_object_type_index(types):
+    """object -> first type listing it"""
+    index = {}
+    for type_name, instances in types.items():
+        for instance in instances:
+            index.setdefault(instance, type_name)
+    return index
+
+
+def build_object_supertype_index(supertypes, types):
+    """object -> first supertype whose constituent types list it"""
+    index = {}
+    for supertype_name, constituent_types in supertypes.items():
+        for constituent_type in constituent_types:
+            for instance in types.get(constituent_type, []):
+                if isinstance(instance, str):
+                    index.setdefault(instance, supertype_name)
+    return index
+
+
+def object_type_index(knowledge):
+    """Return knowledge["object_types"], building it on first use"""
+    if "object_types" not in knowledge:
+        knowledge["object_types"] = build_object_type_index(knowledge.get("types", {}))
+    return knowledge["object_types"]
+
+
+def object_supertype_index(knowledge):
+    """Return knowledge["object_supertypes"], building it on first use"""
+    if "object_supertypes" not in knowledge:
+        knowledge["object_supertypes"] = build_object_supertype_index(
+            knowledge.get("supertypes", {}), knowledge.get("types", {})
+        )
+    return knowledge["object_supertypes"]
+
+
+class SupertypeIndex:
+    """
+    Supertypes keyed by the frozenset of their constituent types, so the one
+    for an exact set is a dict lookup. A union-find over the types groups
+    those sharing a supertype: a set spanning two groups has no covering
+    supertype, otherwise only its group's supertypes are checked, and the
+    answer is memoized per set.
+    """
+
+    def __init__(self, supertypes=None):
+        self.by_members = {}    # frozenset of types -> supertype name
+        self.members = {}       # supertype name -> frozenset of types, in registration order
+        self._parent = {}       # type -> parent type, union-find
+        self._group = {}        # root type -> supertype names of its group (registration order once sorted)
+        self._order = {}        # supertype name -> registration number
+        self._unsorted = set()  # roots whose group changed since it was last sorted
+        self._covering = {}     # frozenset -> first covering supertype name or None
+        for name, types in (supertypes or {}).items():
+            self.add(name, types)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __eq__(self, other):
+        return isinstance(other, SupertypeIndex) and list(self.members.items()) == list(other.members.items())
+
+    def _find(self, type_name):
+        parent = self._parent
+        root = type_name
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while type_name != root:
+            parent[type_name], type_name = root, parent[type_name]
+        return root
+
+    def add(self, name, types):
+        """Register supertype name made of types; an already registered set keeps its first name"""
+        types = frozenset(types)
+        self.by_members.setdefault(types, name)
+        self.members[name] = types
+        self._order.setdefault(name, len(self._order))
+        self._covering.clear()
+
+        # Union by size: the largest group absorbs the others, and is sorted again on its next lookup
+        roots = sorted({self._find(type_name) for type_name in types},
+                       key=lambda root: (-len(self._group.get(root, ())), root))
+        if not roots:
+            return
+        group = self._group.setdefault(roots[0], [])
+        for other in roots[1:]:
+            group.extend(self._group.pop(other, ()))
+            self._parent[other] = roots[0]
+        group.append(name)
+        self._unsorted.add(roots[0])
+
+    def _sorted_group(self, root):
+        if root in self._unsorted:
+            self._unsorted.discard(root)
+            self._group[root].sort(key=self._order.__getitem__)
+        return self._group.get(root, ())
+
+    def get(self, types):
+        """Supertype made of exactly types, or None"""
+        return self.by_members.get(frozenset(types))
+
+    def covering(self, types):
+        """First registered supertype whose constituent types include all of types, or None"""
+        types = frozenset(types)
+        if types not in self._covering:
+            roots = {self._find(type_name) for type_name in types}
+            candidates = self._sorted_group(roots.pop()) if len(roots) == 1 else ()
+            self._covering[types] = next((name for name in candidates if types <= self.members[name]), None)
+        return self._covering[types]
+
+    def to_json(self):
+        """{supertype: sorted constituent types}, as in knowledge["supertypes"]"""
+        return {name: sorted(types) for name, types in self.members.items()}
@@ -0,0 +1,361 @@
+"""
+Type inference for the JSON representation, run by kb_to_json (Step 3)
+once the actions are converted.
+
+A single scan of the literals (init_state, goal_state, then the sections of
+every action) builds an occurrence index: the uses of each fluent and the
+(fluent, position) pairs each action argument appears at. The passes read
+the index instead of rescanning every action section:
+
+1. an undeclared parameter takes the declared and Step 2 signature types
+   seen for its name across the actions, the one its own action's literals
+   use most winning, else the first known type at its own positions, else
+   "object" - so every parameter is typed after this pass;
+2. fluent signatures are resolved from the typed actions (add effects,
+   then preconditions and delete effects of the fluents no action adds);
+3. positions used with several types get a supertype;
+4. literals whose arity differs from the resolved signature are rebuilt.
+
+Each pass runs once: none of them feeds an earlier one, so there is no
+fixed point to iterate to.
+
+Ties are broken by the order the evidence was found in (action order, then
+section order), never by set iteration order, so the result does not
+depend on PYTHONHASHSEED.
+"""
+
+import logging
+
+from type_index import object_type_index, build_object_supertype_index, SupertypeIndex
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("preconditions", "neg_preconditions", "add_effects", "del_effects")
+# Arity fixes go action by action, and within an action section by section
+# in this order. The preconditions are rebuilt before the add effects, so
+# only an add effect that already has the expected arity serves them as a
+# template; the delete effects also see the add effects rebuilt before them
+SYNC_ORDER = {"neg_preconditions": 0, "preconditions": 1, "add_effects": 2, "del_effects": 3}
+
+
+def _constant_type(value, object_types):
+    type_name = object_types.get(value)
+    if type_name is not None:
+        return type_name
+    if str(value).isdigit() or (str(value).replace('-', '').replace('.', '').isdigit()):
+        return "pos"
+    return "Unknown"
+
+
+def _known_types(uses, signatures):
+    """Non-Unknown signature types at the (fluent, position) uses, in order, without repeats"""
+    types = {}
+    for fluent, position in uses:
+        sig = signatures.get(fluent, [])
+        if position < len(sig) and sig[position] != "Unknown":
+            types[sig[position]] = None
+    return types
+
+
+class TypeInference:
+    """Occurrence index of a kb_to_json result and the inference passes over it"""
+
+    def __init__(self, knowledge):
+        self.knowledge = knowledge
+        self.actions = knowledge["actions"]
+        self.signatures = knowledge["fluent_signatures"]
+        self.object_types = object_type_index(knowledge)
+        self.occurrences = []       # (action index, None for the states; section; literal), in scan order
+        self.fluent_uses = {}       # fluent -> indices into occurrences
+        self.argument_uses = {}     # (action index, argument) -> [(fluent, position)]
+        for section in ("init_state", "goal_state"):
+            for literal in knowledge[section]:
+                self._add(None, section, literal)
+        for action_index, action in enumerate(self.actions):
+            for section in SECTIONS:
+                for literal in action.get(section, []):
+                    self._add(action_index, section, literal)
+
+    def _add(self, action_index, section, literal):
+        name = literal["name"]
+        self.fluent_uses.setdefault(name, []).append(len(self.occurrences))
+        self.occurrences.append((action_index, section, literal))
+        if action_index is not None:
+            for position, arg in enumerate(literal["args"]):
+                self.argument_uses.setdefault((action_index, arg), []).append((name, position))
+
+    def infer_parameter_types(self):
+        """Give every undeclared action parameter a type"""
+        # Candidates per parameter name, shared by all the actions
+        candidates = {}
+        for action in self.actions:
+            for param, ptype in action["type_constraints"].items():
+                types = candidates.setdefault(param, {})
+                if ptype != "Unknown":
+                    types[ptype] = None
+        for (action_index, arg), uses in self.argument_uses.items():
+            if arg.startswith("Param"):
+                candidates.setdefault(arg, {}).update(_known_types(uses, self.signatures))
+
+        for action_index, action in enumerate(self.actions):
+            tdict = action["type_constraints"]
+            for param in action["parameters"]:
+                if tdict.get(param, "Unknown") != "Unknown":
+                    continue
+                uses = self.argument_uses.get((action_index, param), ())
+                types = list(candidates.get(param, ()))
+                if len(types) > 1:
+                    # The candidate the action's own literals use most, the first found on ties
+                    scores = dict.fromkeys(types, 0)
+                    for fluent, position in uses:
+                        sig = self.signatures.get(fluent, [])
+                        if position < len(sig) and sig[position] in scores:
+                            scores[sig[position]] += 1
+                    tdict[param] = max(scores, key=scores.get)
+                elif types:
+                    tdict[param] = types[0]
+                else:
+                    local_types = list(_known_types(uses, self.signatures))
+                    tdict[param] = local_types[0] if local_types else "object"
+
+    def _typed_signature(self, action, literal):
+        """Argument types of an action literal, None if one can't be typed"""
+        type_constraints = action["type_constraints"]
+        signature = []
+        for arg in literal["args"]:
+            if arg in type_constraints:
+                signature.append(type_constraints[arg])
+            elif arg.startswith("_"):
+                return None
+            else:
+                inferred_type = _constant_type(arg, self.object_types)
+                if inferred_type == "Unknown":
+                    return None
+                signature.append(inferred_type)
+        return signature or None
+
+    def resolve_signatures(self):
+        """Fluent signatures from the typed actions"""
+        candidates = {}     # fluent -> [(signature, score, source)]
+
+        for action_index, section, literal in self.occurrences:
+            if section != "add_effects":
+                continue
+            action = self.actions[action_index]
+            signature = self._typed_signature(action, literal)
+            if signature:
+                candidates.setdefault(literal["name"], []).append(
+                    (signature, len(action["type_constraints"]), action["name"]))
+
+        # Fluents no action adds: the first typed precondition or delete effect, at half score
+        for action_index, section, literal in self.occurrences:
+            if section not in ("preconditions", "del_effects") or literal["name"] in candidates:
+                continue
+            action = self.actions[action_index]
+            signature = self._typed_signature(action, literal)
+            if signature:
+                candidates[literal["name"]] = [
+                    (signature, len(action["type_constraints"]) * 0.5, f"{action['name']}__{section}")]
+
+        for fluent_name, fluent_candidates in candidates.items():
+            fluent_candidates.sort(key=lambda c: c[1], reverse=True)
+            best_signature, best_score, source_action = fluent_candidates[0]
+            if len(fluent_candidates) == 1:
+                self.signatures[fluent_name] = best_signature
+                logger.debug("  Single signature for %s: %s (from %s)", fluent_name, best_signature, source_action)
+                continue
+
+            # Majority over the candidates scoring at least 80% of the best, with the most common
+            # arity (the shortest on ties); per position the most common type, the first found on ties
+            high_score_candidates = [c for c in fluent_candidates if c[1] >= best_score * 0.8]
+            lengths = [len(c[0]) for c in high_score_candidates]
+            most_common_length = max(sorted(set(lengths)), key=lengths.count)
+            consistent_candidates = [c for c in high_score_candidates if len(c[0]) == most_common_length]
+
+            final_signature = []
+            for pos in range(most_common_length):
+                type_counts = {}
+                for c in consistent_candidates:
+                    type_counts[c[0][pos]] = type_counts.get(c[0][pos], 0) + 1
+                final_signature.append(max(type_counts, key=type_counts.get))
+
+            self.signatures[fluent_name] = final_signature
+            logger.debug("  Resolved signature for %s: %s (from %s consistent sources)",
+                         fluent_name, final_signature, len(consistent_candidates))
+
+    def detect_polymorphic_fluents(self):
+        """Supertypes for the fluent positions used with several types"""
+        logger.debug("=== DETECTING POLYMORPHIC FLUENTS ===")
+
+        fluent_usage_analysis = {}      # fluent -> {position: types}
+        for action_index, section, literal in self.occurrences:
+            type_constraints = self.actions[action_index]["type_constraints"] if action_index is not None else {}
+            position_types = fluent_usage_analysis.setdefault(literal["name"], {})
+            for pos, arg in enumerate(literal["args"]):
+                types = position_types.setdefault(pos, set())
+                arg_type = None
+                if arg in type_constraints:
+                    arg_type = type_constraints[arg]
+                elif not arg.startswith("_") and not arg.startswith("Param"):
+                    arg_type = self.object_types.get(arg)
+                if arg_type and arg_type != "Unknown":
+                    types.add(arg_type)
+
+        supertypes = SupertypeIndex()
+        fluent_signature_updates = {}
+
+        for fluent_name, position_types in fluent_usage_analysis.items():
+            logger.debug("Analyzing fluent: %s", fluent_name)
+
+            needs_supertype = False
+            new_signature = []
+
+            max_position = max(position_types.keys()) if position_types else -1
+
+            for pos in range(max_position + 1):
+                types_at_position = position_types.get(pos, set())
+
+                logger.debug("  Position %s: %s", pos, types_at_position)
+
+                if len(types_at_position) > 1:
+                    needs_supertype = True
+
+                    existing_supertype = supertypes.get(types_at_position)
+                    if existing_supertype:
+                        new_signature.append(existing_supertype)
+                        logger.debug("    -> Using existing supertype: %s", existing_supertype)
+                    else:
+                        supertype_name = f"SuperType{len(supertypes) + 1}"
+                        supertypes.add(supertype_name, types_at_position)
+                        new_signature.append(supertype_name)
+                        logger.debug("    -> Created new supertype: %s = %s", supertype_name, types_at_position)
+
+                elif len(types_at_position) == 1:
+                    new_signature.append(next(iter(types_at_position)))
+                else:
+                    new_signature.append("Unknown")
+
+            if needs_supertype:
+                fluent_signature_updates[fluent_name] = new_signature
+                logger.debug("  Updated signature: %s: %s", fluent_name, new_signature)
+
+        if supertypes:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Created %s supertypes:", len(supertypes))
+                for st_name, st_types in supertypes.members.items():
+                    logger.debug("  %s: %s", st_name, sorted(st_types))
+
+            knowledge = self.knowledge
+            knowledge["supertypes"] = supertypes.to_json()
+            knowledge["object_supertypes"] = build_object_supertype_index(knowledge["supertypes"], knowledge["types"])
+
+            self.signatures.update(fluent_signature_updates)
+
+        logger.debug("=== END POLYMORPHIC FLUENT DETECTION ===")
+
+    def synchronize_arities(self):
+        """Rebuild the action literals whose arity differs from their fluent's signature"""
+        logger.debug("=== SYNCHRONIZING FLUENT USAGE ===")
+
+        mismatched = []
+        for fluent_name, uses in self.fluent_uses.items():
+            if fluent_name not in self.signatures:
+                continue
+            expected_length = len(self.signatures[fluent_name])
+            for index in uses:
+                action_index, section_name, literal = self.occurrences[index]
+                if action_index is not None and len(literal["args"]) != expected_length:
+                    mismatched.append((action_index, SYNC_ORDER[section_name], index, expected_length))
+
+        for action_index, _, index, expected_length in sorted(mismatched):
+            action = self.actions[action_index]
+            _, section_name, literal = self.occurrences[index]
+            fluent_name = literal["name"]
+            current_args = literal["args"]
+            logger.debug("  MISMATCH in %s.%s: %s", action["name"], section_name, fluent_name)
+            logger.debug("    Current: %s args, Expected: %s args", len(current_args), expected_length)
+            logger.debug("    Current args: %s", current_args)
+
+            corrected_args = _reconstruct_fluent_args(fluent_name, current_args, expected_length, action, section_name)
+            if not corrected_args:
+                logger.debug("    Could not reconstruct args for %s", fluent_name)
+                continue
+            logger.debug("    Corrected args: %s", corrected_args)
+            literal["args"] = corrected_args
+            if section_name == "neg_preconditions":
+                literal["wildcard_positions"] = [pos for pos, arg in enumerate(corrected_args)
+                                                 if arg.startswith("_") or arg.startswith("any_")]
+                logger.debug("    Updated wildcard_positions: %s", literal["wildcard_positions"])
+
+        logger.debug("=== END SYNCHRONIZATION ===")
+
+
+def _reconstruct_fluent_args(fluent_name, current_args, expected_length, action, section_name):
+    type_constraints = action.get("type_constraints", {})
+
+    if len(current_args) == expected_length:
+        return current_args
+
+    logger.debug("    Reconstructing %s: %s -> %s", fluent_name, len(current_args), expected_length)
+    logger.debug("    Original args: %s", current_args)
+
+    if section_name == "neg_preconditions":
+        corrected_args = []
+        for i in range(expected_length):
+            if i < len(current_args):
+                current_arg = current_args[i]
+                if current_arg.startswith("Param") and current_arg in type_constraints:
+                    corrected_args.append(current_arg)
+                elif current_arg.startswith("_"):
+                    corrected_args.append(current_arg)
+                else:
+                    corrected_args.append(f"_{i}")
+            else:
+                corrected_args.append(f"_{i}")
+
+        logger.debug("    Corrected args (neg_precondition): %s", corrected_args)
+        return corrected_args
+
+    # Template: an add effect of the same fluent with the expected arity
+    for add_eff in action.get("add_effects", []):
+        if add_eff["name"] == fluent_name and len(add_eff["args"]) == expected_length:
+            template_args = add_eff["args"]
+            corrected_args = []
+            for i, template_arg in enumerate(template_args):
+                if i < len(current_args):
+                    current_arg = current_args[i]
+                    if current_arg.startswith("Param") and current_arg in type_constraints:
+                        corrected_args.append(current_arg)
+                    elif current_arg.startswith("_"):
+                        corrected_args.append(current_arg)
+                    else:
+                        corrected_args.append(template_arg)
+                else:
+                    corrected_args.append(template_arg)
+
+            logger.debug("    Corrected args (from template): %s", corrected_args)
+            return corrected_args
+
+    if len(current_args) < expected_length:
+        corrected_args = current_args.copy()
+        for i in range(len(current_args), expected_length):
+            corrected_args.append(f"_{i}")
+        logger.debug("    Corrected args (extended): %s", corrected_args)
+        return corrected_args
+
+    if len(current_args) > expected_length:
+        corrected_args = current_args[:expected_length]
+        logger.debug("    Corrected args (truncated): %s", corrected_args)
+        return corrected_args
+
+    return None
+
+
+def infer_types(knowledge):
+    """Run the inference passes on a kb_to_json result, in place; returns it"""
+    inference = TypeInference(knowledge)
+    inference.infer_parameter_types()
+    inference.resolve_signatures()
+    inference.detect_polymorphic_fluents()
+    inference.synchronize_arities()
+    return knowledge
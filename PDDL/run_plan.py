@@ -12,6 +12,94 @@ from prettytable import PrettyTable
 import shutil
 import platform
 import traceback
+import signal
+import tempfile
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Predefined search sets (and available_cores, shared with batch.py) live with the converter configuration
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "CONVERTER"))
+from planner_config import ALGORITHM_SETS, RESULT_RECORD_PREFIX, available_cores
+
+# Translated SAS+ tasks kept across runs with --sas-cache, one <hash>.sas per
+# distinct domain+problem pair; the least recently used go beyond the size limit
+SAS_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "RESULTS", "CACHE", "sas")
+SAS_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+
+def evict_sas_cache(cache_dir, max_bytes, keep=None):
+    """Remove the least recently used tasks (.sas and .log) until cache_dir fits max_bytes"""
+    tasks = {}
+    total = 0
+    for name in os.listdir(cache_dir):
+        task_hash, ext = os.path.splitext(name)
+        if ext not in (".sas", ".log"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            size = os.path.getsize(path)
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        entry = tasks.setdefault(task_hash, [0, 0])
+        entry[1] += size
+        if ext == ".sas":
+            entry[0] = mtime
+        total += size
+    
+    removed = 0
+    for mtime, size, task_hash in sorted((mtime, size, task_hash) for task_hash, (mtime, size) in tasks.items()):
+        if total <= max_bytes:
+            break
+        if task_hash == keep:
+            continue
+        for ext in (".sas", ".log"):
+            try:
+                os.remove(os.path.join(cache_dir, task_hash + ext))
+            except OSError:
+                pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def run_search_isolated(planner, search):
+    """
+    Run one search in its own temporary directory, so concurrent runs never
+    share sas_plan/output.sas. Module-level so a process pool can pickle it.
+    """
+    work_dir = tempfile.mkdtemp(prefix=f"fd_{search}_")
+    try:
+        return timed_run(planner, search, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def result_record(result):
+    """JSON-serializable summary of one search (planning_results.json, --stream-results)"""
+    return {
+        'planner': result['planner'],
+        'search': result['search'],
+        'success': result['success'],
+        'plan': result['plan'] if result['success'] and result['plan'] else [],
+        'plan_length': len(result['plan']) if result['success'] and result['plan'] else None,
+        'error': result.get('error'),
+        'stats': {key: value for key, value in result.get('stats', {}).items()
+                  if isinstance(value, (int, float))}
+    }
+
+
+def timed_run(planner, search, work_dir=None):
+    """planner.run(search) with the end-to-end time stored in stats['total_time']"""
+    start_time = time.time()
+    result = planner.run(search, work_dir=work_dir)
+    end_time = time.time()
+    
+    # Add total time to stats
+    if 'stats' not in result:
+        result['stats'] = {}
+    result['stats']['total_time'] = end_time - start_time
+    return result
 
 
 class PlannerRunner:
@@ -23,22 +111,112 @@ class PlannerRunner:
         self.timeout = timeout
         self.verbose = verbose
     
-    def run(self, search):
-        """Run the planner and return results"""
+    def run(self, search, work_dir=None):
+        """Run the planner (in work_dir, default: cwd) and return results"""
         raise NotImplementedError("Subclasses must implement run()")
 
 
 class FastDownwardRunner(PlannerRunner):
     """Runner for Fast Downward planner"""
     
-    def __init__(self, domain_file, problem_file, timeout=300, verbose=False, fd_path=None):
+    def __init__(self, domain_file, problem_file, timeout=300, verbose=False, fd_path=None,
+                 translate_once=True, sas_cache_dir=None, sas_cache_max_bytes=SAS_CACHE_MAX_BYTES):
         super().__init__(domain_file, problem_file, timeout, verbose)
         self.fd_path = self._find_fd_path(fd_path)
+        
+        # Translate-once state, filled by prepare() (translate_once=False: every search translates).
+        # Without sas_cache_dir the task lives in a temporary directory removed by cleanup()
+        self.translate_once = translate_once
+        self.sas_cache_dir = sas_cache_dir
+        self.sas_cache_max_bytes = sas_cache_max_bytes
+        self.task_dir = None
+        self.prepared = False
+        self.sas_file = None
+        self.translate_output = ""
+        self.translation = None
+    
+    def task_hash(self):
+        """Content hash of domain + problem (and the FD driver used to translate them)"""
+        digest = hashlib.sha256()
+        digest.update(os.path.realpath(self.fd_path).encode())
+        for path in (self.domain_file, self.problem_file):
+            digest.update(b"\0")
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+    
+    def prepare(self):
+        """
+        Translate PDDL to SAS+ once, so every search runs on the same
+        output.sas. With sas_cache_dir the task is also cached there by
+        content hash, so unchanged PDDL is not translated again by later
+        runs; otherwise it is written to a temporary directory that
+        cleanup() removes. If translation fails the searches fall back to
+        the full driver pipeline, which reports the error as before.
+        Returns a short status ('cached', 'translated', 'failed' or
+        'disabled').
+        """
+        if self.prepared:
+            return self.translation
+        self.prepared = True
+        
+        if not self.translate_once:
+            self.translation = "disabled"
+            return self.translation
+        
+        if self.sas_cache_dir:
+            task_dir = self.sas_cache_dir
+            os.makedirs(task_dir, exist_ok=True)
+        else:
+            task_dir = self.task_dir = tempfile.mkdtemp(prefix="fd_sas_")
+        task_hash = self.task_hash()
+        sas_file = os.path.join(task_dir, f"{task_hash}.sas")
+        log_file = os.path.join(task_dir, f"{task_hash}.log")
+        
+        if os.path.exists(sas_file):
+            self.translation = "cached"
+            # Most recently used, for evict_sas_cache
+            os.utime(sas_file)
+        else:
+            work_dir = tempfile.mkdtemp(prefix="fd_translate_")
+            try:
+                tmp_sas = os.path.join(work_dir, "output.sas")
+                cmd = [sys.executable, self.fd_path, "--sas-file", tmp_sas, "--translate",
+                       self.domain_file, self.problem_file]
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout, cwd=work_dir)
+                if result.returncode != 0 or not os.path.exists(tmp_sas):
+                    self.translation = "failed"
+                    return self.translation
+                with open(log_file, "w") as f:
+                    f.write(result.stdout + result.stderr)
+                # Atomic, so concurrent runs never see a partial task
+                os.replace(tmp_sas, sas_file)
+                self.translation = "translated"
+                if self.sas_cache_dir:
+                    evict_sas_cache(self.sas_cache_dir, self.sas_cache_max_bytes, keep=task_hash)
+            except (subprocess.TimeoutExpired, OSError):
+                self.translation = "failed"
+                return self.translation
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+        
+        self.sas_file = sas_file
+        if os.path.exists(log_file):
+            with open(log_file, "r", errors="replace") as f:
+                self.translate_output = f.read()
+        return self.translation
+    
+    def cleanup(self):
+        """Remove the temporary translated task (a cached one stays in sas_cache_dir)"""
+        if self.task_dir:
+            shutil.rmtree(self.task_dir, ignore_errors=True)
+            self.task_dir = None
+            self.sas_file = None
     
     def _find_fd_path(self, fd_path):
         """Find the Fast Downward executable"""
         if fd_path and os.path.exists(fd_path):
-            return fd_path
+            return os.path.abspath(fd_path)
             
         # Try to find Fast Downward in common locations
         possible_paths = [
@@ -50,7 +228,7 @@ class FastDownwardRunner(PlannerRunner):
         
         for path in possible_paths:
             if os.path.exists(path):
-                return path
+                return os.path.abspath(path)
         
         raise FileNotFoundError("Could not find fast-downward.py script")
     
@@ -108,15 +286,16 @@ class FastDownwardRunner(PlannerRunner):
         # Default fallback
         return search_algorithms.get(search, "lazy_greedy([ff()])")
     
-    def _extract_plan(self):
-        """Extract plan from sas_plan file"""
+    def _extract_plan(self, work_dir="."):
+        """Extract plan from the sas_plan file in work_dir"""
         plan_lines = []
-        plan_files = ['sas_plan']
+        plan_files = [os.path.join(work_dir, 'sas_plan')]
         
         # Check if there are numbered plan files
         for i in range(1, 10):
-            if os.path.exists(f"sas_plan.{i}"):
-                plan_files.append(f"sas_plan.{i}")
+            numbered_plan = os.path.join(work_dir, f"sas_plan.{i}")
+            if os.path.exists(numbered_plan):
+                plan_files.append(numbered_plan)
         
         # Try to read from each plan file
         for plan_file in plan_files:
@@ -173,9 +352,10 @@ class FastDownwardRunner(PlannerRunner):
         
         return stats
     
-    def _clean_up_plan_files(self):
-        """Remove existing plan files"""
-        for plan_file in ['sas_plan'] + [f'sas_plan.{i}' for i in range(1, 10)]:
+    def _clean_up_plan_files(self, work_dir="."):
+        """Remove existing plan files from work_dir"""
+        for plan_name in ['sas_plan'] + [f'sas_plan.{i}' for i in range(1, 10)]:
+            plan_file = os.path.join(work_dir, plan_name)
             if os.path.exists(plan_file):
                 try:
                     os.remove(plan_file)
@@ -323,17 +503,21 @@ class FastDownwardRunner(PlannerRunner):
 
     
     
-    def run(self, search):
-        """Run Fast Downward with timeout and real-time feedback"""
-        # Clean up any existing plan files
-        self._clean_up_plan_files()
-        
+    def _build_command(self, search):
+        """Fast Downward command line and search string for a search algorithm"""
         # Map search algorithm name to Fast Downward search string
         search_command = self._map_search_name(search)
         
-        # Build the command
-        cmd = [sys.executable, self.fd_path, self.domain_file, self.problem_file, "--search", search_command]
-        
+        # Build the command: search only on the translated task when there is one
+        self.prepare()
+        if self.sas_file:
+            cmd = [sys.executable, self.fd_path, self.sas_file, "--search", search_command]
+        else:
+            cmd = [sys.executable, self.fd_path, self.domain_file, self.problem_file, "--search", search_command]
+        return cmd, search_command
+    
+    def _effective_timeout(self, search):
+        """Per-algorithm timeout, never above self.timeout"""
         # Smart timeout based on algorithm type
         algorithm_timeouts = {
             'lazy_greedy': 60,     # Very fast
@@ -348,7 +532,90 @@ class FastDownwardRunner(PlannerRunner):
         
         # Use smart timeout or fallback to default
         smart_timeout = algorithm_timeouts.get(search, self.timeout)
-        effective_timeout = min(smart_timeout, self.timeout)
+        return min(smart_timeout, self.timeout)
+    
+    def _build_result(self, search, search_command, effective_timeout, output, return_code, work_dir, wall_time):
+        """Result dictionary for a Fast Downward process that exited on its own"""
+        # Check for specific error conditions with better categorization
+        error_msg = None
+        if "Parse error" in output or "parsing failed" in output:
+            error_msg = "PDDL syntax error"
+        elif "unsolvable" in output.lower() or "goal unreachable" in output.lower():
+            error_msg = "Problem unsolvable"
+        elif "Memory limit exceeded" in output or "std::bad_alloc" in output:
+            error_msg = "Out of memory"
+        elif "Time limit exceeded" in output or "TIMEOUT" in output:
+            error_msg = "Time limit exceeded"  
+        elif "Search stopped without finding a solution" in output:
+            error_msg = "No solution in limits"
+        elif "translate" in output and return_code != 0:
+            error_msg = "Translation failed"
+        elif return_code != 0:
+            error_msg = f"Failed (code {return_code})"
+        
+        # Check if solution was found
+        solution_found = (("Solution found" in output or 
+                        os.path.exists(os.path.join(work_dir, "sas_plan")) or 
+                        "search exit code: 0" in output) and 
+                        error_msg is None)
+        
+        # Extract plan
+        plan = self._extract_plan(work_dir) if solution_found else None
+        
+        # Extract statistics (translator counts come from the cached translation log)
+        stats = self._extract_stats(output)
+        for key, value in self._extract_stats(self.translate_output).items():
+            if key in ('variables', 'operators'):
+                stats.setdefault(key, value)
+        
+        # Add process timing
+        stats['process_time'] = wall_time
+        stats['wall_time'] = wall_time
+        
+        # If we have a plan but no explicit success message, confirm it's valid
+        if plan and not solution_found and error_msg is None:
+            solution_found = True
+        
+        # Build result dictionary
+        return {
+            'planner': 'fast_downward',
+            'search': search,
+            'success': solution_found,
+            'plan': plan if solution_found else [],
+            'stats': stats,
+            'output': output if self.verbose else "",
+            'error': error_msg,
+            'search_command': search_command,
+            'timeout_used': effective_timeout
+        }
+    
+    def _failure_result(self, search, search_command, effective_timeout, wall_time, output, error):
+        """Result dictionary for a run that produced no usable output"""
+        return {
+            'planner': 'fast_downward',
+            'search': search,
+            'success': False,
+            'plan': [],
+            'stats': {'wall_time': wall_time, 'process_time': wall_time},
+            'output': output,
+            'error': error,
+            'search_command': search_command,
+            'timeout_used': effective_timeout
+        }
+    
+    def run(self, search, work_dir=None):
+        """
+        Run Fast Downward with timeout and real-time feedback.
+        FD writes sas_plan (and its intermediate files) in its working
+        directory: work_dir if given, otherwise the current directory.
+        """
+        work_dir = work_dir or "."
+        
+        # Clean up any existing plan files
+        self._clean_up_plan_files(work_dir)
+        
+        cmd, search_command = self._build_command(search)
+        effective_timeout = self._effective_timeout(search)
         
         # Mark timing points
         process_start_time = time.time()
@@ -359,121 +626,150 @@ class FastDownwardRunner(PlannerRunner):
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=effective_timeout
+                timeout=effective_timeout,
+                cwd=work_dir
             )
             process_end_time = time.time()
             
             # Get the output
             output = result.stdout + result.stderr
-            
-            # Check for specific error conditions with better categorization
-            error_msg = None
-            if "Parse error" in output or "parsing failed" in output:
-                error_msg = "PDDL syntax error"
-            elif "unsolvable" in output.lower() or "goal unreachable" in output.lower():
-                error_msg = "Problem unsolvable"
-            elif "Memory limit exceeded" in output or "std::bad_alloc" in output:
-                error_msg = "Out of memory"
-            elif "Time limit exceeded" in output or "TIMEOUT" in output:
-                error_msg = "Time limit exceeded"  
-            elif "Search stopped without finding a solution" in output:
-                error_msg = "No solution in limits"
-            elif "translate" in output and result.returncode != 0:
-                error_msg = "Translation failed"
-            elif result.returncode != 0:
-                error_msg = f"Failed (code {result.returncode})"
-            
-            # Check if solution was found
-            solution_found = (("Solution found" in output or 
-                            os.path.exists("sas_plan") or 
-                            "search exit code: 0" in output) and 
-                            error_msg is None)
-            
-            # Extract plan
-            plan = self._extract_plan() if solution_found else None
-            
-            # Extract statistics  
-            stats = self._extract_stats(output)
-            
-            # Add process timing
-            stats['process_time'] = process_end_time - process_start_time
-            stats['wall_time'] = process_end_time - process_start_time
-            
-            # If we have a plan but no explicit success message, confirm it's valid
-            if plan and not solution_found and error_msg is None:
-                solution_found = True
-            
-            # Build result dictionary
-            result_dict = {
-                'planner': 'fast_downward',
-                'search': search,
-                'success': solution_found,
-                'plan': plan if solution_found else [],
-                'stats': stats,
-                'output': output if self.verbose else "",
-                'error': error_msg,
-                'search_command': search_command,
-                'timeout_used': effective_timeout
-            }
-            
-            return result_dict
+            return self._build_result(search, search_command, effective_timeout, output,
+                                      result.returncode, work_dir, process_end_time - process_start_time)
             
         except subprocess.TimeoutExpired:
-            process_end_time = time.time()
-            wall_time = process_end_time - process_start_time
-            
-            return {
-                'planner': 'fast_downward', 
-                'search': search,
-                'success': False,
-                'plan': [],
-                'stats': {'wall_time': wall_time, 'process_time': wall_time},
-                'output': f"Timed out after {wall_time:.1f}s",
-                'error': f"Timeout ({effective_timeout}s)",
-                'search_command': search_command,
-                'timeout_used': effective_timeout
-            }
+            wall_time = time.time() - process_start_time
+            return self._failure_result(search, search_command, effective_timeout, wall_time,
+                                        f"Timed out after {wall_time:.1f}s", f"Timeout ({effective_timeout}s)")
             
         except Exception as e:
-            process_end_time = time.time()
-            wall_time = process_end_time - process_start_time
-            
-            return {
-                'planner': 'fast_downward',
-                'search': search, 
-                'success': False,
-                'plan': [],
-                'stats': {'wall_time': wall_time, 'process_time': wall_time},
-                'output': f"Exception: {str(e)}",
-                'error': f"Error: {str(e)}"[:50],
-                'search_command': search_command,
-                'timeout_used': effective_timeout
-            }
+            wall_time = time.time() - process_start_time
+            return self._failure_result(search, search_command, effective_timeout, wall_time,
+                                        f"Exception: {str(e)}", f"Error: {str(e)}"[:50])
+    
+    def start(self, search, work_dir):
+        """
+        Launch Fast Downward in the background, in work_dir and in a new
+        process group (so the driver and its translate/search children can
+        be killed together). Output goes to work_dir/planner_output.txt.
+        """
+        cmd, search_command = self._build_command(search)
+        output_path = os.path.join(work_dir, "planner_output.txt")
+        with open(output_path, "w") as output_file:
+            process = subprocess.Popen(cmd, stdout=output_file, stderr=subprocess.STDOUT,
+                                       cwd=work_dir, start_new_session=True)
+        return RunningSearch(self, search, search_command, self._effective_timeout(search),
+                             process, work_dir, output_path)
+
+
+class RunningSearch:
+    """A Fast Downward process started by FastDownwardRunner.start"""
+    
+    def __init__(self, runner, search, search_command, effective_timeout, process, work_dir, output_path):
+        self.runner = runner
+        self.search = search
+        self.search_command = search_command
+        self.effective_timeout = effective_timeout
+        self.process = process
+        self.work_dir = work_dir
+        self.output_path = output_path
+        self.start_time = time.time()
+    
+    def elapsed(self):
+        return time.time() - self.start_time
+    
+    def timed_out(self):
+        return self.elapsed() > self.effective_timeout
+    
+    def kill(self):
+        """Kill the whole process group (FD driver, translate and search)"""
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except ProcessLookupError:
+            pass
+        self.process.wait()
+    
+    def result(self):
+        """Result dictionary once the process has exited on its own"""
+        with open(self.output_path, "r", errors="replace") as f:
+            output = f.read()
+        result = self.runner._build_result(self.search, self.search_command, self.effective_timeout, output,
+                                           self.process.returncode, self.work_dir, self.elapsed())
+        result['stats']['total_time'] = result['stats']['wall_time']
+        return result
+    
+    def stopped_result(self, error):
+        """Result dictionary for a run that was killed (timeout or lost race)"""
+        wall_time = self.elapsed()
+        result = self.runner._failure_result(self.search, self.search_command, self.effective_timeout,
+                                             wall_time, f"Stopped after {wall_time:.1f}s", error)
+        result['stats']['total_time'] = wall_time
+        return result
 
 
 
 class SimplifiedPlannerTool:
     """Simplified tool for running planners with minimal output"""
     
-    def __init__(self, domain_file, problem_file, output_dir=None, timeout=300, verbose=False):
+    def __init__(self, domain_file, problem_file, output_dir=None, timeout=300, verbose=False,
+                 translate_once=True, sas_cache_dir=None):
         self.domain_file = os.path.abspath(domain_file)
         self.problem_file = os.path.abspath(problem_file)
         self.timeout = timeout
         self.verbose = verbose
         self.output_dir = output_dir or os.path.dirname(problem_file)
+        # --stream-results: one JSON record per finished search
+        self.record_stream = None
+        self.record_prefix = ""
         
         # Setup planners
         self.planners = {}
         
         # Try to initialize Fast Downward
         try:
-            self.planners['fd'] = FastDownwardRunner(domain_file, problem_file, timeout, verbose)
+            self.planners['fd'] = FastDownwardRunner(domain_file, problem_file, timeout, verbose,
+                                                     translate_once=translate_once, sas_cache_dir=sas_cache_dir)
         except Exception as e:
             if verbose:
                 print(f"Fast Downward planner not available: {e}")
     
-    def run_comparison(self, planners=['fd'], search_algorithms=['lazy_greedy', 'astar_ff']):
-        """Run the comparison with specified planners and search algorithms"""
+    def close(self):
+        """Remove the temporary files the planners kept between searches"""
+        for planner in self.planners.values():
+            planner.cleanup()
+    
+    def stream_results(self, stream, prefix=""):
+        """Write a JSON record to stream (prefixed, on stdout) as soon as each search finishes"""
+        self.record_stream = stream
+        self.record_prefix = prefix
+    
+    def _emit_record(self, result):
+        if self.record_stream is None:
+            return
+        self.record_stream.write(self.record_prefix + json.dumps(result_record(result)) + "\n")
+        self.record_stream.flush()
+    
+    def _prepare_planner(self, planner):
+        """Translate once before the searches start (and before any fork)"""
+        start_time = time.time()
+        status = planner.prepare()
+        if status == "cached":
+            print(f"🔄 SAS+ task: cached translation reused")
+        elif status == "translated":
+            print(f"🔄 SAS+ task: translated once in {time.time() - start_time:.3f}s")
+        elif status == "failed":
+            print(f"⚠️  SAS+ translation failed, each search will translate on its own")
+        sys.stdout.flush()
+    
+    def run_comparison(self, planners=['fd'], search_algorithms=['lazy_greedy', 'astar_ff'], jobs=1):
+        """
+        Run the comparison with specified planners and search algorithms.
+        With jobs > 1 the searches run concurrently on a process pool, each
+        in its own temporary directory; results keep the requested order, so
+        planning_results.txt is the same as for a sequential run.
+        """
         results = []
         successful_results = []
         failed_results = []
@@ -481,49 +777,64 @@ class SimplifiedPlannerTool:
         print(f"🚀 Running {len(search_algorithms)} search algorithms...")
         print(f"📋 Algorithms: {', '.join(search_algorithms)}")
         print(f"⏱️  Individual timeout: {self.timeout}s per algorithm")
+        if jobs > 1:
+            print(f"⚡ Parallel mode: up to {jobs} searches at a time")
         print()
         
+        tasks = []
         for planner_name in planners:
             if planner_name not in self.planners:
                 print(f"⚠️  Warning: Planner '{planner_name}' not available, skipping...")
                 continue
+            self._prepare_planner(self.planners[planner_name])
+            for search in search_algorithms:
+                tasks.append((self.planners[planner_name], search))
+        
+        def report(result):
+            # Show result immediately with timing
+            if result['success']:
+                successful_results.append(result)
+                plan_length = len(result['plan']) if result['plan'] else 0
+                timing = result['stats'].get('total_time', 0)
+                print(f"✅ Found plan ({plan_length} steps) in {timing:.3f}s")
+            else:
+                failed_results.append(result)  
+                error = result.get('error', 'Unknown error')
+                timing = result['stats'].get('total_time', 0)
+                # Truncate long errors for readability
+                short_error = error if len(error) < 40 else error[:37] + "..."
+                print(f"❌ {short_error} in {timing:.3f}s")
             
-            planner = self.planners[planner_name]
-            
-            for i, search in enumerate(search_algorithms, 1):
+            # Force immediate output
+            sys.stdout.flush()
+            self._emit_record(result)
+        
+        def progress(i):
+            return "█" * (i * 20 // len(search_algorithms)) + "░" * (20 - (i * 20 // len(search_algorithms)))
+        
+        if jobs > 1 and len(tasks) > 1:
+            # Results are printed in completion order and stored in task order
+            results = [None] * len(tasks)
+            with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+                futures = {pool.submit(run_search_isolated, planner, search): index
+                           for index, (planner, search) in enumerate(tasks)}
+                for i, future in enumerate(as_completed(futures), 1):
+                    index = futures[future]
+                    result = future.result()
+                    results[index] = result
+                    print(f"  [{i:2d}/{len(tasks)}] [{progress(i)}] Finished {result['search']:15s}... ", end="")
+                    report(result)
+        else:
+            for i, (planner, search) in enumerate(tasks, 1):
                 # Progress indicator with IMMEDIATE output
-                progress_bar = "█" * (i * 20 // len(search_algorithms)) + "░" * (20 - (i * 20 // len(search_algorithms)))
-                print(f"  [{i:2d}/{len(search_algorithms)}] [{progress_bar}] Testing {search:15s}... ", end="", flush=True)
+                print(f"  [{i:2d}/{len(search_algorithms)}] [{progress(i)}] Testing {search:15s}... ", end="", flush=True)
                 
                 # Force immediate output
                 sys.stdout.flush()
                 
                 # Run the planner with the search algorithm
-                start_time = time.time()
-                result = planner.run(search)
-                end_time = time.time()
-                
-                # Add total time to stats
-                if 'stats' not in result:
-                    result['stats'] = {}
-                result['stats']['total_time'] = end_time - start_time
-                
-                # Show result immediately with timing
-                if result['success']:
-                    successful_results.append(result)
-                    plan_length = len(result['plan']) if result['plan'] else 0
-                    timing = result['stats'].get('total_time', 0)
-                    print(f"✅ Found plan ({plan_length} steps) in {timing:.3f}s")
-                else:
-                    failed_results.append(result)  
-                    error = result.get('error', 'Unknown error')
-                    timing = result['stats'].get('total_time', 0)
-                    # Truncate long errors for readability
-                    short_error = error if len(error) < 40 else error[:37] + "..."
-                    print(f"❌ {short_error} in {timing:.3f}s")
-                
-                # Force immediate output
-                sys.stdout.flush()
+                result = timed_run(planner, search)
+                report(result)
                 
                 # Save the result
                 results.append(result)
@@ -561,8 +872,82 @@ class SimplifiedPlannerTool:
         return len(successful_results) > 0
 
     
-    def _generate_unified_results(self, results):
-        """Generate a single unified results file"""
+    def race(self, planners=['fd'], search_algorithms=['lazy_greedy', 'astar_ff'], poll_interval=0.01):
+        """
+        Start all searches at once and stop at the first plan: the other
+        process groups are killed. Searches that fail keep the race going
+        until one succeeds or all have failed/timed out.
+        planning_results.txt lists the winner and the searches that finished
+        before it. Returns the winning result, or None.
+        """
+        print(f"🏁 Racing {len(search_algorithms)} search algorithms, first plan wins...")
+        print(f"📋 Algorithms: {', '.join(search_algorithms)}")
+        print()
+        
+        race_start = time.time()
+        running = []
+        work_dirs = []
+        for planner_name in planners:
+            if planner_name not in self.planners:
+                print(f"⚠️  Warning: Planner '{planner_name}' not available, skipping...")
+                continue
+            planner = self.planners[planner_name]
+            self._prepare_planner(planner)
+            for search in search_algorithms:
+                work_dir = tempfile.mkdtemp(prefix=f"fd_{search}_")
+                work_dirs.append(work_dir)
+                running.append(planner.start(search, work_dir))
+        
+        finished = []
+        winner = None
+        try:
+            while running and winner is None:
+                for entry in list(running):
+                    if entry.process.poll() is not None:
+                        result = entry.result()
+                    elif entry.timed_out():
+                        entry.kill()
+                        result = entry.stopped_result(f"Timeout ({entry.effective_timeout}s)")
+                    else:
+                        continue
+                    running.remove(entry)
+                    finished.append(result)
+                    self._emit_record(result)
+                    if result['success']:
+                        winner = result
+                        break
+                    print(f"  ❌ {entry.search:15s} {result['error']} in {result['stats']['total_time']:.3f}s")
+                    sys.stdout.flush()
+                else:
+                    time.sleep(poll_interval)
+        finally:
+            # Losers (or everything, on error/interrupt) are killed with their children
+            for entry in running:
+                entry.kill()
+            for work_dir in work_dirs:
+                shutil.rmtree(work_dir, ignore_errors=True)
+        
+        time_to_first_plan = time.time() - race_start
+        cancelled = [entry.search for entry in running]
+        
+        if winner:
+            print(f"  🏆 Winner: {winner['search']} ({len(winner['plan'])} steps)")
+            print(f"  ⏱️  Time to first plan: {time_to_first_plan:.3f}s")
+            if cancelled:
+                print(f"  🛑 Cancelled: {', '.join(cancelled)}")
+            notes = [f"Race winner: {winner['planner']}_{winner['search']}",
+                     f"Time to first plan: {time_to_first_plan:.3f}s",
+                     f"Cancelled: {', '.join(cancelled) if cancelled else 'none'}"]
+        else:
+            print(f"  ❌ No search found a plan ({time_to_first_plan:.3f}s)")
+            notes = ["Race winner: none"]
+        print()
+        
+        self._generate_unified_results(finished, notes)
+        return winner
+    
+    def _generate_unified_results(self, results, notes=None):
+        """Generate a single unified results file (notes: extra header lines)"""
         
         # Create results table
         table = PrettyTable()
@@ -593,7 +978,10 @@ class SimplifiedPlannerTool:
             f.write(f"Planning Results\n")
             f.write(f"Domain: {self.domain_file}\n")
             f.write(f"Problem: {self.problem_file}\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            for note in notes or []:
+                f.write(f"{note}\n")
+            f.write("\n")
             f.write("===== COMPARISON RESULTS =====\n")
             f.write(str(table))
             f.write("\n\n")
@@ -615,6 +1003,11 @@ class SimplifiedPlannerTool:
                     error = result.get('error', 'Unknown error')
                     f.write(f"{planner_name}_{search_name}: FAILED - {error}\n\n")
         
+        # Same results for programs (orchestrator metrics, benchmarks)
+        searches = [result_record(result) for result in results]
+        with open(os.path.join(self.output_dir, "planning_results.json"), 'w') as f:
+            json.dump({'notes': notes or [], 'searches': searches}, f, indent=2)
+        
         return results_path
 
 
@@ -633,6 +1026,22 @@ def main():
     parser.add_argument("--output-dir", help="Directory to store results")
     parser.add_argument("--verbose", action="store_true", 
                         help="Show detailed output")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Run the searches concurrently, one process per available core")
+    parser.add_argument("--race", action="store_true",
+                        help="Run all searches at once and stop at the first plan found")
+    parser.add_argument("--algorithm-set", choices=sorted(ALGORITHM_SETS),
+                        help="Use a predefined set of searches from CONVERTER/planner_config.py instead of --searches")
+    parser.add_argument("--translate-per-search", action="store_true",
+                        help="Translate PDDL to SAS+ in every search instead of once per problem")
+    parser.add_argument("--sas-cache", nargs="?", const=SAS_CACHE_DIR, metavar="DIR",
+                        help="Keep translated SAS+ tasks across runs in DIR (default: RESULTS/CACHE/sas), "
+                             f"least recently used removed beyond {SAS_CACHE_MAX_BYTES // (1024 * 1024)} MB")
+    parser.add_argument("--jobs", type=int,
+                        help="Maximum number of concurrent searches with --parallel (default: available cores)")
+    parser.add_argument("--stream-results", nargs="?", const="-", metavar="FILE",
+                        help="Write one JSON record per finished search to FILE (JSON lines), "
+                             f"or to stdout prefixed with '{RESULT_RECORD_PREFIX.strip()}' if no FILE is given")
     
     args = parser.parse_args()
     
@@ -645,6 +1054,8 @@ def main():
         print(f"Error: Problem file '{args.problem}' does not exist")
         return 1
     
+    record_file = None
+    tool = None
     try:
         # Create simplified tool
         tool = SimplifiedPlannerTool(
@@ -652,11 +1063,27 @@ def main():
             args.problem, 
             args.output_dir, 
             args.timeout, 
-            args.verbose
+            args.verbose,
+            translate_once=not args.translate_per_search,
+            sas_cache_dir=args.sas_cache
         )
         
-        # Run comparison
-        success = tool.run_comparison(args.planners, args.searches)
+        if args.algorithm_set:
+            args.searches = ALGORITHM_SETS[args.algorithm_set]
+        
+        if args.stream_results == "-":
+            tool.stream_results(sys.stdout, RESULT_RECORD_PREFIX)
+        elif args.stream_results:
+            record_file = open(args.stream_results, "w")
+            tool.stream_results(record_file)
+        
+        if args.race:
+            # First plan wins
+            success = tool.race(args.planners, args.searches) is not None
+        else:
+            # Run comparison
+            jobs = (args.jobs or available_cores()) if args.parallel else 1
+            success = tool.run_comparison(args.planners, args.searches, jobs=max(1, jobs))
         
         if success:
             print("Planning completed successfully")
@@ -670,6 +1097,11 @@ def main():
         if args.verbose:
             traceback.print_exc()
         return 1
+    finally:
+        if tool:
+            tool.close()
+        if record_file:
+            record_file.close()
 
 
 if __name__ == "__main__":
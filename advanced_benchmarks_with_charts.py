@@ -9,7 +9,6 @@ import os
 import subprocess
 import time
 import json
-import re
 from datetime import datetime
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -117,10 +116,12 @@ class AdvancedBenchmarksWithCharts:
             timeout = self.estimate_timeout(filename, prolog_path)
             print(f"    🕐 Estimated timeout: {timeout}s for {filename}")
             
-            # Esegui il converter con solving
+            # Esegui il converter con solving, le metriche finiscono in output_dir/metrics.json
+            output_dir = f"RESULTS/CONVERTER/{os.path.splitext(filename)[0]}_{datetime.now().strftime('%m%d_%H%M%S')}"
             cmd = [
                 'python3', 'CONVERTER/orchestrator.py', 
-                prolog_path, '--solve', '--hide-plans'
+                prolog_path, '--solve', '--hide-plans',
+                '--output-dir', output_dir
             ]
             
             result = subprocess.run(
@@ -140,15 +141,14 @@ class AdvancedBenchmarksWithCharts:
                     'total_execution_time': total_time
                 }
             
-            # Parse output per timing e planning results
-            stdout = result.stdout
-            stderr = result.stderr
+            # Metriche strutturate scritte dal converter
+            run_metrics = self.read_run_metrics(output_dir)
             
-            # 1. Parse planning times (formato tabella o testo)
-            planning_metrics = self.parse_planning_results(stdout, stderr)
+            # 1. Planning times per algoritmo
+            planning_metrics = self.planning_metrics_from(run_metrics)
             
-            # 2. Parse step-by-step times 
-            step_metrics = self.parse_step_times(stdout, stderr)
+            # 2. Step-by-step times
+            step_metrics = self.step_metrics_from(run_metrics)
             
             # 3. Combine metrics
             metrics = {
@@ -189,8 +189,16 @@ class AdvancedBenchmarksWithCharts:
         else:
             return base_timeout
     
-    def parse_planning_results(self, stdout, stderr):
-        """Parse risultati planning da output"""
+    def read_run_metrics(self, output_dir):
+        """Carica il metrics.json scritto dal converter in output_dir"""
+        metrics_path = os.path.join(output_dir, 'metrics.json')
+        if not os.path.exists(metrics_path):
+            raise FileNotFoundError(f'metrics.json not found in {output_dir}')
+        with open(metrics_path) as f:
+            return json.load(f)
+    
+    def planning_metrics_from(self, run_metrics):
+        """Statistiche di planning dai risultati per algoritmo di metrics.json"""
         metrics = {
             'planning_best_time': None,
             'planning_avg_time': None, 
@@ -203,147 +211,66 @@ class AdvancedBenchmarksWithCharts:
             'plan_steps': None
         }
         
-        try:
-            # 1. CERCA PATTERN PLANNING RESULTS TABLE
-            table_pattern = r'\|\s*fast_downward\s*\|\s*(\w+)\s*\|\s*(Yes|No)\s*\|\s*(\d+|N/A)\s*\|\s*([\d.]+|N/A)\s*\|\s*([\d.]+)\s*\|\s*(\d+|N/A)\s*\|'
-            table_matches = re.findall(table_pattern, stdout)
-            
-            if table_matches:
-                print(f"    🔍 Found {len(table_matches)} algorithm results in table format")
-                
-                search_times = []
-                total_times = []
-                plan_lengths = []
-                successful_algos = 0
-                total_algos = len(table_matches)
-                
-                for match in table_matches:
-                    algorithm, success, plan_length, search_time, total_time, expanded_states = match
-                    
-                    if success == 'Yes':
-                        successful_algos += 1
-                        if search_time != 'N/A':
-                            search_times.append(float(search_time))
-                        if total_time != 'N/A':
-                            total_times.append(float(total_time))
-                        if plan_length != 'N/A':
-                            plan_lengths.append(int(plan_length))
-                
-                # Calcola statistiche dai tempi di SEARCH (non total)
-                if search_times:
-                    metrics['planning_best_time'] = min(search_times)
-                    metrics['planning_avg_time'] = sum(search_times) / len(search_times)
-                    metrics['planning_worst_time'] = max(search_times)
-                    metrics['total_solver_time'] = sum(search_times)
-                    
-                    # 🔍 MOSTRA ANCHE TOTAL TIMES per confronto
-                    if total_times:
-                        metrics['total_best_time'] = min(total_times)
-                        metrics['total_avg_time'] = sum(total_times) / len(total_times)
-                        metrics['total_worst_time'] = max(total_times)
-                
-                if plan_lengths:
-                    metrics['plan_steps'] = plan_lengths[0]  # Primo piano trovato
-                
-                metrics['algorithms_successful'] = successful_algos
-                metrics['algorithms_total'] = total_algos
-                metrics['success_rate'] = successful_algos / total_algos if total_algos > 0 else 0
-                
-                print(f"    ✅ Parsed table format: {successful_algos}/{total_algos} successful")
-                print(f"    ⏱️  Planning times: {metrics.get('planning_best_time', 0):.3f}s - {metrics.get('planning_avg_time', 0):.3f}s - {metrics.get('planning_worst_time', 0):.3f}s")
-            
-            else:
-                # 2. FALLBACK: cerca formato testo
-                print(f"    🔍 Table format not found, trying text format...")
-                print(f"    📄 Searching in stdout length: {len(stdout)} chars")
-                
-                # Cerca pattern alternativi nel testo
-                time_patterns = [
-                    r'Best time:\s*([\d.]+)s',
-                    r'Average time:\s*([\d.]+)s', 
-                    r'Worst time:\s*([\d.]+)s',
-                    r'(\d+)\s*successful,\s*(\d+)\s*failed',
-                    r'Plan found \((\d+) steps\)',
-                    r'success rate[:\s]*([\d.]+)%'
-                ]
-                
-                best_time_match = re.search(time_patterns[0], stdout)
-                avg_time_match = re.search(time_patterns[1], stdout)
-                worst_time_match = re.search(time_patterns[2], stdout)
-                success_match = re.search(time_patterns[3], stdout)
-                steps_match = re.search(time_patterns[4], stdout)
-                rate_match = re.search(time_patterns[5], stdout)
-                
-                if best_time_match and avg_time_match and worst_time_match:
-                    metrics['planning_best_time'] = float(best_time_match.group(1))
-                    metrics['planning_avg_time'] = float(avg_time_match.group(1))
-                    metrics['planning_worst_time'] = float(worst_time_match.group(1))
-                    print(f"    ✅ Found text format planning times")
-                
-                if success_match:
-                    successful = int(success_match.group(1))
-                    failed = int(success_match.group(2))
-                    total = successful + failed
-                    metrics['algorithms_successful'] = successful
-                    metrics['algorithms_total'] = total
-                    metrics['success_rate'] = successful / total if total > 0 else 0
-                    print(f"    ✅ Found success rate: {metrics['success_rate']*100:.1f}%")
-                
-                if steps_match:
-                    metrics['plan_steps'] = int(steps_match.group(1))
-                    print(f"    ✅ Found plan steps: {metrics['plan_steps']}")
-                
-                if not any([best_time_match, avg_time_match, worst_time_match]):
-                    print(f"    ⚠️  No planning times found in text format either")
-                    print(f"    🔍 Relevant lines found:")
-                    lines = [line.strip() for line in stdout.split('\n') if 
-                           any(keyword in line.lower() for keyword in ['time', 'plan', 'algorithm', 'search'])][:5]
-                    for line in lines:
-                        print(f"       {line[:100]}...")
-                    print(f"    ⚠️  No planning times found - may need manual check")
-                    print(f"    📝 Stdout sample: {stdout[:200]}")
-                else:
-                    print(f"    ✅ Using text format parsing successfully")
-                    
-        except Exception as e:
-            print(f"    ❌ Error parsing planning results: {e}")
+        searches = run_metrics.get('planning', {}).get('searches', [])
+        if not searches:
+            print(f"    ⚠️  No planning results in metrics.json")
             return metrics
         
+        successful = [search for search in searches if search['success']]
+        
+        # Statistiche dai tempi di SEARCH (non total)
+        search_times = [(search['stats']['search_time'], search['search'])
+                        for search in successful if 'search_time' in search['stats']]
+        if search_times:
+            times = [t for t, _ in search_times]
+            metrics['planning_best_time'] = min(times)
+            metrics['planning_avg_time'] = sum(times) / len(times)
+            metrics['planning_worst_time'] = max(times)
+            metrics['total_solver_time'] = sum(times)
+            metrics['fastest_algorithm'] = min(search_times)[1]
+        
+        # 🔍 ANCHE TOTAL TIMES per confronto
+        total_times = [search['stats']['total_time'] for search in successful if 'total_time' in search['stats']]
+        if total_times:
+            metrics['total_best_time'] = min(total_times)
+            metrics['total_avg_time'] = sum(total_times) / len(total_times)
+            metrics['total_worst_time'] = max(total_times)
+        
+        plan_lengths = [search['plan_length'] for search in successful if search['plan_length'] is not None]
+        if plan_lengths:
+            metrics['plan_steps'] = plan_lengths[0]  # Primo piano trovato
+        
+        metrics['algorithms_successful'] = len(successful)
+        metrics['algorithms_total'] = len(searches)
+        metrics['success_rate'] = len(successful) / len(searches)
+        
+        print(f"    ✅ Planning results: {len(successful)}/{len(searches)} successful")
+        if search_times:
+            print(f"    ⏱️  Planning times: {metrics['planning_best_time']:.3f}s - {metrics['planning_avg_time']:.3f}s - {metrics['planning_worst_time']:.3f}s")
+        
         return metrics
     
-    def parse_step_times(self, stdout, stderr):
-        """Parse step-by-step timing da output"""
+    def step_metrics_from(self, run_metrics):
+        """Tempi per step (wall e CPU), memoria e dimensioni da metrics.json"""
+        steps = run_metrics.get('steps', {})
+        
+        def wall(step):
+            return steps[step]['wall'] if step in steps else None
+        
         step_metrics = {
-            'step1_extraction': None,
-            'step2_signatures': None, 
-            'step5_up_code': None,
-            'step6_pddl': None,
-            'step7_planning': None,
-            'conversion_overhead': None
+            'step1_extraction': wall('step1'),
+            'step2_signatures': wall('step2'), 
+            'step5_up_code': wall('step5'),
+            'step6_pddl': wall('step6'),
+            'step7_planning': wall('step7'),
+            'conversion_overhead': sum(steps[step]['wall'] for step in steps if step != 'step7'),
+            'conversion_cpu_time': sum(steps[step]['cpu'] for step in steps if step != 'step7'),
+            'peak_rss_mb': (run_metrics['peak_rss_bytes']['self'] or 0) / (1024 * 1024)
         }
         
-        try:
-            # Pattern per step times
-            step_patterns = {
-                'step1_extraction': r'Step 1[^:]*:\s*([\d.]+)s',
-                'step2_signatures': r'Step 2[^:]*:\s*([\d.]+)s', 
-                'step5_up_code': r'Step 5[^:]*:\s*([\d.]+)s',
-                'step6_pddl': r'Step 6[^:]*:\s*([\d.]+)s',
-                'step7_planning': r'Step 7[^:]*:\s*([\d.]+)s'
-            }
-            
-            for step_name, pattern in step_patterns.items():
-                match = re.search(pattern, stdout)
-                if match:
-                    step_metrics[step_name] = float(match.group(1))
-            
-            # Calcola conversion overhead (step 1-6)
-            steps_found = [v for v in step_metrics.values() if v is not None]
-            if len(steps_found) >= 4:
-                step_metrics['conversion_overhead'] = sum(steps_found) - (step_metrics.get('step7_planning', 0) or 0)
-            
-        except Exception as e:
-            print(f"    ⚠️  Error parsing step times: {e}")
+        counts = run_metrics.get('counts', {})
+        for key in ('types', 'objects', 'fluents', 'actions'):
+            step_metrics[f'ir_{key}'] = counts.get(key)
         
         return step_metrics
     
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Debug Output Benchmark - Steps 1-5 di CONVERTER/orchestrator.py con e senza
+--detailed, letti dal metrics.json di ogni esecuzione
+
+Per ogni modalità riporta la mediana del tempo wall e CPU di ogni step e del
+totale degli Step 1-5, più la quantità di output prodotta sul terminale.
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ORCHESTRATOR = os.path.join(ROOT_DIR, "CONVERTER", "orchestrator.py")
+STEPS = ("step1", "step2", "step3", "step4", "step5")
+
+
+def run_mode(prolog_file, extra_args, repeat):
+    """Run orchestrator.py repeat times, median wall/CPU per step from metrics.json"""
+    wall = {step: [] for step in STEPS}
+    cpu = {step: [] for step in STEPS}
+    output_bytes = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for run in range(repeat):
+            output_dir = os.path.join(work_dir, f"run_{run}")
+            result = subprocess.run([sys.executable, ORCHESTRATOR, prolog_file, "--output-dir", output_dir] + extra_args,
+                                    capture_output=True, text=True, cwd=ROOT_DIR)
+            output_bytes.append(len(result.stdout) + len(result.stderr))
+            metrics_path = os.path.join(output_dir, "metrics.json")
+            if not os.path.exists(metrics_path):
+                return {"error": (result.stdout + result.stderr).strip().splitlines()[-1:]}
+            with open(metrics_path) as f:
+                steps = json.load(f)["steps"]
+            for step in STEPS:
+                if step in steps:
+                    wall[step].append(steps[step]["wall"])
+                    cpu[step].append(steps[step]["cpu"])
+
+    return {
+        "wall": {step: statistics.median(times) for step, times in wall.items() if times},
+        "cpu": {step: statistics.median(times) for step, times in cpu.items() if times},
+        "output_bytes": statistics.median(output_bytes)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Steps 1-5 of the converter with and without --detailed")
+    parser.add_argument("prolog_file", nargs="?", default=os.path.join("PROLOG", "cucinare_ultimate_stress_test.pl"),
+                        help="Knowledge base to convert (default: PROLOG/cucinare_ultimate_stress_test.pl)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per mode, the median is reported (default: 5)")
+    parser.add_argument("--pddl-writer", choices=["native", "up"], default="up",
+                        help="PDDL writer; with 'up' Step 5 builds the UP problem (default: up)")
+    parser.add_argument("--output", help="Write the raw results to this JSON file")
+    args = parser.parse_args()
+
+    prolog_file = os.path.abspath(args.prolog_file)
+    modes = [
+        ("default", ["--pddl-writer", args.pddl_writer]),
+        ("--detailed", ["--pddl-writer", args.pddl_writer, "--detailed"]),
+    ]
+
+    print(f"🧪 Debug output benchmark: {os.path.basename(prolog_file)}, {args.repeat} runs per mode")
+    print(f"{'Mode':<12} " + " ".join(f"{step:>9}" for step in STEPS) + f" {'Steps 1-5':>10} {'CPU':>9} {'Output':>9}")
+    print("-" * 92)
+
+    results = {}
+    for name, mode_args in modes:
+        result = run_mode(prolog_file, mode_args, args.repeat)
+        results[name] = result
+        if "error" in result:
+            print(f"{name:<12} ERROR {result['error']}")
+            continue
+        wall, cpu = result["wall"], result["cpu"]
+        print(f"{name:<12} " + " ".join(f"{wall[step]*1000:>7.1f}ms" if step in wall else f"{'-':>9}" for step in STEPS) +
+              f" {sum(wall.values())*1000:>8.1f}ms {sum(cpu.values())*1000:>7.1f}ms {result['output_bytes']/1024:>7.1f}KB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Raw results saved to: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
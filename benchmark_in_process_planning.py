@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+In-Process Planning Benchmark - Step 7 con run_plan.py in un sottoprocesso e
+con un OneshotPlanner di Unified Planning nello stesso processo, sulla serie
+PROLOG/cucinare_objects_*
+
+Ogni file viene convertito una volta sola (Steps 1-6), poi pianificato nei due
+modi. Il motore UP viene creato al primo problema e riusato per tutti gli
+altri, come in un worker di --batch --in-process: il tempo di import di
+unified_planning e di creazione del motore è riportato a parte.
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, "CONVERTER"))
+
+
+def series_files(pattern):
+    """Files matching pattern, ordered by the number in their name"""
+    def object_count(path):
+        numbers = re.findall(r"\d+", os.path.basename(path))
+        return (int(numbers[-1]) if numbers else 0, path)
+    return sorted(glob.glob(os.path.join(ROOT_DIR, pattern)), key=object_count)
+
+
+def plan_summary(searches):
+    """Shortest plan length among the successful searches, or None"""
+    lengths = [search["plan_length"] or 0 for search in searches if search["success"]]
+    return min(lengths) if lengths else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step 7 through run_plan.py vs. an in-process UP OneshotPlanner")
+    parser.add_argument("--pattern", default=os.path.join("PROLOG", "cucinare_objects_*.pl"),
+                        help="Knowledge bases to benchmark (default: PROLOG/cucinare_objects_*.pl)")
+    parser.add_argument("--searches", nargs="+", default=["lazy_greedy"],
+                        help="run_plan.py searches for the subprocess mode (default: lazy_greedy)")
+    parser.add_argument("--up-engine", help="OneshotPlanner engine (default: first installed of planning.PREFERRED_ENGINES)")
+    parser.add_argument("--timeout", type=int, default=60, help="Timeout per planning run in seconds (default: 60)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode, the median is reported (default: 3)")
+    parser.add_argument("--output", help="Write the raw results to this JSON file")
+    args = parser.parse_args()
+
+    from conversion_server import convert
+    from planning import default_pool, run_plan_subprocess, run_plan_command
+    from prolog2up_V2 import build_up_problem
+
+    prolog_files = series_files(args.pattern)
+    if not prolog_files:
+        print(f"No files match {args.pattern}")
+        return 1
+
+    # One-time costs of the in-process mode, paid once per process
+    start_time = time.perf_counter()
+    import unified_planning.shortcuts  # noqa: F401
+    up_import_time = time.perf_counter() - start_time
+    pool = default_pool(args.up_engine)
+
+    print(f"🧪 In-process planning benchmark: {len(prolog_files)} files, {args.repeat} runs per mode")
+    print(f"   unified_planning import: {up_import_time*1000:.1f}ms")
+    print(f"{'File':<28} {'Subprocess':>11} {'Plan':>5} {'In-process':>11} {'Plan':>5} {'Speedup':>8}")
+    print("-" * 74)
+
+    results = {"up_import": up_import_time, "files": {}}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for prolog_file in prolog_files:
+            name = os.path.splitext(os.path.basename(prolog_file))[0]
+            output_dir = os.path.join(work_dir, name)
+            converted = convert(prolog_file, output_dir=output_dir)
+            with open(converted["json"]) as f:
+                knowledge = json.load(f)
+            result = {}
+
+            # Subprocess: run_plan.py, one Fast Downward run per search
+            subprocess_times = []
+            for _ in range(args.repeat):
+                command = run_plan_command(converted["domain"], converted["problem"], output_dir,
+                                           args.searches, args.timeout)
+                start_time = time.perf_counter()
+                _, searches = run_plan_subprocess(command)
+                subprocess_times.append(time.perf_counter() - start_time)
+            result["subprocess"] = {"wall": statistics.median(subprocess_times), "plan_length": plan_summary(searches)}
+
+            # In process: build the UP problem from the JSON and solve it with the pooled engine
+            in_process_times = []
+            try:
+                for run in range(args.repeat):
+                    start_time = time.perf_counter()
+                    searches = [pool.solve(build_up_problem(knowledge), timeout=args.timeout)]
+                    elapsed = time.perf_counter() - start_time
+                    if run == 0 and not results.get("engine"):
+                        # Includes the engine creation
+                        results["engine"] = {"name": searches[0]["planner"], "first_solve": elapsed}
+                    in_process_times.append(elapsed)
+                result["in_process"] = {"wall": statistics.median(in_process_times), "plan_length": plan_summary(searches)}
+            except Exception as e:
+                result["in_process"] = {"error": str(e)}
+            results["files"][name] = result
+
+            sub = result["subprocess"]
+            line = f"{name:<28} {sub['wall']*1000:>9.1f}ms {str(sub['plan_length']):>5}"
+            inp = result["in_process"]
+            if "error" in inp:
+                line += f"  n/a ({inp['error']})"
+            else:
+                line += (f" {inp['wall']*1000:>9.1f}ms {str(inp['plan_length']):>5}"
+                         f" {sub['wall'] / inp['wall']:>7.1f}x")
+            print(line)
+
+    if results.get("engine"):
+        print(f"\n   Engine: {results['engine']['name']}, "
+              f"first solve (with engine creation): {results['engine']['first_solve']*1000:.1f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Raw results saved to: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
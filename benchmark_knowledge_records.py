@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Knowledge Records Benchmark - picco di memoria (RSS) del lato codegen/writer
+con la knowledge come dict JSON copiati in profondità, come prima dei record,
+e come record di CONVERTER/records.py
+
+Ogni modo gira in un processo separato: Steps 1-3 sul file (di default il più
+grande di PROLOG/), poi --copies copie della knowledge tenute in memoria
+insieme, ognuna passata a generate_up_code e al writer PDDL nativo. Il modo
+"load" si ferma dopo gli Steps 1-3 ed è la base da cui si misurano gli altri.
+Vengono riportati anche i byte per letterale delle due rappresentazioni.
+"""
+
+import os
+import sys
+import copy
+import json
+import glob
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+import contextlib
+from io import StringIO
+
+CONVERTER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "CONVERTER")
+MODES = ("load", "dicts", "records")
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KB (ru_maxrss is in bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def literal_bytes(knowledge):
+    """Average container bytes of one literal as a {"name", "args"} dict and as a Predicate record"""
+    from records import Knowledge, SECTIONS
+
+    dicts = knowledge["init_state"] + knowledge["goal_state"]
+    for action in knowledge["actions"]:
+        for section in SECTIONS:
+            dicts.extend(action.get(section, []))
+    records = Knowledge.from_json(knowledge)
+    predicates = list(records.init_state + records.goal_state)
+    for action in records.actions:
+        for section in SECTIONS:
+            predicates.extend(getattr(action, section))
+    if not dicts:
+        return {"literals": 0, "dict": 0, "record": 0}
+    return {
+        "literals": len(dicts),
+        "dict": sum(sys.getsizeof(pred) + sys.getsizeof(pred["args"]) for pred in dicts) / len(dicts),
+        "record": sum(sys.getsizeof(pred) + sys.getsizeof(pred.args) for pred in predicates) / len(predicates)
+    }
+
+
+def run_worker(prolog_file, mode, copies):
+    """Steps 1-3, then copies knowledge copies held together and generated from; print one JSON record"""
+    sys.path.insert(0, CONVERTER_DIR)
+    from prolog_extractor import extract_prolog_knowledge, analyze_fluent_signatures
+    from kb_to_json import knwoledge_to_json
+    from prolog2up_V2 import generate_up_code, convert_numbers_to_strings
+    from pddl_writer import write_pddl_native, UnsupportedFeature
+
+    with contextlib.redirect_stdout(StringIO()):
+        knowledge = extract_prolog_knowledge(prolog_file)
+        knowledge['fluent_signatures'] = analyze_fluent_signatures(knowledge)
+        structured_knowledge = knwoledge_to_json(knowledge)
+    del knowledge
+
+    record = {"file": os.path.basename(prolog_file), "mode": mode, "copies": copies}
+    if mode == "load":
+        record["literal_bytes"] = literal_bytes(structured_knowledge)
+        record["peak_rss_kb"] = peak_rss_kb()
+        print(json.dumps(record))
+        return
+
+    start = time.perf_counter()
+    if mode == "dicts":
+        held = [copy.deepcopy(structured_knowledge) for _ in range(copies)]
+    else:
+        held = [convert_numbers_to_strings(structured_knowledge) for _ in range(copies)]
+    record["copy_time"] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        for knowledge in held:
+            generate_up_code(knowledge, out_dir)
+            try:
+                write_pddl_native(knowledge, out_dir)
+            except UnsupportedFeature as e:
+                record["pddl"] = str(e)
+        record["generate_time"] = time.perf_counter() - start
+
+    record["peak_rss_kb"] = peak_rss_kb()
+    print(json.dumps(record))
+
+
+def run_mode(prolog_file, mode, copies):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), prolog_file, "--worker", mode, "--copies", str(copies)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {"mode": mode, "error": result.stderr.strip().splitlines()[-1:]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of the codegen/writer side: deep-copied dicts vs. slotted records")
+    parser.add_argument("prolog_file", nargs="?", help="Prolog file (default: the largest in PROLOG/)")
+    parser.add_argument("--copies", type=int, default=200,
+                        help="Knowledge copies held in memory at the same time (default: 200)")
+    parser.add_argument("--output", help="Write the raw records to this JSON file")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    prolog_file = args.prolog_file or max(glob.glob(os.path.join("PROLOG", "*.pl")), key=os.path.getsize)
+
+    if args.worker:
+        run_worker(prolog_file, args.worker, args.copies)
+        return 0
+
+    results = {mode: run_mode(prolog_file, mode, args.copies) for mode in MODES}
+    errors = [r for r in results.values() if "error" in r]
+
+    print(f"🧪 Knowledge records benchmark: {prolog_file}, {args.copies} copies")
+    if errors:
+        for r in errors:
+            print(f"   {r['mode']}: ERROR {r['error']}")
+        return 1
+
+    base = results["load"]["peak_rss_kb"]
+    print(f"{'Mode':<10} {'Peak RSS':>11} {'Over load':>11} {'Copies':>10} {'Generate':>10}")
+    print("-" * 56)
+    print(f"{'load':<10} {base/1024:>9.1f}MB {'':>11}")
+    for mode in ("dicts", "records"):
+        r = results[mode]
+        print(f"{mode:<10} {r['peak_rss_kb']/1024:>9.1f}MB {(r['peak_rss_kb'] - base)/1024:>9.1f}MB "
+              f"{r['copy_time']*1000:>8.1f}ms {r['generate_time']*1000:>8.1f}ms")
+    sizes = results["load"]["literal_bytes"]
+    print(f"\n   {sizes['literals']} literals: {sizes['dict']:.0f} bytes each as dicts, "
+          f"{sizes['record']:.0f} as records (names and arguments are shared)")
+    if "pddl" in results["records"]:
+        print(f"   Native PDDL writer not applicable: {results['records']['pddl']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Raw results saved to: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Parse Cache Micro-Benchmark - Steps 1-3 del converter con e senza la cache
+dei parser di CONVERTER/patterns.py, su tutto il corpus PROLOG/
+
+Ogni file viene eseguito in un processo separato (un engine SWI-Prolog per
+file), una volta con PROLOG2UP_PARSE_CACHE=0 e una con la cache attiva.
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import statistics
+import subprocess
+import contextlib
+from io import StringIO
+
+CONVERTER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "CONVERTER")
+
+
+def run_worker(prolog_file, repeat):
+    """Time Steps 1-3 on a single file and print one JSON record"""
+    sys.path.insert(0, CONVERTER_DIR)
+    from prolog_extractor import extract_prolog_knowledge, analyze_fluent_signatures
+    from kb_to_json import knwoledge_to_json
+    from patterns import clear_parse_caches, parse_cache_info, PARSE_CACHE_SIZE
+
+    step_times = {"step1": [], "step2": [], "step3": []}
+
+    for _ in range(repeat):
+        clear_parse_caches()
+        with contextlib.redirect_stdout(StringIO()):
+            start = time.perf_counter()
+            knowledge = extract_prolog_knowledge(prolog_file)
+            step_times["step1"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            knowledge['fluent_signatures'] = analyze_fluent_signatures(knowledge)
+            step_times["step2"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            knwoledge_to_json(knowledge)
+            step_times["step3"].append(time.perf_counter() - start)
+
+    record = {
+        "file": os.path.basename(prolog_file),
+        "cache_size": PARSE_CACHE_SIZE,
+        "median": {step: statistics.median(times) for step, times in step_times.items()},
+        "cache_info": parse_cache_info()
+    }
+    print(json.dumps(record))
+
+
+def run_file(prolog_file, repeat, cache_enabled):
+    env = dict(os.environ)
+    if not cache_enabled:
+        env["PROLOG2UP_PARSE_CACHE"] = "0"
+    else:
+        env.pop("PROLOG2UP_PARSE_CACHE", None)
+
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", prolog_file, "--repeat", str(repeat)],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        return {"file": os.path.basename(prolog_file), "error": result.stderr.strip().splitlines()[-1:]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark of the memoized predicate parsers (Steps 1-3)")
+    parser.add_argument("files", nargs="*", help="Prolog files (default: PROLOG/*.pl)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per file, the median is reported (default: 5)")
+    parser.add_argument("--output", help="Write the raw records to this JSON file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.repeat)
+        return 0
+
+    files = args.files or sorted(glob.glob(os.path.join("PROLOG", "*.pl")))
+    files = [f for f in files if os.path.getsize(f) > 0]
+
+    print(f"🧪 Parse cache benchmark: {len(files)} files, {args.repeat} runs each")
+    print(f"{'File':<42} {'Steps 1-3 off':>14} {'Steps 1-3 on':>13} {'Speedup':>8} {'Hits':>7}")
+    print("-" * 88)
+
+    records = []
+    total_off = total_on = 0.0
+    for prolog_file in files:
+        off = run_file(prolog_file, args.repeat, cache_enabled=False)
+        on = run_file(prolog_file, args.repeat, cache_enabled=True)
+        records.append({"off": off, "on": on})
+
+        name = os.path.basename(prolog_file)[:41]
+        if "error" in off or "error" in on:
+            print(f"{name:<42} {'ERROR':>14} {(off.get('error') or on.get('error'))}")
+            continue
+
+        time_off = sum(off["median"].values())
+        time_on = sum(on["median"].values())
+        hits = sum(info["hits"] for info in on["cache_info"].values())
+        total_off += time_off
+        total_on += time_on
+        speedup = time_off / time_on if time_on else 0.0
+        print(f"{name:<42} {time_off*1000:>12.2f}ms {time_on*1000:>11.2f}ms {speedup:>7.2f}x {hits:>7d}")
+
+    print("-" * 88)
+    if total_on:
+        print(f"{'TOTAL':<42} {total_off*1000:>12.2f}ms {total_on*1000:>11.2f}ms {total_off/total_on:>7.2f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(records, f, indent=2)
+        print(f"\n💾 Raw results saved to: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - tempo di avvio di CONVERTER/orchestrator.py misurato con
+python -X importtime, per `--help` e per una conversione semplice (senza
+--solve) con entrambi i PDDL writer
+
+Per ogni scenario riporta il tempo totale del processo (mediana), il tempo
+speso negli import, se unified_planning è stato importato e gli import più
+costosi (tempo cumulativo dei moduli di primo livello).
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ORCHESTRATOR = os.path.join(ROOT_DIR, "CONVERTER", "orchestrator.py")
+
+# "import time:       670 |       9355 |     re"
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+
+def parse_importtime(stderr):
+    """Top-level imports as {module: cumulative seconds} and the set of all imported modules"""
+    top_level = {}
+    modules = set()
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        cumulative_us, indent, module = int(match.group(2)), match.group(3), match.group(4)
+        modules.add(module)
+        if len(indent) == 1:
+            top_level[module] = top_level.get(module, 0.0) + cumulative_us / 1e6
+    return top_level, modules
+
+
+def run_scenario(args, repeat):
+    """Run orchestrator.py with args repeat times in a scratch directory"""
+    wall_times, import_times = [], []
+    top_level, modules = {}, set()
+    with tempfile.TemporaryDirectory() as work_dir:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, "-X", "importtime", ORCHESTRATOR] + args,
+                                    capture_output=True, text=True, cwd=work_dir)
+            wall_times.append(time.perf_counter() - start)
+            if result.returncode != 0:
+                return {"error": (result.stdout + result.stderr).strip().splitlines()[-1:]}
+            top_level, modules = parse_importtime(result.stderr)
+            import_times.append(sum(top_level.values()))
+
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "wall": statistics.median(wall_times),
+        "imports": statistics.median(import_times),
+        "unified_planning": any(m == "unified_planning" or m.startswith("unified_planning.") for m in modules),
+        "top_imports": slowest[:8]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup/import time of the converter CLI (python -X importtime)")
+    parser.add_argument("prolog_file", nargs="?", default=os.path.join("PROLOG", "cucinare.pl"),
+                        help="Knowledge base for the conversion scenarios (default: PROLOG/cucinare.pl)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario, the median is reported (default: 5)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports to show per scenario")
+    parser.add_argument("--output", help="Write the raw results to this JSON file")
+    args = parser.parse_args()
+
+    prolog_file = os.path.abspath(args.prolog_file)
+    scenarios = [
+        ("--help", ["--help"]),
+        ("convert (native writer)", [prolog_file]),
+        ("convert (--pddl-writer up)", [prolog_file, "--pddl-writer", "up"]),
+    ]
+
+    print(f"🧪 Startup benchmark: {len(scenarios)} scenarios, {args.repeat} runs each")
+    print(f"{'Scenario':<30} {'Process':>10} {'Imports':>10} {'UP imported':>12}")
+    print("-" * 66)
+
+    results = {}
+    for name, scenario_args in scenarios:
+        result = run_scenario(scenario_args, args.repeat)
+        results[name] = result
+        if "error" in result:
+            print(f"{name:<30} {'ERROR':>10} {result['error']}")
+            continue
+        print(f"{name:<30} {result['wall']*1000:>8.1f}ms {result['imports']*1000:>8.1f}ms "
+              f"{'yes' if result['unified_planning'] else 'no':>12}")
+        for module, seconds in result["top_imports"][:args.top]:
+            print(f"    {module:<40} {seconds*1000:>8.1f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Raw results saved to: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Symbol Table Benchmark - Steps 2-3 del converter sui record interni (tuple di
+id della symbol table di CONVERTER/symbols.py) e sulle sole forme stringa dei
+predicati, che vengono ri-splittate come prima dei record
+
+La knowledge base viene estratta una volta (Step 1); ogni run lavora su una
+copia, e in entrambi i modi l'indice degli usi dei fluent viene ricostruito
+nello Step 2. La memoria riportata è il picco di tracemalloc durante gli Steps
+2-3 (in un run a parte, non cronometrato) e lo spazio occupato dai letterali
+estratti come dict e come tuple di id.
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+import contextlib
+from io import StringIO
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, "CONVERTER"))
+
+DEFAULT_FILE = os.path.join("PROLOG", "cucinare_object_scaling_extreme.pl")
+
+
+def string_forms_only(knowledge):
+    """Copy of the extracted knowledge without records and symbol table"""
+    knowledge = copy.deepcopy(knowledge)
+    for key in ("_symbols", "_init_state_predicates", "_goal_state_predicates"):
+        knowledge.pop(key, None)
+    for action in knowledge["actions"]:
+        action.pop("_predicates", None)
+    return knowledge
+
+
+def literal_records(knowledge):
+    """Every literal record of the extracted knowledge"""
+    records = knowledge["_init_state_predicates"] + knowledge["_goal_state_predicates"]
+    for action in knowledge["actions"]:
+        for section in action["_predicates"].values():
+            records.extend(section)
+    return records
+
+
+def record_bytes(records, symbols):
+    """Container bytes of the literals as {"name", "args"} dicts and as id tuples (names and ints are shared)"""
+    dicts = [symbols.predicate(record) for record in records]
+    return {
+        "dicts": sum(sys.getsizeof(pred) + sys.getsizeof(pred["args"]) for pred in dicts),
+        "id_tuples": sum(sys.getsizeof(record) for record in records),
+        "symbol_table": sum(sys.getsizeof(container) for container in (symbols.ids, symbols.names, symbols.flags))
+    }
+
+
+def run_steps(knowledge, repeat):
+    """Median Steps 2 and 3 times over repeat runs on copies of knowledge, then the tracemalloc peak of one more"""
+    from prolog_extractor import analyze_fluent_signatures
+    from kb_to_json import knwoledge_to_json
+
+    def steps(run_knowledge, step_times=None):
+        run_knowledge.pop("_fluent_usage_index", None)
+        with contextlib.redirect_stdout(StringIO()):
+            start = time.perf_counter()
+            run_knowledge['fluent_signatures'] = analyze_fluent_signatures(run_knowledge)
+            step2_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            structured_knowledge = knwoledge_to_json(run_knowledge)
+            step3_time = time.perf_counter() - start
+        if step_times is not None:
+            step_times["step2"].append(step2_time)
+            step_times["step3"].append(step3_time)
+        return structured_knowledge
+
+    step_times = {"step2": [], "step3": []}
+    for _ in range(repeat):
+        structured_knowledge = steps(copy.deepcopy(knowledge), step_times)
+
+    # Timed without tracemalloc, which slows every allocation down
+    run_knowledge = copy.deepcopy(knowledge)
+    tracemalloc.start()
+    steps(run_knowledge)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "median": {step: statistics.median(times) for step, times in step_times.items()},
+        "peak_bytes": peak_bytes,
+        "json": structured_knowledge
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Steps 2-3 on interned literal records vs. the string forms")
+    parser.add_argument("prolog_file", nargs="?", default=DEFAULT_FILE,
+                        help=f"Prolog file (default: {DEFAULT_FILE})")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per mode, the median is reported (default: 20)")
+    parser.add_argument("--output", help="Write the raw results to this JSON file")
+    args = parser.parse_args()
+
+    from prolog_extractor import extract_prolog_knowledge
+
+    with contextlib.redirect_stdout(StringIO()):
+        knowledge = extract_prolog_knowledge(args.prolog_file)
+    symbols = knowledge["_symbols"]
+    records = literal_records(knowledge)
+
+    results = {
+        "file": os.path.basename(args.prolog_file),
+        "symbols": len(symbols),
+        "literals": len(records),
+        "record_bytes": record_bytes(records, symbols),
+        "strings": run_steps(string_forms_only(knowledge), args.repeat),
+        "interned": run_steps(knowledge, args.repeat)
+    }
+    same_json = results["strings"].pop("json") == results["interned"].pop("json")
+
+    print(f"🧪 Symbol table benchmark: {args.prolog_file}, {args.repeat} runs per mode")
+    print(f"   {results['symbols']} symbols, {results['literals']} literals")
+    print(f"{'Mode':<18} {'Step 2':>10} {'Step 3':>10} {'Steps 2-3':>11} {'Peak memory':>13}")
+    print("-" * 66)
+    for mode, label in (("strings", "String forms"), ("interned", "Interned records")):
+        median = results[mode]["median"]
+        print(f"{label:<18} {median['step2']*1000:>8.3f}ms {median['step3']*1000:>8.3f}ms "
+              f"{(median['step2'] + median['step3'])*1000:>9.3f}ms {results[mode]['peak_bytes']/1024:>10.1f}KB")
+    sizes = results["record_bytes"]
+    print(f"\n   Literal records: {sizes['dicts']/1024:.1f}KB as dicts, "
+          f"{sizes['id_tuples']/1024:.1f}KB as id tuples "
+          f"+ {sizes['symbol_table']/1024:.1f}KB symbol table")
+    print(f"   Same JSON representation: {'yes' if same_json else 'NO'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Raw results saved to: {args.output}")
+
+    return 0 if same_json else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,11 +5,15 @@ Molto più preciso e affidabile del parsing Prolog con regex
 """
 
 import os
+import sys
 import json
 import glob
 from collections import defaultdict, Counter
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CONVERTER"))
+from compact_ir import load_knowledge, preferred_knowledge_file
+
 class JSONStructureAnalyzer:
     def __init__(self):
         self.metrics = {}
@@ -31,16 +35,16 @@ class JSONStructureAnalyzer:
         for pattern in patterns:
             matches = glob.glob(pattern)
             if matches:
-                # Prendi il più recente se ce ne sono più di uno
-                return max(matches, key=os.path.getmtime)
+                # Prendi il più recente se ce ne sono più di uno,
+                # nel formato compatto (.kbir) se è stato scritto anche quello
+                return preferred_knowledge_file(max(matches, key=os.path.getmtime))
         
         return None
     
     def load_knowledge_json(self, json_path):
-        """Carica il JSON della knowledge base"""
+        """Carica il JSON della knowledge base (o la sua forma compatta .kbir)"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                knowledge = json.load(f)
+            knowledge = load_knowledge(json_path)
             print(f"✅ Loaded knowledge from: {json_path}")
             return knowledge
         except Exception as e:
@@ -7,7 +7,6 @@ Esegue i nuovi benchmark estremi e raccoglie metriche dettagliate
 import subprocess
 import time
 import json
-import re
 import os
 from datetime import datetime
 
@@ -51,13 +50,15 @@ class AdvancedBenchmarkSuite:
         start_time = time.time()
         timeout = self.timeouts.get(filename, 300)
         
-        # Comando da eseguire
+        # Comando da eseguire, le metriche finiscono in output_dir/metrics.json
+        output_dir = f"RESULTS/CONVERTER/{os.path.splitext(filename)[0]}_{datetime.now().strftime('%m%d_%H%M%S')}"
         cmd = [
             "python3", 
             "CONVERTER/orchestrator.py", 
             f"PROLOG/{filename}",
             "--solve", 
-            "--hide-plans"
+            "--hide-plans",
+            "--output-dir", output_dir
         ]
         
         try:
@@ -73,8 +74,8 @@ class AdvancedBenchmarkSuite:
             end_time = time.time()
             execution_time = end_time - start_time
             
-            # Parsing dell'output
-            metrics = self.parse_output(result.stdout, result.stderr, execution_time)
+            # Metriche del converter
+            metrics = self.read_metrics(output_dir)
             metrics['status'] = 'completed'
             metrics['return_code'] = result.returncode
             
@@ -112,58 +113,50 @@ class AdvancedBenchmarkSuite:
         self.results[filename] = metrics
         return metrics
 
-    def parse_output(self, stdout, stderr, execution_time):
-        """Estrae metriche dall'output del converter"""
-        metrics = {}
+    def read_metrics(self, output_dir):
+        """Estrae le metriche dal metrics.json scritto dal converter"""
+        metrics_path = os.path.join(output_dir, "metrics.json")
+        if not os.path.exists(metrics_path):
+            return {'error': f'metrics.json not found in {output_dir}'}
+        with open(metrics_path) as f:
+            run_metrics = json.load(f)
         
-        # Regex patterns per estrarre informazioni
-        patterns = {
-            'plan_steps': r'Plan found \((\d+) steps\)',
-            'best_time': r'Best time:\s+([\d.]+)s',
-            'avg_time': r'Average time:\s+([\d.]+)s', 
-            'worst_time': r'Worst time:\s+([\d.]+)s',
-            'successful_planners': r'(\d+) successful, (\d+) failed planners',
-            'total_solver_time': r'Total solver time:\s+([\d.]+)s',
-            'step_times': {
-                'extraction': r'Step 1 \(Extraction\):\s+([\d.]+)s',
-                'signatures': r'Step 2 \(Signatures\):\s+([\d.]+)s', 
-                'json': r'Step 3-4 \(JSON\):\s+([\d.]+)s',
-                'up_code': r'Step 5 \(UP Code\):\s+([\d.]+)s',
-                'pddl': r'Step 6 \(PDDL\):\s+([\d.]+)s',
-                'planning': r'Step 7 \(Planning\):\s+([\d.]+)s'
-            }
-        }
+        metrics = {}
+        steps = run_metrics.get('steps', {})
         
-        # Estrai plan steps
-        plan_match = re.search(patterns['plan_steps'], stdout)
-        if plan_match:
-            metrics['plan_steps'] = int(plan_match.group(1))
+        def step_wall(*names):
+            return sum(steps[name]['wall'] for name in names if name in steps)
         
-        # Estrai timing planning
-        for key, pattern in patterns.items():
-            if key == 'step_times':
-                continue
-            if key == 'successful_planners':
-                match = re.search(pattern, stdout)
-                if match:
-                    metrics['successful_planners'] = int(match.group(1))
-                    metrics['failed_planners'] = int(match.group(2))
-                continue
-                
-            match = re.search(pattern, stdout)
-            if match:
-                metrics[key] = float(match.group(1))
-        
-        # Estrai step times
-        step_times = {}
-        for step, pattern in patterns['step_times'].items():
-            match = re.search(pattern, stdout)
-            if match:
-                step_times[step] = float(match.group(1))
+        # Tempi per step (stesse chiavi del riepilogo "Step N (...)")
+        step_times = {
+            'extraction': step_wall('step1'),
+            'signatures': step_wall('step2'),
+            'json': step_wall('step3', 'step4'),
+            'up_code': step_wall('step5'),
+            'pddl': step_wall('step6')
+        }
+        if 'step7' in steps:
+            step_times['planning'] = step_wall('step7')
+        metrics['step_times'] = step_times
+        metrics['step_cpu_times'] = {name: step['cpu'] for name, step in steps.items()}
+        metrics['total_conversion_time'] = sum(step_times.values())
+        metrics['peak_rss_bytes'] = run_metrics.get('peak_rss_bytes')
+        metrics['counts'] = run_metrics.get('counts')
         
-        if step_times:
-            metrics['step_times'] = step_times
-            metrics['total_conversion_time'] = sum(step_times.values())
+        # Risultati del planner, una voce per algoritmo
+        searches = run_metrics.get('planning', {}).get('searches', [])
+        successful = [search for search in searches if search['success']]
+        if searches:
+            metrics['successful_planners'] = len(successful)
+            metrics['failed_planners'] = len(searches) - len(successful)
+        if successful:
+            metrics['plan_steps'] = successful[0]['plan_length']
+        solver_times = [search['stats']['total_time'] for search in successful if 'total_time' in search['stats']]
+        if solver_times:
+            metrics['best_time'] = min(solver_times)
+            metrics['avg_time'] = sum(solver_times) / len(solver_times)
+            metrics['worst_time'] = max(solver_times)
+            metrics['total_solver_time'] = sum(solver_times)
         
         # Calcola overhead
         if 'total_solver_time' in metrics and 'total_conversion_time' in metrics:
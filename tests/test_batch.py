@@ -0,0 +1,78 @@
+"""
+Summary records of run_batch when a worker fails, without starting workers:
+the pool is replaced by one whose futures are already settled.
+"""
+
+import json
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import batch
+
+
+class SettledPool:
+    """ProcessPoolExecutor stand-in: submit returns a future settled by outcome(request)"""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, function, request, *args):
+        future = Future()
+        result = self.outcome(request)
+        if isinstance(result, BaseException):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+        return future
+
+
+def converted(request):
+    return {"ok": True, "pddl_writer": "native", "timings": {"total": 0.01}}
+
+
+@pytest.fixture
+def knowledge_bases(tmp_path):
+    directory = tmp_path / "kb"
+    directory.mkdir()
+    for name in ("good", "broken"):
+        (directory / f"{name}.pl").write_text("fact.\n")
+    return directory
+
+
+def run(monkeypatch, knowledge_bases, tmp_path, outcome):
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", SettledPool(outcome))
+    converted_count, failed, summary_path = batch.run_batch(str(knowledge_bases), str(tmp_path / "out"), workers=2)
+    with open(summary_path) as f:
+        records = {record["file"].rsplit("/", 1)[-1]: record for record in map(json.loads, f)}
+    return converted_count, failed, records
+
+
+def test_exception_in_worker_fails_only_its_file(monkeypatch, knowledge_bases, tmp_path):
+    def outcome(request):
+        if request["prolog_file"].endswith("broken.pl"):
+            return FileNotFoundError("run_plan.py not found")
+        return converted(request)
+
+    converted_count, failed, records = run(monkeypatch, knowledge_bases, tmp_path, outcome)
+    assert (converted_count, failed) == (1, 1)
+    assert records["good.pl"]["ok"] is True
+    assert records["broken.pl"] == {"file": records["broken.pl"]["file"], "ok": False,
+                                    "error": "FileNotFoundError: run_plan.py not found"}
+
+
+def test_broken_pool_is_recorded(monkeypatch, knowledge_bases, tmp_path):
+    converted_count, failed, records = run(monkeypatch, knowledge_bases, tmp_path,
+                                           lambda request: BrokenProcessPool("worker died"))
+    assert (converted_count, failed) == (0, 2)
+    assert all(record["error"] == "Worker process failed: worker died" for record in records.values())
@@ -0,0 +1,158 @@
+"""
+Round trip of the compact IR on knowledge dicts built here: decoding must
+give back the same dict, with the same key order, as the JSON would.
+"""
+
+import os
+import json
+import pickle
+
+import pytest
+
+from compact_ir import (encode, decode, write_compact_ir, load_knowledge, compact_ir_path,
+                        preferred_knowledge_file, CompactIRError, HEADER, MAGIC, VERSION)
+
+
+KNOWLEDGE = {
+    "types": {"cuoco": ["mario"], "cibo": ["pasta", "pizza"], "vuoto": []},
+    "fluents": ["ha_fame", "cotto"],
+    "fluent_signatures": {"ha_fame": ["cuoco"], "cotto": ["cibo"]},
+    "object_types": {"mario": "cuoco", "pasta": "cibo", "pizza": "cibo"},
+    "init_state": [{"name": "ha_fame", "args": ["mario"]}],
+    "goal_state": [{"name": "cotto", "args": ["pasta"]}, {"name": "fatto", "args": []}],
+    "actions": [{
+        "name": "cucina",
+        "parameters": ["P", "F"],
+        "type_constraints": {"P": "cuoco", "F": "cibo"},
+        "preconditions": [{"name": "ha_fame", "args": ["P"]}],
+        "neg_preconditions": [{"name": "cotto", "args": ["F", "_"], "wildcard_positions": [1]}],
+        "add_effects": [{"name": "cotto", "args": ["F"]}],
+        "del_effects": []
+    }],
+    "supertypes": {"SuperType1": ["cibo", "cuoco"]}
+}
+
+
+def assert_round_trip(value):
+    decoded = decode(encode(value))
+    assert decoded == value
+    # Same types and key order: the dumped JSON is the same text
+    assert json.dumps(decoded, indent=2) == json.dumps(value, indent=2)
+
+
+def test_knowledge():
+    assert_round_trip(KNOWLEDGE)
+
+
+@pytest.mark.parametrize("value", [
+    {},
+    [],
+    "",
+    {"init_state": [], "goal_state": [], "types": {}},
+    [[], {}, [[]], {"": ""}],
+    [{"name": "vuoto", "args": []}],
+    [{"name": "p", "args": [], "wildcard_positions": []}]
+], ids=["empty-dict", "empty-list", "empty-string", "empty-sections", "empty-nested",
+        "no-args-literal", "empty-wildcards"])
+def test_empty(value):
+    assert_round_trip(value)
+
+
+def test_nested():
+    assert_round_trip({"a": {"b": {"c": [{"d": [["e", ["f"]], {"g": None}]}]}},
+                       "z": {"y": [], "x": {}}, "a2": [1, "uno", [2, "due"], {"tre": [3]}]})
+
+
+def test_literal_like_values():
+    # Dicts that are almost literals take the generic encoding and come back unchanged
+    assert_round_trip([
+        {"name": "p", "args": ["a"]},
+        {"args": ["a"], "name": "p"},
+        {"name": "p", "args": [1]},
+        {"name": "p", "args": ["a"], "wildcard_positions": [-1]},
+        {"name": "p", "args": ["a"], "other": True}
+    ])
+
+
+def test_numeric():
+    assert_round_trip({
+        "ints": [0, 1, 42, 0xFFFFFFFF, 0x100000000, -1, -0xFFFFFFFF, -0x100000000, 10 ** 30, -10 ** 30],
+        "floats": [0.0, -0.0, 1.5, -2.25, 1e300, 5e-324, 3.141592653589793],
+        "constants": [None, True, False, True],
+        "mixed": [1, 1.0, "1", True, None]
+    })
+    # bool and int stay distinct, as do 1 and 1.0
+    decoded = decode(encode([True, 1, 1.0, False, 0]))
+    assert [type(item) for item in decoded] == [bool, int, float, bool, int]
+
+
+def test_unicode():
+    assert_round_trip({
+        "types": {"città": ["milano", "torino"], "стол": ["один"], "料理": ["寿司"]},
+        "init_state": [{"name": "è_cotto", "args": ["però", "🍝", "naïve"]}],
+        "emoji 🍕": "straße",
+        "": ["", "\u0000", "퟿", "\U0010ffff", "a\nb\t\"c\\"]
+    })
+
+
+def test_shared_strings():
+    # The same string in many places is stored once and decoded everywhere
+    value = {"a": ["x"] * 100, "x": {"x": "x"}, "l": [{"name": "x", "args": ["x", "x"]}] * 50}
+    assert_round_trip(value)
+    assert len(encode(value)) < len(json.dumps(value))
+
+
+def test_decoded_strings_are_shared():
+    decoded = decode(encode(KNOWLEDGE))
+    mario = decoded["types"]["cuoco"][0]
+    assert decoded["init_state"][0]["args"][0] is mario
+    assert next(iter(decoded["object_types"])) is mario
+    assert decoded["init_state"][0]["name"] is decoded["fluents"][0]
+
+
+def test_not_serializable():
+    with pytest.raises(TypeError):
+        encode({"set": {1, 2}})
+    with pytest.raises(TypeError):
+        encode({"tuple": (1, 2)})
+
+
+def test_invalid_data():
+    data = encode(KNOWLEDGE)
+    with pytest.raises(CompactIRError):
+        decode(b"JSON" + data[4:])
+    with pytest.raises(CompactIRError):
+        decode(data[:10])
+    with pytest.raises(CompactIRError):
+        decode(data[:len(data) // 2])
+
+
+def test_code_is_never_loaded():
+    # A pickle that would call os.system when loaded is refused before the call
+    data = HEADER.pack(MAGIC, VERSION) + pickle.dumps(os.system, protocol=4)
+    with pytest.raises(CompactIRError):
+        decode(data)
+
+
+def test_files(tmp_path):
+    json_path = tmp_path / "extracted_knowledge.json"
+    json_path.write_text(json.dumps(KNOWLEDGE, indent=2), encoding="utf-8")
+    compact_path = write_compact_ir(KNOWLEDGE, compact_ir_path(str(json_path)))
+
+    assert compact_path == str(tmp_path / "extracted_knowledge.kbir")
+    assert load_knowledge(compact_path) == load_knowledge(str(json_path)) == KNOWLEDGE
+
+
+def test_preferred_knowledge_file(tmp_path):
+    json_path = tmp_path / "extracted_knowledge.json"
+    json_path.write_text(json.dumps(KNOWLEDGE), encoding="utf-8")
+    assert preferred_knowledge_file(str(json_path)) == str(json_path)
+
+    compact_path = write_compact_ir(KNOWLEDGE, compact_ir_path(str(json_path)))
+    os.utime(json_path, (1, 1))
+    assert preferred_knowledge_file(str(json_path)) == compact_path
+
+    # A JSON written after the .kbir is newer: the .kbir is stale
+    os.utime(compact_path, (1, 1))
+    os.utime(json_path, (2, 2))
+    assert preferred_knowledge_file(str(json_path)) == str(json_path)
@@ -0,0 +1,77 @@
+"""
+Command line behaviour of the orchestrator that does not need a knowledge
+base: logging setup and argument validation.
+"""
+
+import glob
+import logging
+import os
+import re
+import sys
+
+import pytest
+
+import orchestrator
+from orchestrator import CONVERTER_LOGGERS, configure_logging
+
+CONVERTER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "CONVERTER")
+LOGGER_RE = re.compile(r"^logger = logging\.getLogger\(__name__\)", re.MULTILINE)
+
+
+def module_loggers():
+    """Names of the converter modules that log through logging.getLogger(__name__)"""
+    names = []
+    for path in sorted(glob.glob(os.path.join(CONVERTER_DIR, "*.py"))):
+        with open(path, encoding="utf-8") as f:
+            if LOGGER_RE.search(f.read()):
+                names.append(os.path.splitext(os.path.basename(path))[0])
+    return names
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    levels = {name: logging.getLogger(name).level for name in module_loggers()}
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+
+def test_every_module_logger_is_configured():
+    assert module_loggers()
+    assert set(module_loggers()) <= set(CONVERTER_LOGGERS)
+
+
+@pytest.mark.parametrize("name", module_loggers())
+def test_detailed_enables_debug(restore_logging, name):
+    configure_logging(detailed=True)
+    assert logging.getLogger(name).isEnabledFor(logging.DEBUG)
+
+
+@pytest.mark.parametrize("name", module_loggers())
+def test_debug_off_by_default(restore_logging, name):
+    configure_logging(detailed=False)
+    assert not logging.getLogger(name).isEnabledFor(logging.DEBUG)
+    assert logging.getLogger(name).isEnabledFor(logging.INFO)
+
+
+@pytest.mark.parametrize("options", [["--race"], ["--parallel"], ["--algorithm-set", "fast"],
+                                     ["--race", "--algorithm-set", "fast"]])
+@pytest.mark.parametrize("target", [["missing.pl"], ["--batch", "missing_dir"]])
+def test_in_process_rejects_run_plan_options(monkeypatch, capsys, restore_logging, options, target):
+    monkeypatch.setattr(sys, "argv", ["orchestrator.py", *target, "--solve", "--in-process", *options])
+    with pytest.raises(SystemExit) as exit_info:
+        orchestrator.main()
+    assert exit_info.value.code == 2
+    error = capsys.readouterr().err
+    assert "can't be used with --in-process" in error
+    assert all(option in error for option in options if option.startswith("--"))
+
+
+def test_in_process_alone_is_accepted(monkeypatch, capsys, restore_logging):
+    monkeypatch.setattr(sys, "argv", ["orchestrator.py", "--batch", "missing_dir", "--solve", "--in-process"])
+    assert orchestrator.main() == 1
+    assert "batch directory 'missing_dir' not found" in capsys.readouterr().out
@@ -0,0 +1,68 @@
+"""
+The converter version keys every cached conversion: any change to a
+converter module has to change it, and with it every cache key.
+"""
+
+import glob
+import os
+import shutil
+
+import pytest
+
+import pipeline_cache
+from pipeline_cache import CONVERTER_DIR, source_version, converter_version, conversion_key
+
+MODULES = sorted(os.path.basename(path) for path in glob.glob(os.path.join(CONVERTER_DIR, "*.py")))
+
+
+@pytest.fixture
+def converter_copy(tmp_path):
+    copy_dir = tmp_path / "CONVERTER"
+    copy_dir.mkdir()
+    for module in MODULES:
+        shutil.copy(os.path.join(CONVERTER_DIR, module), copy_dir)
+    return copy_dir
+
+
+@pytest.fixture
+def knowledge_base(tmp_path):
+    path = tmp_path / "kb.pl"
+    path.write_text("cuoco(mario).\n")
+    return str(path)
+
+
+def key_with_sources(monkeypatch, converter_dir, knowledge_base):
+    """conversion_key as computed by a process whose converter lives in converter_dir"""
+    monkeypatch.setattr(pipeline_cache, "CONVERTER_DIR", str(converter_dir))
+    monkeypatch.setattr(pipeline_cache, "_converter_version", None)
+    return conversion_key(knowledge_base, "findall")
+
+
+def test_converter_version_is_the_source_version():
+    assert converter_version() == source_version(CONVERTER_DIR)
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_module_change_invalidates_the_cache(monkeypatch, converter_copy, knowledge_base, module):
+    key = key_with_sources(monkeypatch, converter_copy, knowledge_base)
+    assert key_with_sources(monkeypatch, converter_copy, knowledge_base) == key
+    with open(converter_copy / module, "a") as f:
+        f.write("\n# changed\n")
+    assert key_with_sources(monkeypatch, converter_copy, knowledge_base) != key
+
+
+def test_added_and_removed_modules(converter_copy):
+    version = source_version(converter_copy)
+    (converter_copy / "new_module.py").write_text("")
+    assert source_version(converter_copy) != version
+    (converter_copy / "new_module.py").unlink()
+    assert source_version(converter_copy) == version
+    (converter_copy / "kb_to_json.py").unlink()
+    assert source_version(converter_copy) != version
+
+
+def test_other_files_are_ignored(converter_copy):
+    version = source_version(converter_copy)
+    (converter_copy / "requirements.txt").write_text("changed\n")
+    (converter_copy / "extracted_knowledge.json").write_text("{}")
+    assert source_version(converter_copy) == version
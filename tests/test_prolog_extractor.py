@@ -0,0 +1,94 @@
+"""
+Step 1 query results in the shapes PySwip actually returns: with
+normalize=False each solution is a list of =(Name, Value) functors, without
+the keyword (older PySwip) a dict.
+"""
+
+import pytest
+
+pytest.importorskip("pyswip")
+
+from prolog_extractor import (ACTION_QUERY, PredicateRecord, query_action_solutions,
+                              _query_state_terms)
+
+
+class BindingName:
+    """The Name of a =(Name, Value) binding, an atom"""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Binding:
+    """=(Name, Value), as in PySwip's binding lists"""
+
+    def __init__(self, name, value):
+        self.name = "="
+        self.args = [BindingName(name), value]
+
+
+ACTION_SOLUTION = {
+    "Head": "cucina(P, F)",
+    "Precond": ["ha_fame(P)", "disponibile(F)"],
+    "NegPrecond": ["cotto(F)"],
+    "ResourcePrecond": [],
+    "TypeConstraints": ["cuoco(P)", "cibo(F)"],
+    "Effects": ["add(cotto(F))", "del(disponibile(F))"]
+}
+
+STATE_SOLUTIONS = {
+    "init_state(X)": {"X": ["ha_fame(mario)", "disponibile(pasta)"]},
+    "goal_state(X)": {"X": ["cotto(pasta)"]}
+}
+
+
+class ListBindingsProlog:
+    """query(normalize=False) yields each solution as a list of =(Name, Value)"""
+
+    def __init__(self, solutions):
+        self.solutions = solutions
+
+    def query(self, query_str, normalize=True):
+        assert not normalize
+        for solution in self.solutions.get(query_str, []):
+            yield [Binding(name, value) for name, value in solution.items()]
+
+
+class DictProlog:
+    """Older PySwip: no normalize keyword, each solution is a dict"""
+
+    def __init__(self, solutions):
+        self.solutions = solutions
+
+    def query(self, query_str):
+        yield from self.solutions.get(query_str, [])
+
+
+@pytest.fixture(params=[ListBindingsProlog, DictProlog])
+def prolog(request):
+    solutions = {ACTION_QUERY: [ACTION_SOLUTION]}
+    solutions.update((query, [solution]) for query, solution in STATE_SOLUTIONS.items())
+    return request.param(solutions)
+
+
+def test_action_solutions(prolog):
+    [solution] = query_action_solutions(prolog)
+
+    assert solution["head"].name == "cucina"
+    assert [pred.name for pred in solution["preconditions"]] == ["ha_fame", "disponibile"]
+    assert solution["neg_preconditions"] == [PredicateRecord("cotto", ("F",))]
+    assert solution["resource_preconditions"] == []
+    assert [pred.name for pred in solution["type_constraints"]] == ["cuoco", "cibo"]
+    assert [pred.name for pred in solution["effects"]] == ["add", "del"]
+
+
+def test_state_terms(prolog):
+    assert _query_state_terms(prolog, "init_state") == [
+        PredicateRecord("ha_fame", ("mario",)),
+        PredicateRecord("disponibile", ("pasta",))
+    ]
+    assert _query_state_terms(prolog, "goal_state") == [PredicateRecord("cotto", ("pasta",))]
+
+
+def test_missing_state():
+    assert _query_state_terms(ListBindingsProlog({}), "init_state") == []